@@ -0,0 +1,396 @@
+"""Module containing stage-level benchmarks of the contracts lifecycles.
+
+Lifecycles run the contracts' setup and transaction functions, and the
+functions they call for every stage are timed separately, so a regression can
+be attributed to PyTeal compilation, algod compilation, account generation,
+funding, submission, confirmation or indexer visibility.  Compilation stages
+time the bank template and compile cache lookups the contracts use, so their
+p99 reflects the cold compilation of the first iteration.  Lifecycles are run
+concurrently at provided concurrency levels and percentiles of every stage are
+written as JSON that can be compared with the baseline results afterwards.
+
+Usage::
+
+    python benchmarks.py run --fake-node --output results.json
+    python benchmarks.py compare baseline.json results.json
+    python benchmarks.py imports
+"""
+
+import argparse
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import contracts
+import helpers
+from clients import close_clients
+from contracts import (
+    BANK_ACCOUNT_FEE,
+    create_bank_transaction,
+    create_split_transaction,
+    setup_bank_contract,
+    setup_split_contract,
+)
+from helpers import percentile, transaction_info
+
+STAGES = (
+    "pyteal_compile",
+    "algod_compile",
+    "account_generation",
+    "funding",
+    "submit",
+    "confirmation",
+    "indexer_visibility",
+)
+STAGE_FUNCTIONS = (
+    (contracts, "_bank_template_source", "pyteal_compile"),
+    (helpers, "_compile_source", "algod_compile"),
+    (contracts, "add_standalone_account", "account_generation"),
+    (contracts, "fund_account", "funding"),
+    (helpers, "_send", "submit"),
+    (helpers, "_wait_for_confirmations", "confirmation"),
+)
+PERCENTILES = (50, 95, 99)
+CONCURRENCY_LEVELS = (1, 4, 16)
+ITERATIONS = 20
+REGRESSION_THRESHOLD = 0.2
+REGRESSION_PERCENTILES = ("p50", "p95")
+IMPORT_BUDGETS = {"contracts": 300, "helpers": 250}  # milliseconds
+LAZY_MODULES = ("pyteal", "asyncio", "argparse", "pty", "helpers_async", "signing")
+IMPORT_RUNS = 5
+
+
+## TIMING
+class StageTimer:
+    """Thread-safe collector of durations measured for every stage.
+
+    Stages entered while the same thread is already in a stage aren't measured,
+    so submission and confirmation of the funding count only as funding.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.samples = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name):
+        """Measure duration of the code run in context as `name` stage."""
+        if getattr(self._local, "stage", None) is not None:
+            yield
+            return
+        self._local.stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._local.stage = None
+            with self._lock:
+                self.samples[name].append(duration)
+
+
+def _timed_function(timer, name, function):
+    """Return wrapper of `function` timing its calls as `name` stage."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with timer.stage(name):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def timed_stages(timer):
+    """Time calls of STAGE_FUNCTIONS by provided `timer` in the context."""
+    originals = [
+        (module, name, getattr(module, name)) for module, name, _ in STAGE_FUNCTIONS
+    ]
+    for (module, name, function), (_, _, stage) in zip(originals, STAGE_FUNCTIONS):
+        setattr(module, name, _timed_function(timer, stage, function))
+    try:
+        yield
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+
+
+def summarize(samples):
+    """Return dictionary with count, mean and percentiles of every stage.
+
+    Durations are converted to milliseconds and stages are ordered by STAGES.
+    """
+    summary = {}
+    for stage in sorted(samples, key=lambda name: (STAGES + (name,)).index(name)):
+        values = [duration * 1000 for duration in samples[stage]]
+        summary[stage] = {"count": len(values), "mean": sum(values) / len(values)}
+        for percent in PERCENTILES:
+            summary[stage]["p%s" % (percent,)] = percentile(values, percent)
+    return summary
+
+
+## LIFECYCLES
+def bank_lifecycle(timer, amount=1000000):
+    """Set up bank contract, withdraw from it and wait for the indexer."""
+    logic_sig, escrow_address, receiver = setup_bank_contract()
+    transaction_id = create_bank_transaction(
+        logic_sig, escrow_address, receiver, amount, fee=BANK_ACCOUNT_FEE
+    )
+    with timer.stage("indexer_visibility"):
+        transaction_info(transaction_id)
+
+
+def split_lifecycle(timer, amount=1000000):
+    """Set up split contract, split funds from it and wait for the indexer."""
+    split_contract = setup_split_contract()
+    transaction_id = create_split_transaction(split_contract, amount)
+    with timer.stage("indexer_visibility"):
+        transaction_info(transaction_id)
+
+
+LIFECYCLES = {"bank": bank_lifecycle, "split": split_lifecycle}
+
+
+## RUNNING
+def run_lifecycle(lifecycle, concurrency, iterations):
+    """Run `iterations` of `lifecycle` by `concurrency` threads and summarize it."""
+    timer = StageTimer()
+    start = time.perf_counter()
+    with timed_stages(timer), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(lifecycle, timer) for _ in range(iterations)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "elapsed": elapsed,
+        "throughput": iterations / elapsed,
+        "stages": summarize(timer.samples),
+    }
+
+
+def run_benchmarks(
+    lifecycles=tuple(LIFECYCLES),
+    concurrency_levels=CONCURRENCY_LEVELS,
+    iterations=ITERATIONS,
+):
+    """Run provided lifecycles at every concurrency level and return results."""
+    results = {
+        "metadata": {
+            "python": platform.python_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "iterations": iterations,
+        },
+        "results": {},
+    }
+    for concurrency in concurrency_levels:
+        results["results"][str(concurrency)] = {
+            name: run_lifecycle(LIFECYCLES[name], concurrency, iterations)
+            for name in lifecycles
+        }
+    return results
+
+
+## COMPARING
+def compare_results(
+    baseline,
+    current,
+    threshold=REGRESSION_THRESHOLD,
+    percentiles=REGRESSION_PERCENTILES,
+):
+    """Return list of regressions of `current` results against `baseline`.
+
+    Regression is a percentile of the stage greater than the baseline one by
+    more than `threshold` fraction.  Only the measurements found in both of
+    the results are compared.
+    """
+    regressions = []
+    for concurrency, lifecycles in sorted(current["results"].items()):
+        for name, result in sorted(lifecycles.items()):
+            base = baseline["results"].get(concurrency, {}).get(name)
+            if base is None:
+                continue
+            for stage, stats in result["stages"].items():
+                base_stats = base["stages"].get(stage)
+                if base_stats is None:
+                    continue
+                for key in percentiles:
+                    if stats[key] > base_stats[key] * (1 + threshold):
+                        regressions.append(
+                            {
+                                "concurrency": int(concurrency),
+                                "lifecycle": name,
+                                "stage": stage,
+                                "percentile": key,
+                                "baseline": base_stats[key],
+                                "current": stats[key],
+                            }
+                        )
+    return regressions
+
+
+def _format_regression(regression):
+    """Return human readable line describing provided `regression`."""
+    return "%s/%s@%s %s: %.2f ms -> %.2f ms" % (
+        regression["lifecycle"],
+        regression["stage"],
+        regression["concurrency"],
+        regression["percentile"],
+        regression["baseline"],
+        regression["current"],
+    )
+
+
+def _load(path):
+    """Return results loaded from JSON file at `path`."""
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+## IMPORTS
+_IMPORT_SCRIPT = """\
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))
+"""
+
+
+def measure_import(module, runs=IMPORT_RUNS):
+    """Return import time of `module` and lazy modules it has imported eagerly.
+
+    Module is imported by `runs` fresh interpreters and the median duration
+    is returned in milliseconds.
+    """
+    durations, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SCRIPT.format(module=module)],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        duration, modules = json.loads(output)
+        durations.append(duration * 1000)
+        loaded.update(name for name in LAZY_MODULES if name in modules)
+    return {"ms": statistics.median(durations), "eager": sorted(loaded)}
+
+
+def check_import_budgets(results, budgets=IMPORT_BUDGETS):
+    """Return list of messages describing imports exceeding their budgets.
+
+    Import exceeds its budget if it's slower than the budget in milliseconds
+    or if it imports any of LAZY_MODULES.
+    """
+    violations = []
+    for module, result in sorted(results.items()):
+        budget = budgets.get(module)
+        if budget is not None and result["ms"] > budget:
+            violations.append(
+                "%s: %.1f ms over %s ms budget" % (module, result["ms"], budget)
+            )
+        if result["eager"]:
+            violations.append(
+                "%s: imports %s eagerly" % (module, ", ".join(result["eager"]))
+            )
+    return violations
+
+
+## COMMAND LINE
+def _parse_arguments(args):
+    """Return namespace of parsed command line `args`."""
+    parser = argparse.ArgumentParser(description="Contracts lifecycle benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("--output", help="path of JSON results file")
+    run_parser.add_argument(
+        "--lifecycles", nargs="+", choices=sorted(LIFECYCLES), default=list(LIFECYCLES)
+    )
+    run_parser.add_argument(
+        "--concurrency", nargs="+", type=int, default=list(CONCURRENCY_LEVELS)
+    )
+    run_parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    run_parser.add_argument(
+        "--fake-node", action="store_true", help="run against in-memory fake node"
+    )
+    run_parser.add_argument("--baseline", help="compare results with this file")
+
+    compare_parser = commands.add_parser("compare", help="compare results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    imports_parser = commands.add_parser("imports", help="check import times")
+    imports_parser.add_argument(
+        "--modules", nargs="+", default=sorted(IMPORT_BUDGETS), help="modules"
+    )
+    imports_parser.add_argument("--runs", type=int, default=IMPORT_RUNS)
+
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument(
+            "--threshold", type=float, default=REGRESSION_THRESHOLD
+        )
+    return parser.parse_args(args)
+
+
+def _run(arguments):
+    """Run benchmarks as configured by `arguments` and return the results."""
+    node = None
+    if arguments.fake_node:
+        from fakenode import FakeNode
+
+        node = FakeNode().start().configure()
+    try:
+        return run_benchmarks(
+            arguments.lifecycles, arguments.concurrency, arguments.iterations
+        )
+    finally:
+        close_clients()
+        if node is not None:
+            node.stop()
+
+
+def main(args=None):
+    """Run command from provided `args` and return process exit status."""
+    arguments = _parse_arguments(args)
+    if arguments.command == "imports":
+        results = {
+            module: measure_import(module, arguments.runs)
+            for module in arguments.modules
+        }
+        print(json.dumps(results, indent=2))
+        violations = check_import_budgets(results)
+        for violation in violations:
+            print("BUDGET %s" % (violation,), file=sys.stderr)
+        return 1 if violations else 0
+
+    if arguments.command == "run":
+        current = _run(arguments)
+        output = json.dumps(current, indent=2)
+        if arguments.output:
+            with open(arguments.output, "w") as output_file:
+                output_file.write(output)
+        else:
+            print(output)
+        if not arguments.baseline:
+            return 0
+        baseline = _load(arguments.baseline)
+    else:
+        baseline, current = _load(arguments.baseline), _load(arguments.current)
+
+    regressions = compare_results(baseline, current, arguments.threshold)
+    for regression in regressions:
+        print("REGRESSION %s" % (_format_regression(regression),), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Module containing on-disk bundles of signed transactions and their submission.
+
+Transactions are built and signed ahead of time and streamed to a bundle file
+as msgpack objects: the header followed by one record per transaction group.
+Every record holds the ids of group's transactions and their raw msgpack
+encoding, so the bundle is later submitted through algod raw send without
+decoding or signing anything.
+"""
+
+import base64
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import msgpack
+
+from clients import NODE_ERRORS, algod_client
+from confirmations import REJECTED
+from helpers import watch_confirmation
+from signing import EncodedTransaction, encode_transaction
+
+BUNDLE_FORMAT = "signed-transactions"
+BUNDLE_VERSION = 1
+SUBMIT_CONCURRENCY = 16
+
+BundleRecord = namedtuple("BundleRecord", ["transaction_ids", "raw"])
+BundleResult = namedtuple(
+    "BundleResult", ["transaction_ids", "status", "round", "error"]
+)
+
+
+## WRITING
+class BundleWriter:
+    """Writer streaming groups of signed transactions to the bundle at `path`.
+
+    Args:
+        path (str): path of the bundle file created or truncated by the writer
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._packer = msgpack.Packer(use_bin_type=True)
+        self._file.write(
+            self._packer.pack({"format": BUNDLE_FORMAT, "version": BUNDLE_VERSION})
+        )
+        self.count = 0
+
+    def add(self, transactions):
+        """Append signed transaction or the list of grouped ones to the bundle.
+
+        Transactions already encoded by :mod:`signing` are written as they are.
+        """
+        if not isinstance(transactions, list):
+            transactions = [transactions]
+        encoded = [
+            (
+                transaction
+                if isinstance(transaction, EncodedTransaction)
+                else encode_transaction(transaction)
+            )
+            for transaction in transactions
+        ]
+        raw = b"".join(transaction.raw for transaction in encoded)
+        transaction_ids = [transaction.transaction_id for transaction in encoded]
+        self._file.write(self._packer.pack([transaction_ids, raw]))
+        self.count += 1
+
+    def close(self):
+        """Flush and close the bundle file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_bundle(path, groups):
+    """Write signed transactions from `groups` iterable to bundle and return count.
+
+    Every item of `groups` is a signed transaction or the list of grouped ones.
+    Groups are written as they're produced, so the iterable can be a generator
+    building and signing transactions lazily.
+    """
+    with BundleWriter(path) as writer:
+        for transactions in groups:
+            writer.add(transactions)
+    return writer.count
+
+
+## READING
+def read_bundle(path):
+    """Yield `BundleRecord` for every group stored in the bundle at `path`."""
+    with open(path, "rb") as bundle_file:
+        unpacker = msgpack.Unpacker(bundle_file, raw=False)
+        header = next(unpacker, None)
+        if not isinstance(header, dict) or header.get("format") != BUNDLE_FORMAT:
+            raise ValueError("%s isn't a bundle of signed transactions" % (path,))
+        if header.get("version") != BUNDLE_VERSION:
+            raise ValueError(
+                "Unsupported bundle version: %s" % (header.get("version"),)
+            )
+        for transaction_ids, raw in unpacker:
+            yield BundleRecord(transaction_ids, raw)
+
+
+## SUBMITTING
+def submit_bundle(path, concurrency=SUBMIT_CONCURRENCY, timeout=4):
+    """Submit bundle's groups by algod raw send and return their results.
+
+    Up to `concurrency` groups are being sent at the same time while the bundle
+    is streamed from disk. Confirmation of every sent group is watched as soon
+    as it's accepted, and list of `BundleResult` is returned in bundle's order
+    after all of them are resolved. Groups refused by the node or failed to be
+    sent get REJECTED status and the error, without losing the other results.
+    """
+    client = algod_client()
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def send(record):
+        """Send raw group and return future of its confirmation."""
+        try:
+            client.send_raw_transaction(base64.b64encode(record.raw))
+        finally:
+            slots.release()
+        return watch_confirmation(record.transaction_ids[0], timeout)
+
+    submitted = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record in read_bundle(path):
+            slots.acquire()
+            future = executor.submit(send, record)
+            submitted.append((record.transaction_ids, future))
+
+    results = []
+    for transaction_ids, future in submitted:
+        try:
+            confirmation = future.result().result()
+        except NODE_ERRORS as exception:
+            results.append(
+                BundleResult(transaction_ids, REJECTED, None, str(exception))
+            )
+            continue
+        results.append(
+            BundleResult(
+                transaction_ids,
+                confirmation.status,
+                confirmation.round,
+                confirmation.pool_error,
+            )
+        )
+    return results
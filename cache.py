@@ -0,0 +1,198 @@
+"""Module containing caches for results retrieved from Algorand nodes."""
+
+import copy
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+COMPILE_CACHE_SIZE = 1024
+PARAMS_REFRESH_MARGIN = 100
+ROUND_DURATION = 4.5  # seconds
+
+
+def _digest(text):
+    """Return hexadecimal SHA-256 digest of provided `text`."""
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+class CompileCache:
+    """Content-addressed cache of compiled TEAL programs.
+
+    Entries are keyed by the hash of algod version and TEAL source. The first tier
+    is an in-process LRU mapping and the optional second tier is a directory on
+    disk, shared between pytest-xdist workers and subsequent runs.
+
+    Args:
+        maxsize (int): maximum number of programs held in memory
+        directory (str): path to on-disk tier, or None to disable it
+    """
+
+    def __init__(self, maxsize=COMPILE_CACHE_SIZE, directory=None):
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, version, source):
+        """Return on-disk path of the entry for provided `version` and `source`."""
+        return self.directory / _digest(version) / (_digest(source) + ".bin")
+
+    def _read(self, version, source):
+        """Return compiled binary from on-disk tier or None if it's not there."""
+        if self.directory is None:
+            return None
+        try:
+            return self._path(version, source).read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, version, source, binary):
+        """Atomically write compiled `binary` to on-disk tier."""
+        if self.directory is None:
+            return
+        path = self._path(version, source)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(handle, "wb") as temporary_file:
+            temporary_file.write(binary)
+        os.replace(temporary, path)
+
+    def _remember(self, key, binary):
+        """Store `binary` in memory tier evicting the least recently used entry."""
+        self._entries[key] = binary
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, version, source):
+        """Return cached binary for provided `version` and `source` or None."""
+        key = (_digest(version), _digest(source))
+        with self._lock:
+            binary = self._entries.get(key)
+            if binary is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return binary
+
+        binary = self._read(version, source)
+        with self._lock:
+            if binary is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, binary)
+        return binary
+
+    def put(self, version, source, binary):
+        """Store compiled `binary` for provided `version` and `source`."""
+        with self._lock:
+            self._remember((_digest(version), _digest(source)), binary)
+        self._write(version, source, binary)
+
+    def invalidate(self, version=None):
+        """Remove all entries not compiled by provided algod `version`.
+
+        All the entries are removed if `version` is None.
+        """
+        keep = None if version is None else _digest(version)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] != keep]:
+                del self._entries[key]
+        if self.directory is not None and self.directory.is_dir():
+            for path in self.directory.iterdir():
+                if path.is_dir() and path.name != keep:
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self):
+        """Return dictionary with cache counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+class ParamsCache:
+    """Cache of suggested params following the last known round of every node.
+
+    Returned params are copies with validity window moved forward to start at
+    the last round observed on the node, so the callers may change them freely.
+    Params are stale when the last known round comes within `margin` rounds of
+    the last valid round of the fetched params, or when they were fetched more
+    than `max_age` seconds ago, so they expire even if no rounds are noted.
+
+    Args:
+        margin (int): number of rounds before the end of validity window
+        max_age (float): seconds after which fetched params are stale,
+            the duration of `margin` rounds by default
+    """
+
+    def __init__(self, margin=PARAMS_REFRESH_MARGIN, max_age=None):
+        self.margin = margin
+        self.max_age = margin * ROUND_DURATION if max_age is None else max_age
+        self.hits = 0
+        self.misses = 0
+        self._params = {}
+        self._rounds = {}
+        self._fetched = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return copy of params cached for node `key` or None if they're stale."""
+        with self._lock:
+            params = self._params.get(key)
+            round_num = self._rounds.get(key, 0)
+            if (
+                params is None
+                or round_num + self.margin >= params.last
+                or time.monotonic() - self._fetched[key] > self.max_age
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+        params = copy.copy(params)
+        if round_num > params.first:
+            params.last += round_num - params.first
+            params.first = round_num
+        return params
+
+    def put(self, key, params):
+        """Store copy of `params` fetched from node `key`.
+
+        Last known round is reset if the genesis hash has changed.
+        """
+        with self._lock:
+            cached = self._params.get(key)
+            if cached is None or cached.gh != params.gh:
+                self._rounds[key] = params.first
+            else:
+                self._rounds[key] = max(self._rounds[key], params.first)
+            self._params[key] = copy.copy(params)
+            self._fetched[key] = time.monotonic()
+
+    def note_round(self, key, round_num):
+        """Remember `round_num` observed on node `key` if it's the latest one."""
+        with self._lock:
+            if round_num and round_num > self._rounds.get(key, 0):
+                self._rounds[key] = round_num
+
+    def invalidate(self, key=None):
+        """Remove params of node `key` or of all the nodes if `key` is None."""
+        with self._lock:
+            for cached_key in [key] if key is not None else list(self._params):
+                self._params.pop(cached_key, None)
+
+    def stats(self):
+        """Return dictionary with cache counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
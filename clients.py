@@ -0,0 +1,253 @@
+"""Module containing shared Algorand node clients with keep-alive connections."""
+
+import http.client
+import json
+import os
+import queue
+import threading
+from urllib import parse
+
+from algosdk import constants, error, kmd
+from algosdk.v2client import algod, indexer
+
+SANDBOX_TOKEN = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+DEFAULT_CONFIG = {
+    "ALGOD_ADDRESS": "http://localhost:4001",
+    "ALGOD_TOKEN": SANDBOX_TOKEN,
+    "INDEXER_ADDRESS": "http://localhost:8980",
+    "INDEXER_TOKEN": SANDBOX_TOKEN,
+    "KMD_ADDRESS": "http://localhost:4002",
+    "KMD_TOKEN": SANDBOX_TOKEN,
+    "KMD_WALLET": "unencrypted-default-wallet",
+}
+POOL_SIZE = 8
+REQUEST_TIMEOUT = 60
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+NODE_ERRORS = (  # failed requests and malformed responses worth retrying
+    OSError,
+    ValueError,
+    http.client.HTTPException,
+    error.AlgodHTTPError,
+    error.AlgodResponseError,
+    error.IndexerHTTPError,
+)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+## CONFIGURATION
+def client_config(name):
+    """Return configuration value `name` from environment or its default value."""
+    return os.environ.get(name) or DEFAULT_CONFIG[name]
+
+
+## CONNECTIONS
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections to a single node.
+
+    Args:
+        address (str): node's base URL like `http://localhost:4001`
+        maxsize (int): maximum number of idle connections kept open
+        timeout (int): socket timeout in seconds
+        label (str): name of the node's service used in reports
+    """
+
+    def __init__(self, address, maxsize=POOL_SIZE, timeout=REQUEST_TIMEOUT, label=None):
+        parsed = parse.urlsplit(address)
+        self.label = label or parsed.netloc
+        self.scheme = parsed.scheme or "http"
+        self.netloc = parsed.netloc
+        self.prefix = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=maxsize)
+
+    def _connect(self):
+        """Create and return new connection to the node."""
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _acquire(self):
+        """Return idle connection from the pool or a new one if there's none."""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, connection):
+        """Return `connection` to the pool or close it if the pool is full."""
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """Send request and return two-tuple of response status and body.
+
+        Request is repeated once on a new connection if reused connection
+        has been closed by the node in the meantime. Requests of methods other
+        than IDEMPOTENT_METHODS are repeated only if they weren't sent at all,
+        so a transaction accepted by the node isn't submitted twice.
+        """
+        connection, reused = self._acquire()
+        while True:
+            sent = False
+            try:
+                connection.request(method, self.prefix + path, body, headers or {})
+                sent = True
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+                connection, reused = self._connect(), False
+                continue
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            return response.status, data
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def request_path(requrl, params):
+    """Return versioned request path with encoded query `params`."""
+    if requrl not in constants.unversioned_paths:
+        requrl = algod.api_version_path_prefix + requrl
+    if params:
+        requrl = requrl + "?" + parse.urlencode(params)
+    return requrl
+
+
+def error_message(data):
+    """Return error message parsed from node's response body."""
+    message = data.decode("utf-8")
+    try:
+        return json.loads(message)["message"]
+    except (ValueError, KeyError, TypeError):
+        return message
+
+
+## CLIENTS
+class PooledAlgodClient(algod.AlgodClient):
+    """Algod client sending requests through a pool of keep-alive connections."""
+
+    def __init__(self, algod_token, algod_address, headers=None):
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = ConnectionPool(algod_address, label="algod")
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+    ):
+        """Execute a given request through the connection pool."""
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        status, body = self.pool.request(
+            method, request_path(requrl, params), data, header
+        )
+        if status >= 400:
+            raise error.AlgodHTTPError(error_message(body), status)
+        if response_format == "json":
+            try:
+                return json.loads(body)
+            except Exception as e:
+                raise error.AlgodResponseError(
+                    "Failed to parse JSON response from algod"
+                ) from e
+        return body
+
+
+def _sorted_dict(dictionary):
+    """Return `dictionary` with recursively sorted keys like the SDK does."""
+    return {
+        key: _sorted_dict(value) if isinstance(value, dict) else value
+        for key, value in sorted(dictionary.items())
+    }
+
+
+class PooledIndexerClient(indexer.IndexerClient):
+    """Indexer client sending requests through a pool of keep-alive connections."""
+
+    def __init__(self, indexer_token, indexer_address, headers=None):
+        super().__init__(indexer_token, indexer_address, headers)
+        self.pool = ConnectionPool(indexer_address, label="indexer")
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None):
+        """Execute a given request through the connection pool."""
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if (requrl not in constants.no_auth) and self.indexer_token:
+            header.update({constants.indexer_auth_header: self.indexer_token})
+
+        status, body = self.pool.request(
+            method, request_path(requrl, params), data, header
+        )
+        if status >= 400:
+            raise error.IndexerHTTPError(error_message(body))
+        return _sorted_dict(json.loads(body.decode("utf-8")))
+
+
+def _shared_client(client_class, token_name, address_name):
+    """Return client shared by all the threads of the current process.
+
+    Clients are keyed by process id, so every pytest-xdist worker and every
+    forked process gets its own connection pool.
+    """
+    token, address = client_config(token_name), client_config(address_name)
+    key = (os.getpid(), client_class, token, address)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = client_class(token, address)
+                _clients[key] = client
+    return client
+
+
+def algod_client():
+    """Return shared pooled Algod client configured from environment."""
+    return _shared_client(PooledAlgodClient, "ALGOD_TOKEN", "ALGOD_ADDRESS")
+
+
+def indexer_client():
+    """Return shared pooled Indexer client configured from environment."""
+    return _shared_client(PooledIndexerClient, "INDEXER_TOKEN", "INDEXER_ADDRESS")
+
+
+def kmd_client():
+    """Return shared kmd client configured from environment."""
+    return _shared_client(kmd.KMDClient, "KMD_TOKEN", "KMD_ADDRESS")
+
+
+def close_clients():
+    """Close connections of all the shared clients and forget them."""
+    with _clients_lock:
+        for client in _clients.values():
+            if hasattr(client, "pool"):
+                client.pool.close()
+        _clients.clear()
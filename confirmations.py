@@ -0,0 +1,220 @@
+"""Module containing waiter tracking confirmations of many transactions at once."""
+
+import threading
+import weakref
+from collections import namedtuple
+from concurrent.futures import Future
+
+from algosdk.error import AlgodHTTPError
+
+from clients import NODE_ERRORS
+
+CONFIRMED = "confirmed"
+POOL_ERROR = "pool-error"
+DROPPED = "dropped"
+TIMEOUT = "timeout"
+REJECTED = "rejected"  # refused by the node on submission
+RETRY_DELAY = 0.05
+RETRY_MAX_DELAY = 1
+
+Confirmation = namedtuple(
+    "Confirmation", ["transaction_id", "status", "round", "pool_error", "info"]
+)
+
+_waiters = weakref.WeakKeyDictionary()
+_waiters_lock = threading.Lock()
+
+
+def pending_outcome(info):
+    """Return two-tuple of status and pending `info` or None if it's pending."""
+    if info.get("confirmed-round", 0) > 0:
+        return CONFIRMED, info
+    if info.get("pool-error"):
+        return POOL_ERROR, info
+    return None
+
+
+class WatchedTransactions:
+    """Watched transactions and their expiry shared by the confirmation waiters.
+
+    Timeout of the watch starts in the round after the one in which the loop
+    sees it for the first time.  Last round is forgotten whenever there's
+    nothing left to watch, so the loop retrieves the current round from node's
+    status before it starts following the rounds again.
+
+    Args:
+        timeout (int): default maximum number of rounds to wait for transaction
+    """
+
+    def __init__(self, timeout=4):
+        self.timeout = timeout
+        self.last_round = None
+        self._pending = {}
+
+    def _add(self, transaction_id, future, timeout=None):
+        """Start watching transaction resolving provided `future`."""
+        rounds = self.timeout if timeout is None else timeout
+        self._pending.setdefault(transaction_id, []).append([future, rounds, None])
+
+    def _resolve(self, transaction_id, status, info=None):
+        """Resolve all the futures of transaction with provided outcome."""
+        info = info or {}
+        confirmation = Confirmation(
+            transaction_id,
+            status,
+            info.get("confirmed-round"),
+            info.get("pool-error") or None,
+            info,
+        )
+        for future, _, _ in self._pending.pop(transaction_id, []):
+            if not future.done():
+                future.set_result(confirmation)
+
+    def _expire(self):
+        """Resolve watches started more than their timeout rounds ago."""
+        for transaction_id, watches in list(self._pending.items()):
+            for watch in list(watches):
+                future, rounds, start_round = watch
+                if start_round is None:
+                    watch[2] = self.last_round + 1
+                elif self.last_round >= start_round + rounds:
+                    watches.remove(watch)
+                    if not future.done():
+                        future.set_result(
+                            Confirmation(transaction_id, TIMEOUT, None, None, {})
+                        )
+            if not watches:
+                del self._pending[transaction_id]
+        if not self._pending:
+            self.last_round = None
+
+    def _fail(self, exception):
+        """Fail futures of all the watched transactions with `exception`."""
+        for watches in self._pending.values():
+            for future, _, _ in watches:
+                if not future.done():
+                    future.set_exception(exception)
+        self._pending.clear()
+        self.last_round = None
+
+
+class ConfirmationWaiter(WatchedTransactions):
+    """Wait for any number of transactions behind a single round-following loop.
+
+    Loop runs in a background thread started on the first watched transaction.
+    In every round the pending information of watched transactions is retrieved
+    and their futures are resolved with `Confirmation` outcome as soon as they're
+    confirmed, rejected by the pool, dropped or timed out.
+
+    Args:
+        client (:class:`AlgodClient`): client used for retrieving information
+        timeout (int): default maximum number of rounds to wait for transaction
+    """
+
+    def __init__(self, client, timeout=4):
+        super().__init__(timeout)
+        self.client = client
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def watch(self, transaction_id, timeout=None, callback=None):
+        """Start watching transaction and return future resolved with its outcome.
+
+        Args:
+            transaction_id (str): the transaction to wait for
+            timeout (int): maximum number of rounds to wait
+            callback (callable): called with `Confirmation` when it's resolved
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(lambda done: callback(done.result()))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Confirmation waiter is closed")
+            self._add(transaction_id, future, timeout)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return future
+
+    def wait(self, transaction_ids, timeout=None):
+        """Watch provided transactions and return list of their outcomes."""
+        futures = [
+            self.watch(transaction_id, timeout) for transaction_id in transaction_ids
+        ]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Stop the loop resolving all still pending transactions as timed out."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _outcome(self, transaction_id):
+        """Return two-tuple of status and pending information or None if pending."""
+        try:
+            info = self.client.pending_transaction_info(transaction_id)
+        except AlgodHTTPError as exception:
+            return (DROPPED, None) if exception.code == 404 else None
+        except OSError:
+            return None
+        return pending_outcome(info)
+
+    def _run(self):
+        """Follow rounds failing all the watches if an unexpected error is raised.
+
+        Loop is started again by the next watched transaction.
+        """
+        try:
+            self._follow_rounds()
+        except Exception as exception:
+            with self._condition:
+                self._thread = None
+                self._fail(exception)
+
+    def _follow_rounds(self):
+        """Follow rounds while there are watched transactions.
+
+        Failed requests and malformed responses are retried with backoff.
+        """
+        delay = RETRY_DELAY
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    for transaction_id in list(self._pending):
+                        self._resolve(transaction_id, TIMEOUT)
+                    return
+                transaction_ids = list(self._pending)
+            try:
+                if self.last_round is None:
+                    self.last_round = self.client.status()["last-round"]
+                for transaction_id in transaction_ids:
+                    outcome = self._outcome(transaction_id)
+                    if outcome is not None:
+                        with self._condition:
+                            self._resolve(transaction_id, *outcome)
+                with self._condition:
+                    self._expire()
+                    if not self._pending:
+                        continue
+                status = self.client.status_after_block(self.last_round)
+                self.last_round = max(self.last_round, status["last-round"])
+                delay = RETRY_DELAY
+            except NODE_ERRORS:
+                with self._condition:
+                    self._condition.wait(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+
+
+def confirmation_waiter(client):
+    """Return confirmation waiter shared by all the users of provided `client`."""
+    with _waiters_lock:
+        waiter = _waiters.get(client)
+        if waiter is None:
+            waiter = ConfirmationWaiter(client)
+            _waiters[client] = waiter
+    return waiter
@@ -0,0 +1,91 @@
+"""Module containing pytest fixtures shared by the test modules."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import helpers
+
+
+## LOCAL NODE
+class _NodeHandler(BaseHTTPRequestHandler):
+    """Request handler of the local node recording clients' ports and hosts.
+
+    Responses are sent by the `respond` callable of the server, provided by
+    the `node_responder` fixture of the test module.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        """Suppress logging to stderr."""
+
+    def do_GET(self):
+        """Record the client and respond by the server's responder."""
+        self.server.ports.add(self.client_address[1])
+        self.server.hosts.add(self.headers["Host"])
+        self.server.requests.append((self.command, self.path))
+        self.server.respond(self)
+
+    def do_POST(self):
+        """Read request's body and respond the same way as to GET requests."""
+        self.body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.do_GET()
+
+    def send_json(self, status, response):
+        """Send `response` encoded as JSON body with provided `status`."""
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunked(self, status, chunks):
+        """Send body made of provided `chunks` by chunked transfer encoding."""
+        self.send_response(status)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture
+def node_server(node_responder):
+    """Run local HTTP node in a background thread and return the server.
+
+    Server's `address` is node's base URL, its `ports` and `hosts` hold
+    clients' ports and Host headers and `requests` holds methods and paths
+    of the received requests.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _NodeHandler)
+    server.respond = node_responder
+    server.address = "http://127.0.0.1:%s" % (server.server_address[1],)
+    server.ports = set()
+    server.hosts = set()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+## SESSION FILES
+_xdist_runs = set()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Remember id of the pytest-xdist run started by the controller."""
+    _xdist_runs.add(node.workerinput["testrunuid"])
+
+
+def pytest_sessionfinish(session):
+    """Remove files holding dispenser keys shared by the run's workers."""
+    for run_id in _xdist_runs:
+        helpers.remove_session_files(run_id)
+    _xdist_runs.clear()
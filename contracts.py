@@ -1,23 +1,62 @@
-"""Module containing domain logic for smart contracts creation."""
+"""Module containing domain logic for smart contracts creation.
 
-import json
-
-from algosdk import template
-from pyteal import Addr, And, Global, Int, Mode, Txn, TxnType, compileTeal
+PyTeal and the asyncio helpers are imported the first time they're needed,
+so importing the module doesn't pay for them.
+"""
 
+import hashlib
+import itertools
+import json
+import math
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from algosdk import constants, encoding, template
+from algosdk.error import AlgodHTTPError, TemplateInputError
+from algosdk.future.transaction import LogicSig, LogicSigTransaction, assign_group_id
+
+from confirmations import CONFIRMED, POOL_ERROR, REJECTED
 from helpers import (
-    account_balance,
+    MAX_GROUP_SIZE,
     add_standalone_account,
     create_payment_transaction,
     fund_account,
+    fund_accounts,
     process_logic_sig_transaction,
     process_transactions,
     logic_signature,
+    percentile,
+    send_logic_sig_transaction,
+    send_transactions,
     suggested_params,
-    transaction_info,
+    watch_confirmation,
 )
+from teal import Program, assemble, evaluate_many
 
 BANK_ACCOUNT_FEE = 1000
+PIPELINE_DEPTH = 32
+SPLIT_RATIO_ERROR = "ratio"
+SPLIT_MIN_PAY_ERROR = "min_pay"
+SPLIT_MAX_FEE_ERROR = "max_fee"
+SPLIT_REGISTRY_SIZE = 4096
+LOAD_BANK = "bank"
+LOAD_SPLIT = "split"
+LOAD_ERROR = "error"
+LOAD_AMOUNT = 100000  # minimum balance of the receivers paid for the first time
+LOAD_PERCENTILES = (50, 95, 99)
+LOAD_REPORT_INTERVAL = 5
+BANK_TEMPLATE_RECEIVER = encoding.encode_address(
+    hashlib.sha256(b"bank_for_account").digest()
+)
+
+BankWithdrawal = namedtuple(
+    "BankWithdrawal", ["job", "transaction_id", "status", "round", "error"]
+)
+SplitPlan = namedtuple("SplitPlan", ["parameters", "amounts_1", "amounts_2", "errors"])
 
 
 # # BANK CONTRACT
@@ -27,6 +66,7 @@ def bank_for_account(receiver):
     Args:
         receiver (str): Base 32 Algorand address of the receiver.
     """
+    from pyteal import Addr, And, Global, Int, Txn, TxnType
 
     is_payment = Txn.type_enum() == TxnType.Payment
     is_single_tx = Global.group_size() == Int(1)
@@ -45,11 +85,124 @@ def bank_for_account(receiver):
     )
 
 
+def batch_bank_for_account(receiver):
+    """Only allow receiver to withdraw funds in groups of up to 16 withdrawals.
+
+    Every transaction of the group has to be sent from this contract account,
+    and each one enforces the same checks as `bank_for_account` contract.
+    Each withdrawal requires the next one in the group, wrapping around, to be
+    sent from the same account, so any foreign transaction follows a rejecting
+    withdrawal.
+
+    Args:
+        receiver (str): Base 32 Algorand address of the receiver.
+    """
+    from pyteal import Addr, And, Global, Gtxn, Int, Txn, TxnType
+
+    is_payment = Txn.type_enum() == TxnType.Payment
+    is_batch_size = Global.group_size() <= Int(MAX_GROUP_SIZE)
+    is_correct_receiver = Txn.receiver() == Addr(receiver)
+    no_close_out_addr = Txn.close_remainder_to() == Global.zero_address()
+    no_rekey_addr = Txn.rekey_to() == Global.zero_address()
+    acceptable_fee = Txn.fee() <= Int(BANK_ACCOUNT_FEE)
+    next_index = (Txn.group_index() + Int(1)) % Global.group_size()
+    same_sender = Gtxn[next_index].sender() == Txn.sender()
+
+    return And(
+        is_payment,
+        is_batch_size,
+        is_correct_receiver,
+        no_close_out_addr,
+        no_rekey_addr,
+        acceptable_fee,
+        same_sender,
+    )
+
+
+@lru_cache(maxsize=None)
+def _bank_template_source(contract=bank_for_account):
+    """Return TEAL source of bank `contract` having placeholder receiver."""
+    from pyteal import Mode, compileTeal
+
+    return compileTeal(
+        contract(BANK_TEMPLATE_RECEIVER),
+        mode=Mode.Signature,
+        version=3,
+    )
+
+
+def _bank_template_offset(program):
+    """Return offset of receiver placeholder in compiled bank template `program`."""
+    placeholder = encoding.decode_address(BANK_TEMPLATE_RECEIVER)
+    offset = program.find(placeholder)
+    if offset < 0 or program.find(placeholder, offset + 1) >= 0:
+        raise ValueError("Bank template must contain exactly one receiver placeholder")
+    return offset
+
+
+def bank_template(contract=bank_for_account):
+    """Return compiled bank contract template and offset of receiver placeholder.
+
+    Template is compiled only once, afterwards it's retrieved from compile cache.
+
+    Args:
+        contract (function): `bank_for_account` or `batch_bank_for_account`
+    """
+    program = logic_signature(_bank_template_source(contract)).logic
+    return program, _bank_template_offset(program)
+
+
+async def bank_template_async():
+    """Return compiled bank contract template and offset of receiver placeholder."""
+    from helpers_async import logic_signature_async
+
+    program = (await logic_signature_async(_bank_template_source())).logic
+    return program, _bank_template_offset(program)
+
+
+def bank_program(receiver, bank_template_=None):
+    """Return bank contract bytecode for `receiver` patched into compiled template.
+
+    Args:
+        receiver (str): Base 32 Algorand address of the receiver.
+        bank_template_ (tuple): two-tuple returned by `bank_template`
+    """
+    program, offset = bank_template_ or bank_template()
+    return template.inject(program, [offset], [receiver], ["address"])
+
+
+@lru_cache(maxsize=None)
+def _offline_bank_template():
+    """Return locally assembled bank contract template and receiver offset."""
+    program = assemble(_bank_template_source())
+    return program, _bank_template_offset(program)
+
+
+def offline_bank_program(receiver):
+    """Return decoded bank contract of `receiver` assembled without network."""
+    return Program(bank_program(receiver, _offline_bank_template()))
+
+
+def evaluate_bank_transactions(receiver, transactions, group=None, trace=False):
+    """Evaluate bank contract of `receiver` for `transactions` without network.
+
+    Contract is assembled locally and decoded only once for all the transactions.
+    Returns list of :class:`teal.EvalResult` instances carrying pass/reject verdict,
+    failing opcode and cost trace for every provided transaction.
+    """
+    program = offline_bank_program(receiver)
+    return evaluate_many(program, transactions, group=group, trace=trace)
+
+
+def bank_logic_signatures(receivers):
+    """Return list of bank contract logic signatures for provided `receivers`."""
+    bank_template_ = bank_template()
+    return [LogicSig(bank_program(receiver, bank_template_)) for receiver in receivers]
+
+
 def create_bank_transaction(logic_sig, escrow_address, receiver, amount, fee=1000):
     """Create bank transaction with provided amount."""
-    params = suggested_params()
-    params.fee = fee
-    params.flat_fee = True
+    params = suggested_params(fee=fee, flat_fee=True)
     payment_transaction = create_payment_transaction(
         escrow_address, params, receiver, amount
     )
@@ -57,25 +210,222 @@ def create_bank_transaction(logic_sig, escrow_address, receiver, amount, fee=100
     return transaction_id
 
 
+def _submit_bank_job(job):
+    """Send bank withdrawal described by `job` and return its transaction id."""
+    logic_sig, escrow_address, receiver, amount, fee = job
+    payment_transaction = create_payment_transaction(
+        escrow_address, suggested_params(fee=fee, flat_fee=True), receiver, amount
+    )
+    return send_logic_sig_transaction(logic_sig, payment_transaction)
+
+
+def pipeline_bank_transactions(jobs, depth=PIPELINE_DEPTH):
+    """Submit bank withdrawals keeping up to `depth` of them in flight.
+
+    Every job is `(logic_sig, escrow_address, receiver, amount, fee)` tuple.
+    Jobs are submitted while the earlier ones are pending and their results
+    are yielded as :class:`BankWithdrawal` in completion order. Withdrawals
+    refused by the node are yielded immediately with REJECTED status.
+    """
+    jobs = iter(jobs)
+    in_flight = {}
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < depth:
+            job = next(jobs, None)
+            if job is None:
+                exhausted = True
+                break
+            try:
+                transaction_id = _submit_bank_job(job)
+            except AlgodHTTPError as exception:
+                yield BankWithdrawal(job, None, REJECTED, None, str(exception))
+                continue
+            in_flight[watch_confirmation(transaction_id)] = (job, transaction_id)
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            job, transaction_id = in_flight.pop(future)
+            confirmation = future.result()
+            yield BankWithdrawal(
+                job,
+                transaction_id,
+                confirmation.status,
+                confirmation.round,
+                confirmation.pool_error,
+            )
+
+
+def sign_bank_transactions(
+    logic_sig, escrow_address, receiver, amounts, params=None, fee=BANK_ACCOUNT_FEE
+):
+    """Yield bank withdrawals of provided amounts signed by contract's logic.
+
+    Withdrawals are built offline with the same params, fetched only once if
+    they aren't provided, and note of every withdrawal carries its index, so
+    equal amounts don't produce equal transactions.
+    """
+    params = params or suggested_params(fee=fee, flat_fee=True)
+    for index, amount in enumerate(amounts):
+        payment_transaction = create_payment_transaction(
+            escrow_address, params, receiver, amount
+        )
+        payment_transaction.note = str(index).encode()
+        yield LogicSigTransaction(payment_transaction, logic_sig)
+
+
+async def create_bank_transaction_async(
+    logic_sig, escrow_address, receiver, amount, fee=1000
+):
+    """Create bank transaction with provided amount without blocking the loop."""
+    from helpers_async import (
+        process_logic_sig_transaction_async,
+        suggested_params_async,
+    )
+
+    params = await suggested_params_async(fee=fee, flat_fee=True)
+    payment_transaction = create_payment_transaction(
+        escrow_address, params, receiver, amount
+    )
+    return await process_logic_sig_transaction_async(logic_sig, payment_transaction)
+
+
 def setup_bank_contract(**kwargs):
     """Initialize and return bank contract for provided receiver."""
     receiver = kwargs.pop("receiver", add_standalone_account()[1])
 
-    teal_source = compileTeal(
-        bank_for_account(receiver),
-        mode=Mode.Signature,
-        version=3,
-    )
-    logic_sig = logic_signature(teal_source)
+    logic_sig = LogicSig(bank_program(receiver))
+    escrow_address = logic_sig.address()
+    fund_account(escrow_address)
+    return logic_sig, escrow_address, receiver
+
+
+def setup_batch_bank_contract(**kwargs):
+    """Initialize and return batch bank contract for provided receiver."""
+    receiver = kwargs.pop("receiver", add_standalone_account()[1])
+
+    logic_sig = LogicSig(bank_program(receiver, bank_template(batch_bank_for_account)))
     escrow_address = logic_sig.address()
     fund_account(escrow_address)
     return logic_sig, escrow_address, receiver
 
 
+def create_bank_group_transaction(
+    logic_sig, escrow_address, receiver, amounts, fee=1000
+):
+    """Create atomic group of batch bank withdrawals with provided amounts.
+
+    Note of every withdrawal carries its index, so equal amounts don't produce
+    equal transactions. The group is confirmed by a single wait.
+    Returns list of transaction ids in the order of provided amounts.
+    """
+    if not 0 < len(amounts) <= MAX_GROUP_SIZE:
+        raise ValueError(
+            "Group must have between 1 and %s withdrawals" % (MAX_GROUP_SIZE,)
+        )
+    params = suggested_params(fee=fee, flat_fee=True)
+    payment_transactions = []
+    for index, amount in enumerate(amounts):
+        payment_transaction = create_payment_transaction(
+            escrow_address, params, receiver, amount
+        )
+        payment_transaction.note = str(index).encode()
+        payment_transactions.append(payment_transaction)
+    assign_group_id(payment_transactions)
+    transactions = [
+        LogicSigTransaction(payment_transaction, logic_sig)
+        for payment_transaction in payment_transactions
+    ]
+    process_transactions(transactions)
+    return [transaction.get_txid() for transaction in transactions]
+
+
+async def setup_bank_contract_async(**kwargs):
+    """Initialize and return bank contract for provided receiver."""
+    from helpers_async import fund_account_async
+
+    receiver = kwargs.pop("receiver", add_standalone_account()[1])
+
+    logic_sig = LogicSig(bank_program(receiver, await bank_template_async()))
+    escrow_address = logic_sig.address()
+    await fund_account_async(escrow_address)
+    return logic_sig, escrow_address, receiver
+
+
 # # SPLIT CONTRACT
-def _create_grouped_transactions(split_contract, amount):
+def plan_split_transactions(amounts, parameters, fee=constants.min_txn_fee):
+    """Return list of `SplitPlan` for every combination of amounts and parameters.
+
+    Every item of `parameters` is `(rat_1, rat_2, min_pay, max_fee)` tuple and
+    its plan holds columns aligned with `amounts`: amounts paid to receivers and
+    None for the amounts that can be split, or zeros and the reason why they can't.
+    Amounts are validated the same way `template.Split` does it, with `fee` being
+    the fee of each of the two split transactions.
+    """
+    amounts = list(amounts)
+    plans = []
+    for rat_1, rat_2, min_pay, max_fee in parameters:
+        gcd = math.gcd(rat_1, rat_2)
+        part_1, total = rat_1 // gcd, (rat_1 + rat_2) // gcd
+        fee_error = SPLIT_MAX_FEE_ERROR if fee > max_fee else None
+        quotients = [divmod(amount, total) for amount in amounts]
+        errors = [
+            (
+                SPLIT_RATIO_ERROR
+                if remainder
+                else SPLIT_MIN_PAY_ERROR if quotient * part_1 < min_pay else fee_error
+            )
+            for quotient, remainder in quotients
+        ]
+        amounts_1 = [
+            0 if error else quotient * part_1
+            for (quotient, _), error in zip(quotients, errors)
+        ]
+        amounts_2 = [
+            0 if error else amount - amount_1
+            for amount, amount_1, error in zip(amounts, amounts_1, errors)
+        ]
+        plans.append(
+            SplitPlan((rat_1, rat_2, min_pay, max_fee), amounts_1, amounts_2, errors)
+        )
+    return plans
+
+
+def split_error_message(error, parameters):
+    """Return `template.Split` error message for plan's `error` and `parameters`."""
+    rat_1, rat_2, min_pay, max_fee = parameters
+    gcd = math.gcd(rat_1, rat_2)
+    return {
+        SPLIT_RATIO_ERROR: (
+            "the specified amount cannot be split into two parts with the ratio "
+            "%s/%s" % (rat_1 // gcd, rat_2 // gcd)
+        ),
+        SPLIT_MIN_PAY_ERROR: (
+            "the amount paid to receiver_1 must be greater than %s" % (min_pay,)
+        ),
+        SPLIT_MAX_FEE_ERROR: (
+            "the transaction fee should not be greater than %s" % (max_fee,)
+        ),
+    }[error]
+
+
+def _check_split_amount(split_contract, amount):
+    """Raise `TemplateInputError` if `amount` can't be split by the contract."""
+    parameters = (
+        split_contract.rat_1,
+        split_contract.rat_2,
+        split_contract.min_pay,
+        split_contract.max_fee,
+    )
+    error = plan_split_transactions([amount], [parameters])[0].errors[0]
+    if error is not None:
+        raise TemplateInputError(split_error_message(error, parameters))
+
+
+def _create_grouped_transactions(split_contract, amount, params=None):
     """Create grouped transactions for the provided `split_contract` and `amount`."""
-    params = suggested_params()
+    params = params or suggested_params()
     return split_contract.get_split_funds_transaction(
         split_contract.get_program(),
         amount,
@@ -86,6 +436,42 @@ def _create_grouped_transactions(split_contract, amount):
     )
 
 
+class SplitContract(template.Split):
+    """Split template building its program and escrow address only once.
+
+    Instances are shared by the registry, so they shouldn't be changed.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._program = None
+        self._address = None
+
+    def get_program(self):
+        """Return program bytes built on the first call."""
+        if self._program is None:
+            self._program = super().get_program()
+        return self._program
+
+    def get_address(self):
+        """Return escrow address computed on the first call."""
+        if self._address is None:
+            self._address = super().get_address()
+        return self._address
+
+
+@lru_cache(maxsize=SPLIT_REGISTRY_SIZE)
+def _registered_split_contract(
+    owner, receiver_1, receiver_2, rat_1, rat_2, expiry_round, min_pay, max_fee
+):
+    """Return split contract for provided parameters memoized in LRU registry."""
+    split_contract = SplitContract(
+        owner, receiver_1, receiver_2, rat_1, rat_2, expiry_round, min_pay, max_fee
+    )
+    split_contract.get_address()
+    return split_contract
+
+
 def _create_split_contract(
     owner,
     receiver_1,
@@ -96,19 +482,65 @@ def _create_split_contract(
     min_pay=3000,
     max_fee=2000,
 ):
-    """Create and return split template instance from the provided arguments."""
-    return template.Split(
+    """Create and return split template instance from the provided arguments.
+
+    Contracts are kept in the registry keyed by all the arguments, so program
+    and escrow address are built only once for the same arguments.
+    """
+    return _registered_split_contract(
         owner, receiver_1, receiver_2, rat_1, rat_2, expiry_round, min_pay, max_fee
     )
 
 
+def split_contracts(parameters):
+    """Return list of split contracts for provided parameters.
+
+    Every item of `parameters` is a tuple of `_create_split_contract` arguments
+    `(owner, receiver_1, receiver_2, rat_1, rat_2, expiry_round, min_pay, max_fee)`
+    where the trailing arguments may be omitted.
+    """
+    return [_create_split_contract(*arguments) for arguments in parameters]
+
+
+def split_registry_info():
+    """Return hits, misses, maximum and current size of split contracts registry."""
+    return _registered_split_contract.cache_info()
+
+
 def create_split_transaction(split_contract, amount):
-    """Create transaction with provided amount for provided split contract."""
+    """Create transaction with provided amount for provided split contract.
+
+    Amount is validated before the network is accessed.
+    """
+    _check_split_amount(split_contract, amount)
     transactions = _create_grouped_transactions(split_contract, amount)
     transaction_id = process_transactions(transactions)
     return transaction_id
 
 
+def sign_split_transactions(split_contract, amounts, params=None):
+    """Yield split groups of provided amounts signed by contract's logic.
+
+    Amounts are validated and groups are built offline with the same params,
+    fetched only once if they aren't provided.
+    """
+    params = params or suggested_params()
+    for amount in amounts:
+        _check_split_amount(split_contract, amount)
+        yield _create_grouped_transactions(split_contract, amount, params)
+
+
+async def create_split_transaction_async(split_contract, amount):
+    """Create transaction with provided amount without blocking the loop."""
+    from helpers_async import process_transactions_async, suggested_params_async
+
+    _check_split_amount(split_contract, amount)
+    transactions = _create_grouped_transactions(
+        split_contract, amount, await suggested_params_async()
+    )
+    return await process_transactions_async(transactions)
+
+
 def setup_split_contract(**kwargs):
     """Initialize and return split contract instance based on provided named arguments."""
     owner = kwargs.pop("owner", add_standalone_account()[1])
@@ -121,50 +553,233 @@ def setup_split_contract(**kwargs):
     return split_contract
 
 
-if __name__ == "__main__":
-    """Example usage for contracts."""
+def setup_split_contracts(parameters, initial_funds=1000000000):
+    """Initialize split contracts for provided parameters and fund their escrows.
+
+    Escrows of all the contracts are funded by atomic groups awaited at once.
+    """
+    contracts = split_contracts(parameters)
+    escrows = dict.fromkeys(
+        split_contract.get_address() for split_contract in contracts
+    )
+    fund_accounts([(escrow_address, initial_funds) for escrow_address in escrows])
+    return contracts
 
-    _, local_receiver = add_standalone_account()
-    amount = 5000000
-    logic_sig, escrow_address, receiver = setup_bank_contract(receiver=local_receiver)
-    assert receiver == local_receiver
 
-    transaction_id = create_bank_transaction(
-        logic_sig, escrow_address, local_receiver, amount
+async def setup_split_contract_async(**kwargs):
+    """Initialize and return split contract instance without blocking the loop."""
+    from helpers_async import fund_account_async
+
+    owner = kwargs.pop("owner", add_standalone_account()[1])
+    receiver_1 = kwargs.pop("receiver_1", add_standalone_account()[1])
+    receiver_2 = kwargs.pop("receiver_2", add_standalone_account()[1])
+
+    split_contract = _create_split_contract(owner, receiver_1, receiver_2, **kwargs)
+    await fund_account_async(split_contract.get_address())
+    return split_contract
+
+
+# # LOAD GENERATION
+class LoadStats:
+    """Thread-safe outcome counters and confirmation latencies of generated load."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statuses = Counter()
+        self.latencies = []
+
+    def add(self, status, latency=None):
+        """Record operation's outcome `status` and its latency in seconds."""
+        with self._lock:
+            self.statuses[status] += 1
+            if latency is not None and status == CONFIRMED:
+                self.latencies.append(latency)
+
+    def report(self, elapsed):
+        """Return dictionary reporting throughput, latencies and failure rates."""
+        with self._lock:
+            statuses = dict(self.statuses)
+            latencies = [latency * 1000 for latency in self.latencies]
+        total = sum(statuses.values())
+        report = {
+            "elapsed": elapsed,
+            "operations": total,
+            "tps": statuses.get(CONFIRMED, 0) / elapsed if elapsed else 0.0,
+            "rejection_rate": statuses.get(REJECTED, 0) / total if total else 0.0,
+            "pool_error_rate": statuses.get(POOL_ERROR, 0) / total if total else 0.0,
+            "statuses": statuses,
+        }
+        for percent in LOAD_PERCENTILES:
+            report["p%s" % (percent,)] = percentile(latencies, percent)
+        return report
+
+
+def setup_load_contracts(count, initial_funds=1000000000):
+    """Create `count` bank and `count` split contracts and fund all their escrows.
+
+    Returns list of load operations as `(kind, contract)` two-tuples with bank
+    contracts being `(logic_sig, escrow_address, receiver)` tuples.
+    """
+    receivers = [add_standalone_account()[1] for _ in range(count)]
+    banks = [
+        (logic_sig, logic_sig.address(), receiver)
+        for logic_sig, receiver in zip(bank_logic_signatures(receivers), receivers)
+    ]
+    splits = split_contracts(
+        [tuple(add_standalone_account()[1] for _ in range(3)) for _ in range(count)]
     )
-    print("amount: %s" % (amount,))
-    print("escrow: %s" % (escrow_address))
-    print("balance_escrow: %s" % (account_balance(escrow_address),))
-    print("balance_receiver: %s" % (account_balance(local_receiver),))
-    print(json.dumps(transaction_info(transaction_id), indent=2))
+    escrows = [escrow_address for _, escrow_address, _ in banks] + [
+        split_contract.get_address() for split_contract in splits
+    ]
+    fund_accounts([(escrow_address, initial_funds) for escrow_address in escrows])
+    operations = []
+    for bank, split_contract in zip(banks, splits):
+        operations += [(LOAD_BANK, bank), (LOAD_SPLIT, split_contract)]
+    return operations
 
-    print("\n\n")
 
-    _, local_owner = add_standalone_account()
-    _, local_receiver_2 = add_standalone_account()
-    amount = 5000000
+def _submit_load_operation(operation, sequence):
+    """Send operation's transactions without waiting and return transaction id.
 
-    split_contract = setup_split_contract(
-        owner=local_owner,
-        receiver_2=local_receiver_2,
-        rat_1=3,
-        rat_2=7,
+    Amounts grow with `sequence`, so repeated operations aren't duplicates.
+    """
+    kind, contract = operation
+    if kind == LOAD_BANK:
+        logic_sig, escrow_address, receiver = contract
+        return _submit_bank_job(
+            (
+                logic_sig,
+                escrow_address,
+                receiver,
+                LOAD_AMOUNT + sequence,
+                BANK_ACCOUNT_FEE,
+            )
+        )
+    amount = (contract.rat_1 + contract.rat_2) * (LOAD_AMOUNT + sequence)
+    return send_transactions(_create_grouped_transactions(contract, amount))
+
+
+def _run_load_operation(operation, sequence, stats):
+    """Submit operation, wait for its confirmation and record the outcome."""
+    start = time.perf_counter()
+    try:
+        transaction_id = _submit_load_operation(operation, sequence)
+    except AlgodHTTPError:
+        stats.add(REJECTED)
+        return
+    confirmation = watch_confirmation(transaction_id).result()
+    stats.add(confirmation.status, time.perf_counter() - start)
+
+
+def generate_load(
+    operations,
+    rate,
+    duration,
+    concurrency=PIPELINE_DEPTH,
+    report=None,
+    report_interval=LOAD_REPORT_INTERVAL,
+):
+    """Drive `operations` in turns at `rate` per second for `duration` seconds.
+
+    Operations are started on schedule while fewer than `concurrency` of them
+    are in flight, so the achieved rate falls below the target one when the
+    node can't keep up. Callable `report` is called with `LoadStats` report
+    every `report_interval` seconds and the final report is returned after
+    all the operations in flight are finished.
+    """
+    stats = LoadStats()
+    slots = threading.BoundedSemaphore(concurrency)
+    operations = itertools.cycle(operations)
+    start = time.monotonic()
+    next_report = start + report_interval
+
+    def finished(future):
+        """Free the slot of finished operation and record its failure."""
+        slots.release()
+        if future.exception() is not None:
+            stats.add(LOAD_ERROR)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        sequence = 0
+        while True:
+            now = time.monotonic()
+            if now >= start + duration:
+                break
+            if report is not None and now >= next_report:
+                report(stats.report(now - start))
+                next_report += report_interval
+            deadlines = [start + sequence / rate, start + duration]
+            if report is not None:
+                deadlines.append(next_report)
+            wait_until = min(deadlines)
+            if wait_until > now:
+                time.sleep(wait_until - now)
+                continue
+            if not slots.acquire(timeout=start + duration - now):
+                continue
+            future = executor.submit(
+                _run_load_operation, next(operations), sequence, stats
+            )
+            future.add_done_callback(finished)
+            sequence += 1
+    return stats.report(time.monotonic() - start)
+
+
+def _format_load_report(report):
+    """Return single line summary of provided load `report`."""
+    latencies = " ".join(
+        "p%s=%.0fms" % (percent, report["p%s" % (percent,)] or 0)
+        for percent in LOAD_PERCENTILES
+    )
+    return "%6.1fs ops=%d tps=%.1f %s rejected=%.1f%% pool_errors=%.1f%%" % (
+        report["elapsed"],
+        report["operations"],
+        report["tps"],
+        latencies,
+        report["rejection_rate"] * 100,
+        report["pool_error_rate"] * 100,
     )
-    assert split_contract.owner == local_owner
-    assert split_contract.receiver_2 == local_receiver_2
 
-    transaction_id = create_split_transaction(split_contract, amount)
 
-    print("amount: %s" % (amount,))
+def main(args=None):
+    """Set up escrows and generate load configured by command line `args`."""
+    import argparse
 
-    print("escrow: %s" % (split_contract.get_address(),))
-    print("balance_escrow: %s" % (account_balance(split_contract.get_address()),))
-    print("owner: %s" % (split_contract.owner,))
-    print("balance_owner: %s" % (account_balance(split_contract.owner),))
-    print("receiver_1: %s" % (split_contract.receiver_1,))
-    print("balance_1: %s" % (account_balance(split_contract.receiver_2),))
-    print(
-        "receiver_2: %s" % (split_contract.receiver_2),
+    parser = argparse.ArgumentParser(
+        description="Generate sustained bank and split contracts traffic."
     )
-    print("balance_2: %s" % (account_balance(split_contract.receiver_2),))
-    print(json.dumps(transaction_info(transaction_id), indent=2))
+    parser.add_argument("--escrows", type=int, default=4, help="escrows of each kind")
+    parser.add_argument("--rate", type=float, default=20, help="operations per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=PIPELINE_DEPTH)
+    parser.add_argument("--report-interval", type=float, default=LOAD_REPORT_INTERVAL)
+    parser.add_argument(
+        "--fake-node", action="store_true", help="run against in-memory fake node"
+    )
+    arguments = parser.parse_args(args)
+
+    node = None
+    if arguments.fake_node:
+        from fakenode import FakeNode
+
+        node = FakeNode(block_interval=1).start().configure()
+    try:
+        operations = setup_load_contracts(arguments.escrows)
+        report = generate_load(
+            operations,
+            arguments.rate,
+            arguments.duration,
+            arguments.concurrency,
+            lambda report: print(_format_load_report(report), flush=True),
+            arguments.report_interval,
+        )
+    finally:
+        if node is not None:
+            node.stop()
+    print(_format_load_report(report))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,825 @@
+"""Module containing in-memory Algorand node serving algod and indexer endpoints.
+
+The node keeps its ledger in memory and serves the REST endpoints used by the
+helpers, so the tests can run without Algorand Sandbox and without network.
+Submitted transactions are validated the way algod does it for payments: their
+signatures are verified, logic signatures are evaluated by the offline evaluator
+from :mod:`teal`, and fees, validity windows, balances and groups are checked.
+"""
+
+import base64
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+import msgpack
+from algosdk import constants, encoding, mnemonic
+from algosdk.future.transaction import (
+    LogicSigTransaction,
+    SignedTransaction,
+    calculate_group_id,
+)
+from nacl.exceptions import BadSignatureError
+from nacl.signing import SigningKey, VerifyKey
+
+from teal import Program, TealError, assemble, evaluate
+
+GENESIS_ID = "fakenode-v1"
+GENESIS_HASH = base64.b64encode(hashlib.sha256(GENESIS_ID.encode()).digest()).decode()
+GENESIS_FUNDS = 10**16
+MIN_TXN_FEE = 1000
+MIN_BALANCE = 100000
+MAX_TXN_LIFE = 1000
+MAX_GROUP_SIZE = 16
+WAIT_FOR_BLOCK_TIMEOUT = 60
+NODE_TOKEN = "a" * 64
+ADDRESS_FIELDS = {"snd", "rcv", "close", "rekey", "sgnr"}
+
+
+def _genesis_account():
+    """Return two-tuple of the genesis account's private key and address.
+
+    The account is derived from genesis id, so all the nodes started by the
+    pytest-xdist workers of a run share the same funding account.
+    """
+    signing_key = SigningKey(hashlib.sha256(b"genesis " + GENESIS_ID.encode()).digest())
+    public_key = bytes(signing_key.verify_key)
+    private_key = base64.b64encode(bytes(signing_key) + public_key).decode()
+    return private_key, encoding.encode_address(public_key)
+
+
+GENESIS_PRIVATE_KEY, GENESIS_ADDRESS = _genesis_account()
+
+
+class NodeError(Exception):
+    """Error returned by the node as JSON message with provided HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+## ENCODING
+def _json_value(value, key=None):
+    """Return msgpack decoded `value` converted to algod's JSON representation."""
+    if isinstance(value, dict):
+        return {name: _json_value(item, name) for name, item in value.items()}
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+    if isinstance(value, bytes):
+        if key in ADDRESS_FIELDS and len(value) == 32:
+            return encoding.encode_address(value)
+        return base64.b64encode(value).decode()
+    return value
+
+
+def _indexer_signature(signed):
+    """Return indexer's signature object for msgpack decoded signed transaction."""
+    if "lsig" in signed:
+        lsig = signed["lsig"]
+        logicsig = {
+            "logic": base64.b64encode(lsig["l"]).decode(),
+            "args": [base64.b64encode(arg).decode() for arg in lsig.get("arg", [])],
+        }
+        if "sig" in lsig:
+            logicsig["signature"] = base64.b64encode(lsig["sig"]).decode()
+        return {"logicsig": logicsig}
+    return {"sig": base64.b64encode(signed["sig"]).decode()}
+
+
+def _indexer_transaction(record):
+    """Return indexer shaped transaction for confirmed transaction `record`."""
+    raw = record["signed"]["txn"]
+    transaction = {
+        "id": record["id"],
+        "confirmed-round": record["confirmed-round"],
+        "round-time": record["round-time"],
+        "intra-round-offset": record["intra-round-offset"],
+        "fee": raw.get("fee", 0),
+        "first-valid": raw.get("fv", 0),
+        "last-valid": raw.get("lv", 0),
+        "genesis-hash": base64.b64encode(raw["gh"]).decode(),
+        "genesis-id": raw.get("gen", ""),
+        "sender": encoding.encode_address(raw["snd"]),
+        "tx-type": raw["type"],
+        "signature": _indexer_signature(record["signed"]),
+        "payment-transaction": {
+            "receiver": encoding.encode_address(raw.get("rcv", bytes(32))),
+            "amount": raw.get("amt", 0),
+            "close-amount": record["closing-amount"],
+        },
+    }
+    for field, name in (("grp", "group"), ("note", "note"), ("lx", "lease")):
+        if field in raw:
+            transaction[name] = base64.b64encode(raw[field]).decode()
+    if "close" in raw:
+        transaction["payment-transaction"]["close-remainder-to"] = (
+            encoding.encode_address(raw["close"])
+        )
+    if "rekey" in raw:
+        transaction["rekey-to"] = encoding.encode_address(raw["rekey"])
+    if "sgnr" in record["signed"]:
+        transaction["auth-addr"] = encoding.encode_address(record["signed"]["sgnr"])
+    return transaction
+
+
+def _dryrun_stack(stack):
+    """Return dryrun's representation of evaluator's `stack`."""
+    return [
+        (
+            {"type": 1, "bytes": base64.b64encode(value).decode(), "uint": 0}
+            if isinstance(value, bytes)
+            else {"type": 2, "bytes": "", "uint": value}
+        )
+        for value in stack
+    ]
+
+
+## LEDGER
+class Ledger:
+    """In-memory ledger of payment transactions.
+
+    Args:
+        block_interval (float): number of seconds between blocks, or None to
+            create a block for every submitted group and for every wait on the
+            next round like algod's dev mode does
+    """
+
+    def __init__(self, block_interval=None):
+        self.block_interval = block_interval
+        self.round = 0
+        self.round_time = int(time.time())
+        self.balances = {GENESIS_ADDRESS: GENESIS_FUNDS}
+        self.created = {GENESIS_ADDRESS: 0}
+        self.auth = {}
+        self.pending_balances = dict(self.balances)
+        self.pending_auth = {}
+        self.pool = []
+        self.records = {}
+        self.confirmed = []
+        self.condition = threading.Condition()
+
+    ## VALIDATION
+    def _authorize(self, signed, transaction):
+        """Raise NodeError if `signed` transaction isn't properly signed."""
+        sender = transaction.sender
+        authorizer = self.pending_auth.get(sender, sender)
+        signer = (
+            signed.auth_addr
+            if isinstance(signed, LogicSigTransaction)
+            else getattr(signed, "authorizing_address", None)
+        ) or sender
+        if signer != authorizer:
+            raise NodeError(
+                "should have been authorized by %s but was actually authorized by %s"
+                % (authorizer, signer)
+            )
+        if isinstance(signed, LogicSigTransaction):
+            if not signed.lsig.verify(encoding.decode_address(authorizer)):
+                raise NodeError("logic signature validation failed")
+            return
+        if not isinstance(signed, SignedTransaction):
+            raise NodeError("multisig transactions are not supported")
+        message = constants.txid_prefix + base64.b64decode(
+            encoding.msgpack_encode(transaction)
+        )
+        try:
+            VerifyKey(encoding.decode_address(authorizer)).verify(
+                message, base64.b64decode(signed.signature)
+            )
+        except (BadSignatureError, ValueError, TypeError):
+            raise NodeError("signature validation failed")
+
+    def _check_logic(self, signed, group):
+        """Raise NodeError if logic signature of `signed` rejects the transaction."""
+        if not isinstance(signed, LogicSigTransaction):
+            return
+        try:
+            result = evaluate(
+                Program(signed.lsig.logic),
+                signed.transaction,
+                group=group,
+                args=signed.lsig.args or (),
+            )
+        except TealError as exception:
+            raise NodeError("rejected by logic err=%s" % (exception,))
+        if not result.passed:
+            if result.error == "rejected by logic":
+                raise NodeError("rejected by logic")
+            raise NodeError("rejected by logic err=%s" % (result.error,))
+
+    def _check_group(self, transactions):
+        """Raise NodeError if `transactions` don't form a valid group."""
+        if len(transactions) > MAX_GROUP_SIZE:
+            raise NodeError("group size %s exceeds maximum" % (len(transactions),))
+        groups = {transaction.group for transaction in transactions}
+        if len(transactions) == 1 and groups == {None}:
+            return
+        if None in groups or len(groups) > 1:
+            raise NodeError("transactionGroup: incomplete group")
+        unsigned = [copy.copy(transaction) for transaction in transactions]
+        for transaction in unsigned:
+            transaction.group = None
+        if calculate_group_id(unsigned) != groups.pop():
+            raise NodeError("transactionGroup: incomplete group")
+        fees = sum(transaction.fee for transaction in transactions)
+        if fees < MIN_TXN_FEE * len(transactions):
+            raise NodeError(
+                "txgroup had %s in fees, which is less than the minimum %s * %s"
+                % (fees, len(transactions), MIN_TXN_FEE)
+            )
+
+    def _check_transaction(self, transaction, single):
+        """Raise NodeError if `transaction` can't be included in the next block."""
+        if transaction.type != constants.payment_txn:
+            raise NodeError("unsupported transaction type %s" % (transaction.type,))
+        if transaction.genesis_hash != GENESIS_HASH:
+            raise NodeError("transaction tx GenesisHash mismatch")
+        if transaction.genesis_id and transaction.genesis_id != GENESIS_ID:
+            raise NodeError(
+                "transaction tx GenesisID <%s> does not match <%s>"
+                % (transaction.genesis_id, GENESIS_ID)
+            )
+        if transaction.last_valid_round - transaction.first_valid_round > MAX_TXN_LIFE:
+            raise NodeError("transaction window size excessive")
+        next_round = self.round + 1
+        if not (
+            transaction.first_valid_round <= next_round <= transaction.last_valid_round
+        ):
+            raise NodeError(
+                "txn dead: round %s outside of %s--%s"
+                % (
+                    next_round,
+                    transaction.first_valid_round,
+                    transaction.last_valid_round,
+                )
+            )
+        if single and transaction.fee < MIN_TXN_FEE:
+            raise NodeError(
+                "transaction had fee %s, which is less than the minimum %s"
+                % (transaction.fee, MIN_TXN_FEE)
+            )
+        if transaction.get_txid() in self.records:
+            raise NodeError(
+                "transaction already in ledger: %s" % (transaction.get_txid(),)
+            )
+
+    def _apply(self, balances, auth, transaction):
+        """Apply payment `transaction` to `balances` and return closing amount."""
+        sender, receiver = transaction.sender, transaction.receiver
+        spent = transaction.amt + transaction.fee
+        if balances.get(sender, 0) < spent:
+            raise NodeError(
+                "overspend (account %s, data {MicroAlgos:{Raw:%s}}, tried to spend {%s})"
+                % (sender, balances.get(sender, 0), spent)
+            )
+        balances[sender] -= spent
+        if receiver:
+            balances[receiver] = balances.get(receiver, 0) + transaction.amt
+        closing_amount = 0
+        if transaction.close_remainder_to:
+            closing_amount = balances[sender]
+            balances[sender] = 0
+            balances[transaction.close_remainder_to] = (
+                balances.get(transaction.close_remainder_to, 0) + closing_amount
+            )
+            auth.pop(sender, None)
+        if transaction.rekey_to:
+            if transaction.rekey_to == sender:
+                auth.pop(sender, None)
+            else:
+                auth[sender] = transaction.rekey_to
+        for address in (sender, receiver, transaction.close_remainder_to):
+            if address and 0 < balances.get(address, 0) < MIN_BALANCE:
+                raise NodeError(
+                    "account %s balance %s below min %s (0 assets)"
+                    % (address, balances[address], MIN_BALANCE)
+                )
+        return closing_amount
+
+    ## BLOCKS
+    def _create_block(self):
+        """Confirm pooled transactions in a new block and notify waiting threads."""
+        self.round += 1
+        self.round_time = int(time.time())
+        for offset, transaction_id in enumerate(self.pool):
+            record = self.records[transaction_id]
+            record.update(
+                {
+                    "confirmed-round": self.round,
+                    "round-time": self.round_time,
+                    "intra-round-offset": offset,
+                }
+            )
+            self.confirmed.append(_indexer_transaction(record))
+            for address in record["addresses"]:
+                self.created.setdefault(address, self.round)
+        self.pool = []
+        self.balances = dict(self.pending_balances)
+        self.auth = dict(self.pending_auth)
+        self.condition.notify_all()
+
+    def advance(self):
+        """Create a new block and return its round."""
+        with self.condition:
+            self._create_block()
+            return self.round
+
+    def wait_for_block_after(self, round_num, timeout=WAIT_FOR_BLOCK_TIMEOUT):
+        """Wait until a block after `round_num` is created and return last round."""
+        with self.condition:
+            if self.block_interval is None and self.round <= round_num:
+                self._create_block()
+            self.condition.wait_for(lambda: self.round > round_num, timeout)
+            return self.round
+
+    def submit(self, data):
+        """Validate and pool msgpack encoded signed transactions from `data`.
+
+        Returns the id of the first transaction from submitted group.
+        """
+        try:
+            unpacker = msgpack.Unpacker(raw=False)
+            unpacker.feed(data)
+            signed_dicts = list(unpacker)
+            signed_transactions = [
+                encoding.future_msgpack_decode(signed) for signed in signed_dicts
+            ]
+            transactions = [signed.transaction for signed in signed_transactions]
+        except (ValueError, KeyError, TypeError, AttributeError) as exception:
+            raise NodeError("msgpack decode error: %s" % (exception,))
+        if not transactions:
+            raise NodeError("empty txgroup")
+
+        with self.condition:
+            transaction_id = transactions[0].get_txid()
+            try:
+                self._check_group(transactions)
+                for signed, transaction in zip(signed_transactions, transactions):
+                    self._check_transaction(transaction, len(transactions) == 1)
+                    self._authorize(signed, transaction)
+                    self._check_logic(signed, transactions)
+                balances, auth = dict(self.pending_balances), dict(self.pending_auth)
+                closing_amounts = [
+                    self._apply(balances, auth, transaction)
+                    for transaction in transactions
+                ]
+            except NodeError as exception:
+                raise NodeError(
+                    "TransactionPool.Remember: transaction %s: %s"
+                    % (transaction_id, exception)
+                )
+
+            self.pending_balances, self.pending_auth = balances, auth
+            for signed, transaction, closing_amount in zip(
+                signed_dicts, transactions, closing_amounts
+            ):
+                self.records[transaction.get_txid()] = {
+                    "id": transaction.get_txid(),
+                    "signed": signed,
+                    "closing-amount": closing_amount,
+                    "addresses": [
+                        address
+                        for address in (
+                            transaction.receiver,
+                            transaction.close_remainder_to,
+                        )
+                        if address
+                    ],
+                }
+                self.pool.append(transaction.get_txid())
+            if self.block_interval is None:
+                self._create_block()
+        return transaction_id
+
+    def dryrun(self, data):
+        """Evaluate logic signatures of the transactions from dryrun request."""
+        try:
+            request = msgpack.unpackb(data, raw=False, strict_map_key=False)
+            signed_transactions = [
+                encoding.future_msgpack_decode(signed)
+                for signed in request.get("txns", [])
+            ]
+            group = [signed.transaction for signed in signed_transactions]
+        except (ValueError, KeyError, TypeError, AttributeError) as exception:
+            raise NodeError("msgpack decode error: %s" % (exception,))
+
+        results = []
+        for signed in signed_transactions:
+            result = {
+                "disassembly": [],
+                "logic-sig-messages": [],
+                "logic-sig-trace": [],
+            }
+            if isinstance(signed, LogicSigTransaction):
+                try:
+                    program = Program(signed.lsig.logic)
+                    evaluation = evaluate(
+                        program,
+                        signed.transaction,
+                        group=group,
+                        args=signed.lsig.args or (),
+                        trace=True,
+                    )
+                except TealError as exception:
+                    result["logic-sig-messages"] = ["REJECT", str(exception)]
+                else:
+                    result["disassembly"] = [
+                        instruction.name for instruction in program.instructions
+                    ]
+                    result["logic-sig-messages"] = (
+                        ["PASS"] if evaluation.passed else ["REJECT", evaluation.error]
+                    )
+                    result["logic-sig-trace"] = [
+                        {
+                            "line": line,
+                            "pc": step.pc,
+                            "stack": _dryrun_stack(step.stack),
+                        }
+                        for line, step in enumerate(evaluation.trace, 1)
+                    ]
+            results.append(result)
+        return {"error": "", "protocol-version": "future", "txns": results}
+
+    ## RETRIEVING
+    def pending_info(self, transaction_id):
+        """Return algod's pending information of transaction with provided id."""
+        with self.condition:
+            record = self.records.get(transaction_id)
+            if record is None:
+                raise NodeError(
+                    "txn does not exist: %s" % (transaction_id,), status=404
+                )
+            info = {"pool-error": "", "txn": _json_value(record["signed"])}
+            if "confirmed-round" in record:
+                info["confirmed-round"] = record["confirmed-round"]
+                if record["signed"]["txn"].get("close"):
+                    info["closing-amount"] = record["closing-amount"]
+            return info
+
+    def account(self, address):
+        """Return algod's account information for provided address."""
+        with self.condition:
+            amount = self.balances.get(address, 0)
+            info = {
+                "address": address,
+                "amount": amount,
+                "amount-without-pending-rewards": amount,
+                "min-balance": MIN_BALANCE,
+                "pending-rewards": 0,
+                "reward-base": 0,
+                "rewards": 0,
+                "round": self.round,
+                "status": "Offline",
+                "total-apps-opted-in": 0,
+                "total-assets-opted-in": 0,
+                "total-created-apps": 0,
+                "total-created-assets": 0,
+            }
+            if address in self.auth:
+                info["auth-addr"] = self.auth[address]
+            return info
+
+    def indexer_accounts(self):
+        """Return indexer shaped accounts of all the known addresses."""
+        with self.condition:
+            return [
+                {
+                    "address": address,
+                    "amount": amount,
+                    "amount-without-pending-rewards": amount,
+                    "created-at-round": self.created.get(address, self.round),
+                    "deleted": False,
+                    "pending-rewards": 0,
+                    "rewards": 0,
+                    "round": self.round,
+                    "status": "Offline",
+                }
+                for address, amount in sorted(self.balances.items())
+            ]
+
+    def transaction(self, transaction_id):
+        """Return indexer shaped confirmed transaction or None if it's unknown."""
+        with self.condition:
+            record = self.records.get(transaction_id)
+            if record is None or "confirmed-round" not in record:
+                return None
+            return _indexer_transaction(record)
+
+    def search(self, min_round=0, max_round=None, address=None):
+        """Return indexer shaped confirmed transactions matching provided filters."""
+        with self.condition:
+            return [
+                transaction
+                for transaction in self.confirmed
+                if transaction["confirmed-round"] >= min_round
+                and (max_round is None or transaction["confirmed-round"] <= max_round)
+                and (
+                    address is None
+                    or address
+                    in (
+                        transaction["sender"],
+                        transaction["payment-transaction"]["receiver"],
+                    )
+                )
+            ]
+
+
+## SERVER
+ALGOD_ROUTES = [
+    ("GET", r"/health", "health"),
+    ("GET", r"/versions", "versions"),
+    ("GET", r"/v2/status", "status"),
+    ("GET", r"/v2/status/wait-for-block-after/(\d+)", "wait_for_block_after"),
+    ("GET", r"/v2/transactions/params", "transaction_params"),
+    ("POST", r"/v2/transactions", "send_transactions"),
+    ("GET", r"/v2/transactions/pending/(\w+)", "pending_transaction"),
+    ("GET", r"/v2/accounts/(\w+)", "account"),
+    ("POST", r"/v2/teal/compile", "compile"),
+    ("POST", r"/v2/teal/dryrun", "dryrun"),
+]
+INDEXER_ROUTES = [
+    ("GET", r"/health", "indexer_health"),
+    ("GET", r"/v2/accounts", "indexer_accounts"),
+    ("GET", r"/v2/transactions", "search_transactions"),
+    ("GET", r"/v2/transactions/(\w+)", "indexer_transaction"),
+]
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler dispatching requests to node's routes."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Don't log requests."""
+
+    def _dispatch(self, method):
+        """Call node's method routed for the request and send JSON response."""
+        parsed = parse.urlsplit(self.path)
+        params = dict(parse.parse_qsl(parsed.query))
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, response = 404, {"message": "Not Found"}
+        for route_method, pattern, name in self.server.routes:
+            match = re.fullmatch(pattern, parsed.path)
+            if route_method == method and match:
+                try:
+                    status = 200
+                    response = getattr(self.server.node, name)(
+                        *match.groups(), params=params, body=body
+                    )
+                except NodeError as exception:
+                    status, response = exception.status, {"message": str(exception)}
+                break
+        data = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        """Handle GET request."""
+        self._dispatch("GET")
+
+    def do_POST(self):
+        """Handle POST request."""
+        self._dispatch("POST")
+
+
+class FakeNode:
+    """In-memory Algorand node serving algod and indexer REST endpoints.
+
+    The indexer sees every block as soon as it's created.
+
+    Args:
+        block_interval (float): number of seconds between blocks, or None to
+            create blocks instantly
+        host (str): interface the algod and indexer servers listen on
+    """
+
+    def __init__(self, block_interval=None, host="127.0.0.1"):
+        self.ledger = Ledger(block_interval)
+        self.host = host
+        self._servers = []
+        self._threads = []
+        self._stopped = threading.Event()
+        self._environ = None
+
+    ## LIFECYCLE
+    def _serve(self, routes):
+        """Start server for provided `routes` in a thread and return its address."""
+        server = ThreadingHTTPServer((self.host, 0), _RequestHandler)
+        server.daemon_threads = True
+        server.routes, server.node = routes, self
+        thread = threading.Thread(
+            target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        thread.start()
+        self._servers.append(server)
+        self._threads.append(thread)
+        return "http://%s:%s" % (self.host, server.server_address[1])
+
+    def _produce_blocks(self):
+        """Create a new block every `block_interval` seconds until stopped."""
+        while not self._stopped.wait(self.ledger.block_interval):
+            self.ledger.advance()
+
+    def start(self):
+        """Start algod and indexer servers and return this node."""
+        self.algod_address = self._serve(ALGOD_ROUTES)
+        self.indexer_address = self._serve(INDEXER_ROUTES)
+        if self.ledger.block_interval is not None:
+            thread = threading.Thread(target=self._produce_blocks, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def environment(self):
+        """Return environment variables pointing the clients to this node."""
+        return {
+            "ALGOD_ADDRESS": self.algod_address,
+            "ALGOD_TOKEN": NODE_TOKEN,
+            "INDEXER_ADDRESS": self.indexer_address,
+            "INDEXER_TOKEN": NODE_TOKEN,
+            "DISPENSER_MNEMONIC": mnemonic.from_private_key(GENESIS_PRIVATE_KEY),
+        }
+
+    def configure(self):
+        """Point the clients to this node and return the node.
+
+        Previous environment variables are restored when the node is stopped.
+        """
+        environment = self.environment()
+        self._environ = {name: os.environ.get(name) for name in environment}
+        os.environ.update(environment)
+        return self
+
+    def stop(self):
+        """Stop the servers and restore environment changed by `configure`."""
+        self._stopped.set()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for name, value in (self._environ or {}).items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self._environ = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    ## ALGOD
+    def health(self, params, body):
+        """Return empty response of healthy node."""
+        return None
+
+    def versions(self, params, body):
+        """Return node's versions information."""
+        return {
+            "build": {
+                "branch": "fakenode",
+                "build_number": 0,
+                "channel": "dev",
+                "commit_hash": "fakenode",
+                "major": 0,
+                "minor": 0,
+            },
+            "genesis_hash_b64": GENESIS_HASH,
+            "genesis_id": GENESIS_ID,
+            "versions": ["v2"],
+        }
+
+    def _status(self, round_num):
+        """Return algod's status for provided last round."""
+        return {
+            "catchup-time": 0,
+            "last-round": round_num,
+            "last-version": "future",
+            "next-version": "future",
+            "next-version-round": round_num + 1,
+            "next-version-supported": True,
+            "stopped-at-unsupported-round": False,
+            "time-since-last-round": int(
+                (time.time() - self.ledger.round_time) * 10**9
+            ),
+        }
+
+    def status(self, params, body):
+        """Return current status."""
+        return self._status(self.ledger.round)
+
+    def wait_for_block_after(self, round_num, params, body):
+        """Return status after a block following provided round is created."""
+        return self._status(self.ledger.wait_for_block_after(int(round_num)))
+
+    def transaction_params(self, params, body):
+        """Return suggested transaction parameters."""
+        return {
+            "consensus-version": "future",
+            "fee": 0,
+            "genesis-hash": GENESIS_HASH,
+            "genesis-id": GENESIS_ID,
+            "last-round": self.ledger.round,
+            "min-fee": MIN_TXN_FEE,
+        }
+
+    def send_transactions(self, params, body):
+        """Submit raw signed transactions and return the first one's id."""
+        return {"txId": self.ledger.submit(body)}
+
+    def pending_transaction(self, transaction_id, params, body):
+        """Return pending information of transaction."""
+        return self.ledger.pending_info(transaction_id)
+
+    def account(self, address, params, body):
+        """Return account information."""
+        if not encoding.is_valid_address(address):
+            raise NodeError("failed to parse the address")
+        return self.ledger.account(address)
+
+    def compile(self, params, body):
+        """Assemble TEAL source from request body and return program and hash."""
+        try:
+            program = assemble(body.decode("utf-8"))
+        except (TealError, ValueError, KeyError, IndexError) as exception:
+            raise NodeError(str(exception))
+        return {
+            "hash": encoding.encode_address(
+                encoding.checksum(constants.logic_prefix + program)
+            ),
+            "result": base64.b64encode(program).decode(),
+        }
+
+    def dryrun(self, params, body):
+        """Return dryrun results of logic signature transactions."""
+        return self.ledger.dryrun(body)
+
+    ## INDEXER
+    def indexer_health(self, params, body):
+        """Return indexer's health having the last round."""
+        return {
+            "data": {},
+            "db-available": True,
+            "is-migrating": False,
+            "message": str(self.ledger.round),
+            "round": self.ledger.round,
+            "version": "fakenode",
+        }
+
+    def indexer_accounts(self, params, body):
+        """Return all the accounts known to the ledger."""
+        return {
+            "accounts": self.ledger.indexer_accounts(),
+            "current-round": self.ledger.round,
+        }
+
+    def indexer_transaction(self, transaction_id, params, body):
+        """Return confirmed transaction having provided id."""
+        transaction = self.ledger.transaction(transaction_id)
+        if transaction is None:
+            raise NodeError(
+                "no transaction found for tx id: %s" % (transaction_id,), 404
+            )
+        return {"current-round": self.ledger.round, "transaction": transaction}
+
+    def search_transactions(self, params, body):
+        """Return page of confirmed transactions matching query parameters."""
+        transactions = self.ledger.search(
+            int(params.get("min-round", 0)),
+            int(params["max-round"]) if "max-round" in params else None,
+            params.get("address"),
+        )
+        start = int(params.get("next") or 0)
+        end = start + int(params.get("limit") or 1000)
+        response = {
+            "current-round": self.ledger.round,
+            "transactions": transactions[start:end],
+        }
+        if end < len(transactions):
+            response["next-token"] = str(end)
+        return response
+
+
+if __name__ == "__main__":
+    """Serve fake node until interrupted and print environment pointing to it."""
+
+    node = FakeNode().start()
+    for name, value in node.environment().items():
+        print('export %s="%s"' % (name, value))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        node.stop()
@@ -1,18 +1,62 @@
 """Module containing helper functions for accessing Algorand blockchain."""
 
 import base64
+import fcntl
+import hashlib
+import itertools
+import json
+import math
 import os
-import pty
-import subprocess
+import shutil
+import tempfile
+import threading
 import time
+import weakref
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from algosdk import account, mnemonic
-from algosdk.error import IndexerHTTPError
-from algosdk.future.transaction import LogicSig, LogicSigTransaction, PaymentTxn
-from algosdk.v2client import algod, indexer
+from algosdk import account, constants, mnemonic
+from algosdk.error import AlgodHTTPError, IndexerHTTPError, KMDHTTPError
+from algosdk.future.transaction import (
+    LogicSig,
+    LogicSigTransaction,
+    PaymentTxn,
+    assign_group_id,
+)
+from algosdk.v2client.models import DryrunRequest
+
+from cache import CompileCache, ParamsCache
+from clients import (
+    NODE_ERRORS,
+    algod_client,
+    client_config,
+    indexer_client,
+    kmd_client,
+)
+from confirmations import CONFIRMED, POOL_ERROR, TIMEOUT, confirmation_waiter
 
 INDEXER_TIMEOUT = 10  # 61 for devMode
+MAX_GROUP_SIZE = 16
+DRYRUN_WORKERS = 8
+SANDBOX_READY_TIMEOUT = 120
+SNAPSHOT_WORKERS = 16
+SNAPSHOT_ATTEMPTS = 5
+STALE_PARAMS_ERRORS = ("txn dead", "GenesisHash", "GenesisID")
+
+DryrunVerdict = namedtuple(
+    "DryrunVerdict", ["transaction_id", "passed", "messages", "cost", "trace"]
+)
+BalanceSnapshot = namedtuple("BalanceSnapshot", ["round", "balances"])
+
+_compile_cache = CompileCache(directory=os.environ.get("TEAL_CACHE_DIR"))
+_params_cache = ParamsCache()
+_algod_versions = weakref.WeakKeyDictionary()
+_dispenser = None
+_dispenser_lock = threading.Lock()
+_sandbox_ready = False
+_sandbox_lock = threading.Lock()
 
 
 ## SANDBOX
@@ -54,24 +98,278 @@ def _sandbox_executable():
 
 def call_sandbox_command(*args):
     """Call and return sandbox command composed from provided arguments."""
+    import pty
+    import subprocess
+
     return subprocess.run(
         [_sandbox_executable(), *args], stdin=pty.openpty()[1], capture_output=True
     )
 
 
+def _session_directory(run_id):
+    """Return directory of the files shared by workers of pytest-xdist run."""
+    return Path(tempfile.gettempdir()) / ("algorand-session-%s" % (run_id,))
+
+
+def _session_path(name):
+    """Return path of the file sharing `name` state between pytest-xdist workers.
+
+    The file is specific to the configured algod node and it's placed in the
+    run's directory accessible only by the current user.
+    None is returned if the process isn't a worker of pytest-xdist run.
+    """
+    run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID")
+    if not run_id:
+        return None
+    directory = _session_directory(run_id)
+    directory.mkdir(mode=0o700, exist_ok=True)
+    node = hashlib.sha256(client_config("ALGOD_ADDRESS").encode()).hexdigest()[:12]
+    return directory / ("%s-%s.json" % (name, node))
+
+
+def remove_session_files(run_id):
+    """Remove all the files shared by workers of pytest-xdist run `run_id`."""
+    shutil.rmtree(_session_directory(run_id), ignore_errors=True)
+
+
+@contextmanager
+def _session_lock(path):
+    """Hold exclusive lock of the session file `path` shared by all the workers."""
+    with open(str(path) + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_session(path, session):
+    """Atomically write `session` to `path` readable only by the current user."""
+    handle = os.open(str(path) + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(handle, "w") as session_file:
+        json.dump(session, session_file)
+    os.replace(str(path) + ".tmp", path)
+
+
+def _node_ready_round():
+    """Return algod's last round if both algod and indexer are ready or None.
+
+    Indexer is ready when it has processed the last round reported by algod.
+    Dropped connections and partial responses of the starting nodes count as
+    not being ready.
+    """
+    try:
+        _algod_client().health()
+        last_round = _algod_client().status()["last-round"]
+        if _indexer_client().health().get("round", -1) >= last_round:
+            return last_round
+    except NODE_ERRORS:
+        pass
+    return None
+
+
+def wait_for_node(timeout=SANDBOX_READY_TIMEOUT):
+    """Probe algod and indexer with backoff and return their ready round or None."""
+    delays = _backoff_delays(timeout, maximum=2)
+    while True:
+        round_num = _node_ready_round()
+        if round_num is not None:
+            return round_num
+        delay = next(delays, None)
+        if delay is None:
+            return None
+        time.sleep(delay)
+
+
+def _start_sandbox(reuse):
+    """Start the Sandbox unless it's reused, wait for it and return ready round.
+
+    Running Sandbox is reused only if both of its nodes respond as ready.
+    """
+    round_num = _node_ready_round() if reuse else None
+    reused = round_num is not None
+    if not reused:
+        call_sandbox_command("up")
+        round_num = wait_for_node()
+    if round_num is None:
+        raise RuntimeError(
+            "Sandbox isn't ready after %s seconds" % (SANDBOX_READY_TIMEOUT,)
+        )
+    return {"ready": True, "round": round_num, "reused": reused}
+
+
+def ensure_sandbox(reuse=None):
+    """Start the Sandbox once per run and wait until algod and indexer are ready.
+
+    The first pytest-xdist worker starts the Sandbox while holding the lock and
+    shares its ready status with the other workers through the session file.
+    Already running Sandbox is reused without restarting if `reuse` is true,
+    or if SANDBOX_REUSE environment variable is set when `reuse` is None.
+    """
+    global _sandbox_ready
+    if reuse is None:
+        reuse = bool(os.environ.get("SANDBOX_REUSE"))
+    with _sandbox_lock:
+        if _sandbox_ready:
+            return
+        path = _session_path("sandbox")
+        if path is None:
+            _start_sandbox(reuse)
+        else:
+            with _session_lock(path):
+                if not path.exists():
+                    _write_session(path, _start_sandbox(reuse))
+        _sandbox_ready = True
+
+
 ## CLIENTS
 def _algod_client():
-    """Instantiate and return Algod client object."""
-    algod_address = "http://localhost:4001"
-    algod_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-    return algod.AlgodClient(algod_token, algod_address)
+    """Return Algod client object shared by the current process."""
+    return algod_client()
 
 
 def _indexer_client():
-    """Instantiate and return Indexer client object."""
-    indexer_address = "http://localhost:8980"
-    indexer_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-    return indexer.IndexerClient(indexer_token, indexer_address)
+    """Return Indexer client object shared by the current process."""
+    return indexer_client()
+
+
+## DISPENSER
+def _dispenser_from_kmd():
+    """Return address and private key of the funded account from kmd wallet.
+
+    Among the wallet's accounts, the offline one having the most funds is used.
+    """
+    client = kmd_client()
+    wallet_name = client_config("KMD_WALLET")
+    password = os.environ.get("KMD_WALLET_PASSWORD", "")
+    wallet_id = next(
+        wallet["id"]
+        for wallet in client.list_wallets()
+        if wallet["name"] == wallet_name
+    )
+    handle = client.init_wallet_handle(wallet_id, password)
+    try:
+        accounts = [
+            _algod_client().account_info(key) for key in client.list_keys(handle)
+        ]
+        address = max(
+            (info for info in accounts if info.get("status") == "Offline"),
+            key=lambda info: info.get("amount", 0),
+        )["address"]
+        private_key = client.export_key(handle, password, address)
+    finally:
+        client.release_wallet_handle(handle)
+    return address, private_key
+
+
+def _dispenser_from_sandbox():
+    """Return address and private key of the funded account from sandbox CLI."""
+    address = _initial_funds_address()
+    if address is None:
+        raise Exception("Initial funds weren't transferred!")
+    return address, mnemonic.to_private_key(_cli_passphrase_for_account(address))
+
+
+def _resolve_dispenser():
+    """Return address and private key of the account used for funding.
+
+    The account is taken from DISPENSER_MNEMONIC environment variable if it's set,
+    otherwise from kmd and finally from the sandbox CLI if kmd isn't reachable.
+    """
+    passphrase = os.environ.get("DISPENSER_MNEMONIC")
+    if passphrase:
+        private_key = mnemonic.to_private_key(passphrase)
+        return account.address_from_private_key(private_key), private_key
+    try:
+        return _dispenser_from_kmd()
+    except (OSError, StopIteration, ValueError, AlgodHTTPError, KMDHTTPError):
+        return _dispenser_from_sandbox()
+
+
+def _dispenser_session_path():
+    """Return path of the file sharing dispenser between pytest-xdist workers."""
+    return _session_path("dispenser")
+
+
+def _xdist_worker_index():
+    """Return index of the current pytest-xdist worker or None if it's not a worker.
+
+    Index is parsed from the worker id like `gw3` provided by pytest-xdist.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "")
+    return int(worker[2:]) if worker[2:].isdigit() else None
+
+
+def _fund_sub_dispensers(address, private_key, count):
+    """Create `count` accounts funded from provided dispenser and return them.
+
+    Every sub-dispenser gets an equal share of dispenser's balance and all the
+    payments are sent as atomic groups before confirmation is awaited.
+    """
+    client = _algod_client()
+    sub_dispensers = [account.generate_account() for _ in range(count)]
+    share = client.account_info(address).get("amount", 0) // (count + 1)
+    groups = _signed_funding_groups(
+        address,
+        private_key,
+        suggested_params(),
+        [(sub_address, share) for _, sub_address in sub_dispensers],
+        "Sub-dispenser funds",
+    )
+    group_ids = [_send(client.send_transactions, group) for group in groups]
+    _wait_for_confirmations(client, group_ids, 4)
+    return [
+        (sub_address, sub_private_key)
+        for sub_private_key, sub_address in sub_dispensers
+    ]
+
+
+def _shared_dispenser(path):
+    """Return dispenser stored in `path` resolving and storing it if it isn't there.
+
+    The file is created readable only by the current user while an exclusive
+    lock is held, so the dispenser is resolved only once for all the workers.
+    If the run has more than one worker, the resolved dispenser funds a
+    sub-dispenser for every worker at the same time, and the worker's own
+    sub-dispenser is returned, so the workers don't contend on a single sender.
+    """
+    with _session_lock(path):
+        if path.exists():
+            session = json.loads(path.read_text())
+        else:
+            address, private_key = _resolve_dispenser()
+            count = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT") or 0)
+            workers = (
+                _fund_sub_dispensers(address, private_key, count) if count > 1 else []
+            )
+            session = {
+                "address": address,
+                "private_key": private_key,
+                "workers": workers,
+            }
+            _write_session(path, session)
+
+    workers, index = session.get("workers", []), _xdist_worker_index()
+    if index is not None and index < len(workers):
+        return tuple(workers[index])
+    return session["address"], session["private_key"]
+
+
+def dispenser():
+    """Return two-tuple of funding account's address and private key.
+
+    The account is resolved only once per run and it's shared by all the threads.
+    Every pytest-xdist worker gets its own sub-dispenser funded by the account.
+    """
+    global _dispenser
+    if _dispenser is None:
+        with _dispenser_lock:
+            if _dispenser is None:
+                path = _dispenser_session_path()
+                _dispenser = (
+                    _resolve_dispenser() if path is None else _shared_dispenser(path)
+                )
+    return _dispenser
 
 
 ## TRANSACTIONS
@@ -82,15 +380,46 @@ def _add_transaction(sender, receiver, passphrase, amount, note):
     If the first item is None then the error is non-field/integration error.
     Returned two-tuple of empty strings marks successful transaction.
     """
+    from signing import private_key_from_mnemonic
+
     client = _algod_client()
-    params = client.suggested_params()
+    params = suggested_params()
     unsigned_txn = PaymentTxn(sender, params, receiver, amount, None, note.encode())
-    signed_txn = unsigned_txn.sign(mnemonic.to_private_key(passphrase))
-    transaction_id = client.send_transaction(signed_txn)
+    signed_txn = unsigned_txn.sign(private_key_from_mnemonic(passphrase))
+    transaction_id = _send(client.send_transaction, signed_txn)
     _wait_for_confirmation(client, transaction_id, 4)
     return transaction_id
 
 
+def _wait_for_confirmations(client, transaction_ids, timeout):
+    """
+    Wait until all the transactions are confirmed or rejected, or until 'timeout'
+    number of rounds have passed.
+    All the transactions are tracked by the single round-following loop.
+    Args:
+        transaction_ids (list): the transactions to wait for
+        timeout (int): maximum number of rounds to wait
+    Returns:
+        list: pending transactions information, or throws an error if any of the
+            transactions is not confirmed or rejected in the next timeout rounds
+    """
+    confirmations = confirmation_waiter(client).wait(transaction_ids, timeout)
+    for confirmation in confirmations:
+        _note_round(confirmation.round)
+        if confirmation.status == POOL_ERROR:
+            raise Exception("pool error: {}".format(confirmation.pool_error))
+        elif confirmation.status == TIMEOUT:
+            raise Exception(
+                "pending tx not found in timeout rounds, timeout value = : {}".format(
+                    timeout
+                )
+            )
+    return [
+        confirmation.info if confirmation.status == CONFIRMED else None
+        for confirmation in confirmations
+    ]
+
+
 def _wait_for_confirmation(client, transaction_id, timeout):
     """
     Wait until the transaction is confirmed or rejected, or until 'timeout'
@@ -102,23 +431,7 @@ def _wait_for_confirmation(client, transaction_id, timeout):
         dict: pending transaction information, or throws an error if the transaction
             is not confirmed or rejected in the next timeout rounds
     """
-    start_round = client.status()["last-round"] + 1
-    current_round = start_round
-
-    while current_round < start_round + timeout:
-        try:
-            pending_txn = client.pending_transaction_info(transaction_id)
-        except Exception:
-            return
-        if pending_txn.get("confirmed-round", 0) > 0:
-            return pending_txn
-        elif pending_txn["pool-error"]:
-            raise Exception("pool error: {}".format(pending_txn["pool-error"]))
-        client.status_after_block(current_round)
-        current_round += 1
-    raise Exception(
-        "pending tx not found in timeout rounds, timeout value = : {}".format(timeout)
-    )
+    return _wait_for_confirmations(client, [transaction_id], timeout)[0]
 
 
 def create_payment_transaction(escrow_address, params, receiver, amount):
@@ -126,11 +439,33 @@ def create_payment_transaction(escrow_address, params, receiver, amount):
     return PaymentTxn(escrow_address, params, receiver, amount)
 
 
+def send_logic_sig_transaction(logic_sig, payment_transaction):
+    """Create logic signature transaction and send it without waiting."""
+    logic_sig_transaction = LogicSigTransaction(payment_transaction, logic_sig)
+    return _send(_algod_client().send_transaction, logic_sig_transaction)
+
+
+def send_transactions(transactions):
+    """Send grouped signed `transactions` without waiting and return first id."""
+    return _send(_algod_client().send_transactions, transactions)
+
+
+def watch_confirmation(transaction_id, timeout=4):
+    """Return future resolved with `Confirmation` outcome of the transaction.
+
+    Transaction is watched by the waiter shared by all the threads, so any number
+    of transactions can be in flight without additional requests per round.
+    """
+    future = confirmation_waiter(_algod_client()).watch(transaction_id, timeout)
+    future.add_done_callback(lambda done: _note_round(done.result().round))
+    return future
+
+
 def process_logic_sig_transaction(logic_sig, payment_transaction):
     """Create logic signature transaction and send it to the network."""
     client = _algod_client()
     logic_sig_transaction = LogicSigTransaction(payment_transaction, logic_sig)
-    transaction_id = client.send_transaction(logic_sig_transaction)
+    transaction_id = _send(client.send_transaction, logic_sig_transaction)
     _wait_for_confirmation(client, transaction_id, 4)
     return transaction_id
 
@@ -138,14 +473,88 @@ def process_logic_sig_transaction(logic_sig, payment_transaction):
 def process_transactions(transactions):
     """Send provided grouped `transactions` to network and wait for confirmation."""
     client = _algod_client()
-    transaction_id = client.send_transactions(transactions)
+    transaction_id = _send(client.send_transactions, transactions)
     _wait_for_confirmation(client, transaction_id, 4)
     return transaction_id
 
 
-def suggested_params():
-    """Return the suggested params from the algod client."""
-    return _algod_client().suggested_params()
+def _dryrun_group(group):
+    """Dryrun grouped logic signature transactions and return their verdicts."""
+    response = _algod_client().dryrun(DryrunRequest(txns=group))
+    results = response.get("txns") or [{} for _ in group]
+    verdicts = []
+    for transaction, result in zip(group, results):
+        messages = result.get("logic-sig-messages") or (
+            [response["error"]] if response.get("error") else []
+        )
+        trace = result.get("logic-sig-trace") or []
+        verdicts.append(
+            DryrunVerdict(
+                transaction.get_txid(),
+                messages[:1] == ["PASS"],
+                messages,
+                result.get("budget-consumed") or len(trace),
+                trace,
+            )
+        )
+    return verdicts
+
+
+def dryrun_transactions(groups, max_workers=DRYRUN_WORKERS):
+    """Dryrun logic signature transactions and return list of their verdicts.
+
+    Every item of `groups` is either a single `LogicSigTransaction` or a list of
+    grouped ones. Algod evaluates all the transactions of a dryrun request as one
+    group, so each group gets its own request. Requests are sent concurrently
+    through the shared client and nothing is submitted to the network.
+    Returned verdicts are in the order of provided transactions.
+    """
+    groups = [group if isinstance(group, list) else [group] for group in groups]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_dryrun_group, groups)
+        return [verdict for verdicts in results for verdict in verdicts]
+
+
+def _note_round(round_num):
+    """Remember `round_num` as observed on the configured algod node."""
+    _params_cache.note_round(client_config("ALGOD_ADDRESS"), round_num)
+
+
+def _send(send, payload):
+    """Send `payload` by `send` method and return its result.
+
+    Cached suggested params are forgotten if the node rejects them.
+    """
+    try:
+        return send(payload)
+    except AlgodHTTPError as exception:
+        if any(error in str(exception) for error in STALE_PARAMS_ERRORS):
+            _params_cache.invalidate(client_config("ALGOD_ADDRESS"))
+        raise
+
+
+def suggested_params(fee=None, flat_fee=None):
+    """Return the suggested params from the algod client.
+
+    Params are cached for the configured node and fetched again only when their
+    validity window is running out or the node rejects them. Every call returns
+    a new object having provided `fee` and `flat_fee` overrides applied.
+    """
+    key = client_config("ALGOD_ADDRESS")
+    params = _params_cache.get(key)
+    if params is None:
+        params = _algod_client().suggested_params()
+        _params_cache.put(key, params)
+    if fee is not None:
+        params.fee = fee
+    if flat_fee is not None:
+        params.flat_fee = flat_fee
+    return params
+
+
+def params_cache():
+    """Return cache of suggested params shared by the current process."""
+    return _params_cache
 
 
 ## CREATING
@@ -155,18 +564,63 @@ def add_standalone_account():
     return private_key, address
 
 
+def _signed_funding_groups(sender, private_key, params, funds, note):
+    """Return list of signed atomic groups paying provided `funds` from `sender`."""
+    groups = []
+    for start in range(0, len(funds), MAX_GROUP_SIZE):
+        transactions = [
+            PaymentTxn(sender, params, address, amount, None, note.encode())
+            for address, amount in funds[start : start + MAX_GROUP_SIZE]
+        ]
+        if len(transactions) > 1:
+            assign_group_id(transactions)
+        groups.append([transaction.sign(private_key) for transaction in transactions])
+    return groups
+
+
+def sign_payments(payments, sender=None, private_key=None, params=None, note=""):
+    """Yield signed atomic groups paying provided `(address, amount)` payments.
+
+    Payments are signed offline by `sender`, or by the dispenser if it isn't
+    provided, in groups of up to MAX_GROUP_SIZE transactions. Suggested params
+    are fetched only once if `params` aren't provided.
+    """
+    if sender is None:
+        sender, private_key = dispenser()
+    params = params or suggested_params()
+    payments = iter(payments)
+    while True:
+        chunk = list(itertools.islice(payments, MAX_GROUP_SIZE))
+        if not chunk:
+            return
+        yield from _signed_funding_groups(sender, private_key, params, chunk, note)
+
+
+def fund_accounts(funds, note="Initial funds"):
+    """Fund addresses from provided list of `(address, amount)` pairs.
+
+    Payments are packed in atomic groups of up to MAX_GROUP_SIZE transactions.
+    All the groups are sent without waiting in between and confirmation is
+    awaited only after the last group is sent.
+    Returns list of transaction ids in the order of provided pairs.
+    """
+    funds = list(funds)
+    if not funds:
+        return []
+    sender, private_key = dispenser()
+
+    client = _algod_client()
+    groups = _signed_funding_groups(
+        sender, private_key, suggested_params(), funds, note
+    )
+    group_ids = [_send(client.send_transactions, group) for group in groups]
+    _wait_for_confirmations(client, group_ids, 4)
+    return [signed.get_txid() for group in groups for signed in group]
+
+
 def fund_account(address, initial_funds=1000000000):
     """Fund provided `address` with `initial_funds` amount of microAlgos."""
-    initial_funds_address = _initial_funds_address()
-    if initial_funds_address is None:
-        raise Exception("Initial funds weren't transferred!")
-    _add_transaction(
-        initial_funds_address,
-        address,
-        _cli_passphrase_for_account(initial_funds_address),
-        initial_funds,
-        "Initial funds",
-    )
+    fund_accounts([(address, initial_funds)])
 
 
 ## RETRIEVING
@@ -193,29 +647,268 @@ def account_balance(address):
     return account_info.get("amount")
 
 
-def transaction_info(transaction_id):
-    """Return transaction with provided id."""
-    timeout = 0
-    while timeout < INDEXER_TIMEOUT:
+def balance_snapshot(addresses, max_workers=SNAPSHOT_WORKERS):
+    """Return `BalanceSnapshot` of provided addresses' balances in the same round.
+
+    Accounts are fetched concurrently and the ones read in an earlier round
+    than the others are read again, so all the balances reflect the single
+    round the snapshot is tagged with.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if not addresses:
+        return BalanceSnapshot(None, {})
+    client = _algod_client()
+    infos, pending = {}, addresses
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in range(SNAPSHOT_ATTEMPTS):
+            infos.update(zip(pending, executor.map(client.account_info, pending)))
+            round_num = max(info.get("round", 0) for info in infos.values())
+            pending = [
+                address
+                for address, info in infos.items()
+                if info.get("round", 0) != round_num
+            ]
+            if not pending:
+                return BalanceSnapshot(
+                    round_num,
+                    {address: infos[address].get("amount", 0) for address in addresses},
+                )
+    raise RuntimeError(
+        "Balances weren't read in the same round in %s attempts" % (SNAPSHOT_ATTEMPTS,)
+    )
+
+
+def balance_changes(before, after):
+    """Return dictionary of balance changes between two balance snapshots.
+
+    Only the addresses having different balances are included and addresses
+    missing in one of the snapshots are treated as having zero balance there.
+    """
+    changes = {}
+    for address in dict.fromkeys(list(before.balances) + list(after.balances)):
+        change = after.balances.get(address, 0) - before.balances.get(address, 0)
+        if change:
+            changes[address] = change
+    return changes
+
+
+def _pending_transaction_info(transaction_id):
+    """Return algod's pending information of transaction or None if it's unknown."""
+    try:
+        return _algod_client().pending_transaction_info(transaction_id)
+    except AlgodHTTPError:
+        return None
+
+
+def _backoff_delays(timeout, initial=0.05, maximum=1):
+    """Yield exponentially growing delays until `timeout` seconds have elapsed."""
+    deadline = time.monotonic() + timeout
+    delay = initial
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        yield min(delay, remaining)
+        delay = min(delay * 2, maximum)
+
+
+def _wait_for_indexer_round(round_num):
+    """Wait until indexer has processed provided round and return True if it has."""
+    delays = _backoff_delays(INDEXER_TIMEOUT)
+    while True:
+        try:
+            if _indexer_client().health().get("round", 0) >= round_num:
+                return True
+        except IndexerHTTPError:
+            pass
+        delay = next(delays, None)
+        if delay is None:
+            return False
+        time.sleep(delay)
+
+
+def _transaction_from_pending_info(transaction_id, pending_info):
+    """Return indexer shaped transaction built from algod's pending information."""
+    txn = pending_info["txn"]["txn"]
+    transaction = {
+        "id": transaction_id,
+        "confirmed-round": pending_info["confirmed-round"],
+        "fee": txn.get("fee", 0),
+        "first-valid": txn.get("fv", 0),
+        "last-valid": txn.get("lv", 0),
+        "genesis-hash": txn.get("gh"),
+        "genesis-id": txn.get("gen"),
+        "sender": txn.get("snd"),
+        "tx-type": txn.get("type"),
+    }
+    if "grp" in txn:
+        transaction["group"] = txn["grp"]
+    if "note" in txn:
+        transaction["note"] = txn["note"]
+    if txn.get("type") == constants.payment_txn:
+        transaction["payment-transaction"] = {
+            "receiver": txn.get("rcv"),
+            "amount": txn.get("amt", 0),
+            "close-amount": pending_info.get("closing-amount", 0),
+        }
+        if "close" in txn:
+            transaction["payment-transaction"]["close-remainder-to"] = txn["close"]
+    return {
+        "current-round": pending_info["confirmed-round"],
+        "transaction": transaction,
+    }
+
+
+def _indexer_transaction(transaction_id):
+    """Return transaction from indexer retrying with backoff until INDEXER_TIMEOUT."""
+    delays = _backoff_delays(INDEXER_TIMEOUT)
+    while True:
         try:
-            transaction = _indexer_client().transaction(transaction_id)
-            break
+            return _indexer_client().transaction(transaction_id)
         except IndexerHTTPError:
-            time.sleep(1)
-            timeout += 1
-    else:
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeoutError(
+                    "Timeout reached waiting for transaction to be available in indexer"
+                )
+            time.sleep(delay)
+
+
+def transaction_info(transaction_id, confirmed_round=None, allow_algod=False):
+    """Return transaction with provided id.
+
+    The indexer is queried after its health round reaches transaction's confirmed
+    round, retrieved from algod if it isn't provided.
+
+    Args:
+        transaction_id (str): the transaction to retrieve
+        confirmed_round (int): round in which the transaction was confirmed
+        allow_algod (bool): return transaction built from algod's pending
+            information if the indexer doesn't catch up in INDEXER_TIMEOUT
+    """
+    pending_info = None
+    if confirmed_round is None:
+        pending_info = _pending_transaction_info(transaction_id)
+        if pending_info:
+            confirmed_round = pending_info.get("confirmed-round") or None
+
+    if confirmed_round is not None and not _wait_for_indexer_round(confirmed_round):
+        if allow_algod and pending_info and pending_info.get("confirmed-round"):
+            return _transaction_from_pending_info(transaction_id, pending_info)
         raise TimeoutError(
             "Timeout reached waiting for transaction to be available in indexer"
         )
+    return _indexer_transaction(transaction_id)
+
+
+def transactions_info(transaction_ids, confirmed_rounds=None):
+    """Return dictionary of transactions with provided ids found by single search.
 
-    return transaction
+    Indexer is searched for the transactions in the range of their confirmed
+    rounds, retrieved from algod if they aren't provided in `confirmed_rounds`
+    dictionary. Transactions with unknown confirmed round are retrieved one by one.
+    """
+    confirmed_rounds = dict(confirmed_rounds or {})
+    for transaction_id in transaction_ids:
+        if transaction_id not in confirmed_rounds:
+            pending_info = _pending_transaction_info(transaction_id) or {}
+            confirmed_rounds[transaction_id] = pending_info.get("confirmed-round")
+
+    rounds = [confirmed_rounds[transaction_id] for transaction_id in transaction_ids]
+    known_rounds = [round_num for round_num in rounds if round_num]
+    transactions = {}
+    if known_rounds:
+        if not _wait_for_indexer_round(max(known_rounds)):
+            raise TimeoutError(
+                "Timeout reached waiting for transactions to be available in indexer"
+            )
+        wanted = set(transaction_ids)
+        kwargs = {"min_round": min(known_rounds), "max_round": max(known_rounds)}
+        while True:
+            response = _indexer_client().search_transactions(**kwargs)
+            for transaction in response.get("transactions", []):
+                if transaction.get("id") in wanted:
+                    transactions[transaction["id"]] = {
+                        "current-round": response.get("current-round"),
+                        "transaction": transaction,
+                    }
+            if not response.get("next-token") or not response.get("transactions"):
+                break
+            kwargs["next_page"] = response["next-token"]
+
+    for transaction_id in transaction_ids:
+        if transaction_id not in transactions:
+            transactions[transaction_id] = transaction_info(
+                transaction_id, confirmed_rounds[transaction_id]
+            )
+    return transactions
 
 
 ## UTILITY
+def percentile(values, percent):
+    """Return nearest-rank `percent` percentile of provided `values`."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def algod_version_key(versions):
+    """Return algod build version string from provided `versions` response."""
+    build = versions.get("build", {})
+    return "{}.{}.{}-{}".format(
+        build.get("major"),
+        build.get("minor"),
+        build.get("build_number"),
+        build.get("commit_hash"),
+    )
+
+
+def _algod_build_version(client):
+    """Return algod build version string used for keying compiled programs.
+
+    Version is retrieved once per client, so it's retrieved again for every
+    configured node and whenever shared clients are recreated.
+    """
+    version = _algod_versions.get(client)
+    if version is None:
+        version = algod_version_key(client.versions())
+        _algod_versions[client] = version
+    return version
+
+
 def _compile_source(source):
-    """Compile and return teal binary code."""
-    compile_response = _algod_client().compile(source)
-    return base64.b64decode(compile_response["result"])
+    """Compile and return teal binary code.
+
+    Compiled programs are cached by algod version and source, so the network
+    is called only for the sources not compiled before.
+    """
+    client = _algod_client()
+    version = _algod_build_version(client)
+    compiled_binary = _compile_cache.get(version, source)
+    if compiled_binary is None:
+        compile_response = client.compile(source)
+        compiled_binary = base64.b64decode(compile_response["result"])
+        _compile_cache.put(version, source, compiled_binary)
+    return compiled_binary
+
+
+def compile_cache():
+    """Return cache of compiled programs shared by the current process."""
+    return _compile_cache
+
+
+def compile_cache_stats():
+    """Return hit/miss counters of compiled programs cache."""
+    return _compile_cache.stats()
+
+
+def invalidate_compile_cache():
+    """Refresh algod version and remove programs compiled by other versions."""
+    client = _algod_client()
+    _algod_versions.pop(client, None)
+    _compile_cache.invalidate(_algod_build_version(client))
 
 
 def logic_signature(teal_source):
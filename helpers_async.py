@@ -0,0 +1,491 @@
+"""Module containing asyncio counterparts of helper functions for Algorand blockchain.
+
+Requests are sent by a minimal HTTP/1.1 client built on asyncio streams, so any
+number of requests can be in flight from a single event loop without threads.
+"""
+
+import asyncio
+import base64
+import json
+import ssl
+import weakref
+from urllib import parse
+
+from algosdk import constants, encoding
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+from algosdk.future.transaction import (
+    LogicSig,
+    LogicSigTransaction,
+    PaymentTxn,
+    SuggestedParams,
+)
+
+from clients import (
+    IDEMPOTENT_METHODS,
+    NODE_ERRORS,
+    POOL_SIZE,
+    REQUEST_TIMEOUT,
+    client_config,
+    error_message,
+    request_path,
+)
+from confirmations import (
+    CONFIRMED,
+    DROPPED,
+    POOL_ERROR,
+    RETRY_DELAY,
+    RETRY_MAX_DELAY,
+    TIMEOUT,
+    WatchedTransactions,
+    pending_outcome,
+)
+from helpers import (
+    INDEXER_TIMEOUT,
+    STALE_PARAMS_ERRORS,
+    _backoff_delays,
+    algod_version_key,
+    compile_cache,
+    dispenser,
+    params_cache,
+)
+
+_loop_clients = weakref.WeakKeyDictionary()
+
+
+## CLIENTS
+class AsyncNodeClient:
+    """Node client sending requests through pooled keep-alive asyncio streams.
+
+    Args:
+        address (str): node's base URL like `http://localhost:4001`
+        auth_header (dict): authentication header sent with every request
+        error_class (type): exception raised for HTTP error responses
+        maxsize (int): maximum number of idle connections kept open
+        label (str): name of the node's service used in reports
+        timeout (int): seconds to wait for connection and for the response
+    """
+
+    def __init__(
+        self,
+        address,
+        auth_header,
+        error_class,
+        maxsize=POOL_SIZE,
+        label=None,
+        timeout=REQUEST_TIMEOUT,
+    ):
+        parsed = parse.urlsplit(address)
+        self.label = label or parsed.netloc
+        self.netloc = parsed.netloc
+        self.host = parsed.hostname
+        self.ssl = parsed.scheme == "https"
+        self.port = parsed.port or (443 if self.ssl else 80)
+        self.prefix = parsed.path.rstrip("/")
+        self.auth_header = auth_header
+        self.error_class = error_class
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle = []
+
+    async def _timed(self, awaitable, description):
+        """Return result of `awaitable` or raise TimeoutError after `timeout`."""
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("%s timed out" % (description,))
+
+    async def _connect(self):
+        """Open and return new reader and writer streams to the node."""
+        context = ssl.create_default_context() if self.ssl else None
+        return await self._timed(
+            asyncio.open_connection(self.host, self.port, ssl=context),
+            "Connecting to " + self.netloc,
+        )
+
+    async def _read_body(self, reader, headers):
+        """Read and return response body framed by provided `headers`."""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                if await reader.readexactly(2) != b"\r\n":
+                    raise ConnectionError("Malformed chunked response body")
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"]))
+        return await reader.read()
+
+    async def _send(self, writer, method, path, body, headers):
+        """Write request to the node through provided `writer` stream."""
+        lines = [
+            "%s %s HTTP/1.1" % (method, self.prefix + path),
+            "Host: " + self.netloc,
+        ]
+        lines += ["%s: %s" % item for item in headers.items()]
+        lines.append("Content-Length: %s" % (len(body or b""),))
+        writer.write(
+            ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+        )
+        await writer.drain()
+
+    async def _receive(self, reader):
+        """Read response from `reader` and return status, keep-alive and body."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the node")
+        version, status = status_line.split()[:2]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        data = await self._read_body(reader, response_headers)
+        keep_alive = (
+            version == b"HTTP/1.1"
+            and response_headers.get("connection", "").lower() != "close"
+        )
+        return int(status), keep_alive, data
+
+    async def request(self, method, requrl, params=None, body=None, headers=None):
+        """Send request and return two-tuple of response status and body.
+
+        Request is repeated once on a new connection if reused connection
+        has been closed by the node in the meantime. Requests of methods other
+        than IDEMPOTENT_METHODS are repeated only if they weren't sent at all.
+        TimeoutError is raised if the node doesn't respond in `timeout` seconds.
+        """
+        header = {"User-Agent": "py-algorand-sdk", **self.auth_header}
+        header.update(headers or {})
+        path = request_path(requrl, params)
+        description = "Request %s %s" % (method, path)
+        reused = bool(self._idle)
+        streams = self._idle.pop() if reused else await self._connect()
+        while True:
+            sent = False
+            try:
+                await self._timed(
+                    self._send(streams[1], method, path, body, header), description
+                )
+                sent = True
+                status, keep_alive, data = await self._timed(
+                    self._receive(streams[0]), description
+                )
+            except TimeoutError:
+                streams[1].close()
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError):
+                streams[1].close()
+                if not reused or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+                streams, reused = await self._connect(), False
+                continue
+            if keep_alive and len(self._idle) < self.maxsize:
+                self._idle.append(streams)
+            else:
+                streams[1].close()
+            return status, data
+
+    async def get_json(self, requrl, params=None):
+        """Send GET request and return JSON decoded response."""
+        return await self.json("GET", requrl, params)
+
+    async def json(self, method, requrl, params=None, body=None, headers=None):
+        """Send request and return JSON decoded response or raise node's error."""
+        status, data = await self.request(method, requrl, params, body, headers)
+        if status >= 400:
+            if self.error_class is AlgodHTTPError:
+                raise AlgodHTTPError(error_message(data), status)
+            raise self.error_class(error_message(data))
+        return json.loads(data)
+
+    def close(self):
+        """Close all idle connections."""
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+def _loop_client(name, factory):
+    """Return object `name` shared by all the tasks of the running event loop.
+
+    The object is created by calling `factory` the first time it's requested.
+    """
+    shared = _loop_clients.setdefault(asyncio.get_running_loop(), {})
+    if name not in shared:
+        shared[name] = factory()
+    return shared[name]
+
+
+def algod_client_async():
+    """Return asynchronous Algod client configured from environment."""
+    return _loop_client(
+        "algod",
+        lambda: AsyncNodeClient(
+            client_config("ALGOD_ADDRESS"),
+            {constants.algod_auth_header: client_config("ALGOD_TOKEN")},
+            AlgodHTTPError,
+            label="algod",
+        ),
+    )
+
+
+def indexer_client_async():
+    """Return asynchronous Indexer client configured from environment."""
+    return _loop_client(
+        "indexer",
+        lambda: AsyncNodeClient(
+            client_config("INDEXER_ADDRESS"),
+            {constants.indexer_auth_header: client_config("INDEXER_TOKEN")},
+            IndexerHTTPError,
+            label="indexer",
+        ),
+    )
+
+
+## CONFIRMATIONS
+class AsyncConfirmationWaiter(WatchedTransactions):
+    """Wait for any number of transactions behind a single round-following task.
+
+    Args:
+        client (:class:`AsyncNodeClient`): algod client used for polling
+        timeout (int): default maximum number of rounds to wait for transaction
+    """
+
+    def __init__(self, client, timeout=4):
+        super().__init__(timeout)
+        self.client = client
+        self._task = None
+
+    def watch(self, transaction_id, timeout=None):
+        """Start watching transaction and return future resolved with its outcome."""
+        future = asyncio.get_running_loop().create_future()
+        self._add(transaction_id, future, timeout)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return future
+
+    async def wait(self, transaction_ids, timeout=None):
+        """Watch provided transactions and return list of their outcomes."""
+        return await asyncio.gather(
+            *(self.watch(transaction_id, timeout) for transaction_id in transaction_ids)
+        )
+
+    async def _check(self, transaction_id):
+        """Resolve transaction if its pending information reveals the outcome."""
+        try:
+            info = await self.client.get_json("/transactions/pending/" + transaction_id)
+        except AlgodHTTPError as exception:
+            if exception.code == 404:
+                self._resolve(transaction_id, DROPPED)
+            return
+        except OSError:
+            return
+        outcome = pending_outcome(info)
+        if outcome is not None:
+            self._resolve(transaction_id, *outcome)
+
+    async def _run(self):
+        """Follow rounds failing all the watches if an unexpected error is raised.
+
+        Task is started again by the next watched transaction.
+        """
+        try:
+            await self._follow_rounds()
+        except Exception as exception:
+            self._fail(exception)
+
+    async def _follow_rounds(self):
+        """Follow rounds while there are watched transactions.
+
+        Failed requests and malformed responses are retried with backoff.
+        """
+        delay = RETRY_DELAY
+        while self._pending:
+            try:
+                if self.last_round is None:
+                    status = await self.client.get_json("/status")
+                    self.last_round = status["last-round"]
+                await asyncio.gather(
+                    *(
+                        self._check(transaction_id)
+                        for transaction_id in list(self._pending)
+                    )
+                )
+                self._expire()
+                if self._pending:
+                    status = await self.client.get_json(
+                        "/status/wait-for-block-after/%s" % (self.last_round,)
+                    )
+                    self.last_round = max(self.last_round, status["last-round"])
+                delay = RETRY_DELAY
+            except NODE_ERRORS + (asyncio.IncompleteReadError,):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+
+
+def confirmation_waiter_async():
+    """Return confirmation waiter shared by all the tasks of the running loop."""
+    return _loop_client("waiter", lambda: AsyncConfirmationWaiter(algod_client_async()))
+
+
+async def wait_for_confirmation_async(transaction_id, timeout=4):
+    """Wait until the transaction is confirmed or rejected and return its info.
+
+    Errors are raised the same way as in the synchronous counterpart.
+    """
+    confirmation = await confirmation_waiter_async().watch(transaction_id, timeout)
+    params_cache().note_round(client_config("ALGOD_ADDRESS"), confirmation.round)
+    if confirmation.status == POOL_ERROR:
+        raise Exception("pool error: {}".format(confirmation.pool_error))
+    elif confirmation.status == TIMEOUT:
+        raise Exception(
+            "pending tx not found in timeout rounds, timeout value = : {}".format(
+                timeout
+            )
+        )
+    return confirmation.info if confirmation.status == CONFIRMED else None
+
+
+## TRANSACTIONS
+async def suggested_params_async(fee=None, flat_fee=None):
+    """Return the suggested params from the algod client.
+
+    Params are shared with the synchronous counterpart through the same cache.
+    """
+    key = client_config("ALGOD_ADDRESS")
+    params = params_cache().get(key)
+    if params is None:
+        response = await algod_client_async().get_json("/transactions/params")
+        params = SuggestedParams(
+            response["fee"],
+            response["last-round"],
+            response["last-round"] + 1000,
+            response["genesis-hash"],
+            response["genesis-id"],
+            False,
+            response["consensus-version"],
+            response["min-fee"],
+        )
+        params_cache().put(key, params)
+    if fee is not None:
+        params.fee = fee
+    if flat_fee is not None:
+        params.flat_fee = flat_fee
+    return params
+
+
+async def send_transactions_async(transactions):
+    """Send signed `transactions` to the network and return first transaction id."""
+    serialized = b"".join(
+        base64.b64decode(encoding.msgpack_encode(transaction))
+        for transaction in transactions
+    )
+    try:
+        response = await algod_client_async().json(
+            "POST",
+            "/transactions",
+            body=serialized,
+            headers={"Content-Type": "application/x-binary"},
+        )
+    except AlgodHTTPError as exception:
+        if any(error in str(exception) for error in STALE_PARAMS_ERRORS):
+            params_cache().invalidate(client_config("ALGOD_ADDRESS"))
+        raise
+    return response["txId"]
+
+
+async def process_logic_sig_transaction_async(logic_sig, payment_transaction):
+    """Create logic signature transaction, send it and wait for confirmation."""
+    logic_sig_transaction = LogicSigTransaction(payment_transaction, logic_sig)
+    transaction_id = await send_transactions_async([logic_sig_transaction])
+    await wait_for_confirmation_async(transaction_id, 4)
+    return transaction_id
+
+
+async def process_transactions_async(transactions):
+    """Send grouped `transactions` to network and wait for confirmation."""
+    transaction_id = await send_transactions_async(transactions)
+    await wait_for_confirmation_async(transaction_id, 4)
+    return transaction_id
+
+
+## CREATING
+async def fund_account_async(address, initial_funds=1000000000):
+    """Fund provided `address` with `initial_funds` amount of microAlgos.
+
+    Dispenser is resolved in the default executor, so its blocking requests
+    don't stall the event loop.
+    """
+    sender, private_key = await asyncio.get_running_loop().run_in_executor(
+        None, dispenser
+    )
+    params = await suggested_params_async()
+    transaction = PaymentTxn(
+        sender, params, address, initial_funds, None, "Initial funds".encode()
+    )
+    return await process_transactions_async([transaction.sign(private_key)])
+
+
+## RETRIEVING
+async def account_balance_async(address):
+    """Return funds balance of the account having provided address."""
+    account_info = await algod_client_async().get_json("/accounts/" + address)
+    return account_info.get("amount")
+
+
+async def transaction_info_async(transaction_id):
+    """Return transaction from indexer retrying with backoff until INDEXER_TIMEOUT."""
+    delays = _backoff_delays(INDEXER_TIMEOUT)
+    while True:
+        try:
+            return await indexer_client_async().get_json(
+                "/transactions/" + transaction_id
+            )
+        except IndexerHTTPError:
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeoutError(
+                    "Timeout reached waiting for transaction to be available in indexer"
+                )
+            await asyncio.sleep(delay)
+
+
+## UTILITY
+async def _fetch_algod_build_version():
+    """Retrieve algod versions and return build version string."""
+    return algod_version_key(await algod_client_async().get_json("/versions"))
+
+
+async def _algod_build_version_async():
+    """Return algod build version retrieved only once for the running loop.
+
+    Failed retrieval is forgotten, so the version is retrieved again afterwards.
+    """
+    future = _loop_client(
+        "version", lambda: asyncio.ensure_future(_fetch_algod_build_version())
+    )
+    try:
+        return await asyncio.shield(future)
+    except Exception:
+        shared = _loop_clients[asyncio.get_running_loop()]
+        if future.done() and shared.get("version") is future:
+            del shared["version"]
+        raise
+
+
+async def logic_signature_async(teal_source):
+    """Create and return logic signature for provided `teal_source`."""
+    version = await _algod_build_version_async()
+    compiled_binary = compile_cache().get(version, teal_source)
+    if compiled_binary is None:
+        response = await algod_client_async().json(
+            "POST", "/teal/compile", body=teal_source.encode()
+        )
+        compiled_binary = base64.b64decode(response["result"])
+        compile_cache().put(version, teal_source, compiled_binary)
+    return LogicSig(compiled_binary)
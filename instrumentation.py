@@ -0,0 +1,481 @@
+"""Module containing instrumentation of helpers and node requests.
+
+Instrumentation records call counts, latency histograms and transferred bytes
+of the node's HTTP requests, sandbox commands, round waits and helpers calls,
+all of them tagged by the current test and stage.  Nothing is wrapped until
+:func:`enable` is called, so the disabled instrumentation has no overhead.
+
+The module is also a pytest plugin reporting the most expensive tests and
+operations at the end of the session::
+
+    pytest -p instrumentation --instrument-export=operations.json
+"""
+
+import bisect
+import functools
+import inspect
+import json
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pytest
+
+from clients import ConnectionPool, request_path
+from helpers_async import AsyncNodeClient
+
+HISTOGRAM_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+INSTRUMENTED_MODULES = ("helpers", "helpers_async")
+WAIT_FUNCTIONS = (
+    "_wait_for_confirmations",
+    "_wait_for_indexer_round",
+    "wait_for_confirmation_async",
+)
+REPORT_SIZE = 10
+
+HTTP = "http"
+SANDBOX = "sandbox"
+WAIT = "wait"
+HELPER = "helper"
+NETWORK_KINDS = (HTTP, SANDBOX)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[A-Z2-7]{52}|[A-Z2-7]{58})$")
+
+_recorder = None
+_originals = []
+_context = {"test": None, "stage": None}
+
+
+## RECORDING
+class OperationStats:
+    """Aggregated measurements of the single operation."""
+
+    __slots__ = ("count", "total", "maximum", "sent", "received", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.sent = 0
+        self.received = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def add(self, duration, sent, received):
+        """Add measurement of the single call to the statistics."""
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+        self.sent += sent
+        self.received += received
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS, duration)] += 1
+
+    def to_dict(self):
+        """Return statistics as dictionary with cumulative histogram."""
+        cumulative, buckets = 0, {}
+        for bound, count in zip(HISTOGRAM_BUCKETS + ("+Inf",), self.buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.maximum,
+            "bytes_sent": self.sent,
+            "bytes_received": self.received,
+            "histogram": buckets,
+        }
+
+
+class Recorder:
+    """Thread-safe collector of operations keyed by test, stage, kind and name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations = defaultdict(OperationStats)
+
+    def record(self, kind, name, duration, sent=0, received=0):
+        """Record call of operation `name` tagged by the current test and stage."""
+        key = (_context["test"], _context["stage"], kind, name)
+        with self._lock:
+            self.operations[key].add(duration, sent, received)
+
+    def records(self):
+        """Return list of dictionaries describing all the recorded operations."""
+        with self._lock:
+            items = sorted(
+                self.operations.items(), key=lambda item: tuple(map(str, item[0]))
+            )
+            return [
+                dict(
+                    test=test, stage=stage, kind=kind, operation=name, **stats.to_dict()
+                )
+                for (test, stage, kind, name), stats in items
+            ]
+
+    def totals(self, field, kinds=NETWORK_KINDS):
+        """Return list of `(field value, seconds, calls)` ordered by seconds.
+
+        Only operations of provided `kinds` are summed, so nested helpers
+        calls aren't counted more than once.
+        """
+        totals = defaultdict(lambda: [0.0, 0])
+        for record in self.records():
+            if record["kind"] in kinds:
+                total = totals[record[field]]
+                total[0] += record["total"]
+                total[1] += record["count"]
+        return sorted(
+            ((value, seconds, calls) for value, (seconds, calls) in totals.items()),
+            key=lambda total: -total[1],
+        )
+
+    def clear(self):
+        """Forget all the recorded operations."""
+        with self._lock:
+            self.operations.clear()
+
+
+def recorder():
+    """Return active recorder or None if instrumentation is disabled."""
+    return _recorder
+
+
+@contextmanager
+def current_test(name):
+    """Tag operations recorded in the context by test `name`."""
+    previous = _context["test"]
+    _context["test"] = name
+    try:
+        yield
+    finally:
+        _context["test"] = previous
+
+
+@contextmanager
+def stage(name):
+    """Tag operations recorded in the context by stage `name`.
+
+    Tags are shared by all the threads, so operations of the background
+    threads are attributed to the test and stage running at the same time.
+    """
+    previous = _context["stage"]
+    _context["stage"] = name
+    try:
+        yield
+    finally:
+        _context["stage"] = previous
+
+
+## WRAPPERS
+def _http_operation_name(label, method, path):
+    """Return name of HTTP request with ids and rounds replaced by placeholders."""
+    segments = path.split("?", 1)[0].split("/")
+    return "%s %s %s" % (
+        label,
+        method,
+        "/".join(
+            "{}" if _ID_SEGMENT.match(segment) else segment for segment in segments
+        ),
+    )
+
+
+def _wrap_request(request):
+    """Return `ConnectionPool.request` replacement recording HTTP requests."""
+
+    @functools.wraps(request)
+    def wrapper(self, method, path, body=None, headers=None):
+        active = _recorder
+        if active is None:
+            return request(self, method, path, body, headers)
+        start = time.perf_counter()
+        status, data = request(self, method, path, body, headers)
+        active.record(
+            HTTP,
+            _http_operation_name(self.label, method, path),
+            time.perf_counter() - start,
+            len(body or b""),
+            len(data),
+        )
+        return status, data
+
+    return wrapper
+
+
+def _wrap_async_request(request):
+    """Return `AsyncNodeClient.request` replacement recording HTTP requests."""
+
+    @functools.wraps(request)
+    async def wrapper(self, method, requrl, params=None, body=None, headers=None):
+        active = _recorder
+        if active is None:
+            return await request(self, method, requrl, params, body, headers)
+        start = time.perf_counter()
+        status, data = await request(self, method, requrl, params, body, headers)
+        active.record(
+            HTTP,
+            _http_operation_name(self.label, method, request_path(requrl, params)),
+            time.perf_counter() - start,
+            len(body or b""),
+            len(data),
+        )
+        return status, data
+
+    return wrapper
+
+
+def _wrap_sandbox_command(command):
+    """Return `call_sandbox_command` replacement recording spawned processes."""
+
+    @functools.wraps(command)
+    def wrapper(*args):
+        active = _recorder
+        if active is None:
+            return command(*args)
+        start = time.perf_counter()
+        process = command(*args)
+        active.record(
+            SANDBOX,
+            " ".join((SANDBOX,) + args[:2]),
+            time.perf_counter() - start,
+            received=len(process.stdout or b"") + len(process.stderr or b""),
+        )
+        return process
+
+    return wrapper
+
+
+def _wrap_function(function, kind):
+    """Return `function` replacement recording its calls as `kind` operations."""
+    name = "%s.%s" % (function.__module__, function.__name__)
+
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            active = _recorder
+            if active is None:
+                return await function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                active.record(kind, name, time.perf_counter() - start)
+
+        return async_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        active = _recorder
+        if active is None:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            active.record(kind, name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _instrumented_functions(module):
+    """Yield two-tuples of module's functions and their wrappers."""
+    for name, function in sorted(vars(module).items()):
+        if not inspect.isfunction(function) or function.__module__ != module.__name__:
+            continue
+        if name == "call_sandbox_command":
+            yield function, _wrap_sandbox_command(function)
+        elif name in WAIT_FUNCTIONS:
+            yield function, _wrap_function(function, WAIT)
+        elif not name.startswith("_"):
+            yield function, _wrap_function(function, HELPER)
+
+
+def _replace_everywhere(original, replacement):
+    """Replace `original` by `replacement` in all the loaded modules.
+
+    Modules importing helpers by `from helpers import ...` keep their own
+    references, so they're replaced too and recorded to be restored.
+    """
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if namespace is None:
+            continue
+        for name, value in list(namespace.items()):
+            if value is original:
+                setattr(module, name, replacement)
+                _originals.append((module, name, original))
+
+
+## ENABLING
+def enable():
+    """Wrap helpers and node requests and return the active recorder."""
+    global _recorder
+    if _recorder is not None:
+        return _recorder
+    _originals.append((ConnectionPool, "request", ConnectionPool.request))
+    ConnectionPool.request = _wrap_request(ConnectionPool.request)
+    _originals.append((AsyncNodeClient, "request", AsyncNodeClient.request))
+    AsyncNodeClient.request = _wrap_async_request(AsyncNodeClient.request)
+    for module_name in INSTRUMENTED_MODULES:
+        module = __import__(module_name)
+        for function, wrapper in _instrumented_functions(module):
+            _replace_everywhere(function, wrapper)
+    _recorder = Recorder()
+    return _recorder
+
+
+def disable():
+    """Restore wrapped functions and return the recorder being deactivated."""
+    global _recorder
+    active, _recorder = _recorder, None
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+    return active
+
+
+## EXPORTING
+def _prometheus_labels(record):
+    """Return Prometheus labels of provided `record`."""
+    return ",".join(
+        '%s="%s"' % (name, str(record[name] or "").replace('"', '\\"'))
+        for name in ("test", "stage", "kind", "operation")
+    )
+
+
+def to_prometheus(records):
+    """Return `records` formatted as Prometheus text exposition."""
+    lines = [
+        "# TYPE helpers_operation_seconds histogram",
+        "# TYPE helpers_operation_bytes_sent_total counter",
+        "# TYPE helpers_operation_bytes_received_total counter",
+    ]
+    for record in records:
+        labels = _prometheus_labels(record)
+        for bound, count in record["histogram"].items():
+            lines.append(
+                'helpers_operation_seconds_bucket{%s,le="%s"} %s'
+                % (labels, bound, count)
+            )
+        lines.append("helpers_operation_seconds_sum{%s} %s" % (labels, record["total"]))
+        lines.append(
+            "helpers_operation_seconds_count{%s} %s" % (labels, record["count"])
+        )
+        lines.append(
+            "helpers_operation_bytes_sent_total{%s} %s" % (labels, record["bytes_sent"])
+        )
+        lines.append(
+            "helpers_operation_bytes_received_total{%s} %s"
+            % (labels, record["bytes_received"])
+        )
+    return "\n".join(lines) + "\n"
+
+
+def export(path, records=None):
+    """Write `records` of the active recorder to `path`.
+
+    Files with `.prom` suffix are written in Prometheus text exposition format
+    and all the other ones as JSON.
+    """
+    records = _recorder.records() if records is None else records
+    with open(path, "w") as export_file:
+        if str(path).endswith(".prom"):
+            export_file.write(to_prometheus(records))
+        else:
+            json.dump(records, export_file, indent=2)
+
+
+def report_lines(active, size=REPORT_SIZE):
+    """Return lines reporting the most expensive tests and operations."""
+    lines = ["most expensive tests (network time, calls):"]
+    for test_name, seconds, calls in active.totals("test")[:size]:
+        lines.append("  %8.3fs %6d  %s" % (seconds, calls, test_name))
+    lines.append("most expensive operations (total time, calls):")
+    kinds = NETWORK_KINDS + (WAIT,)
+    for operation, seconds, calls in active.totals("operation", kinds)[:size]:
+        lines.append("  %8.3fs %6d  %s" % (seconds, calls, operation))
+    return lines
+
+
+## PYTEST PLUGIN
+def pytest_addoption(parser):
+    """Add instrumentation options to pytest."""
+    group = parser.getgroup("instrumentation")
+    group.addoption(
+        "--instrument-export",
+        help="write recorded operations to JSON file or to Prometheus .prom file",
+    )
+    group.addoption(
+        "--instrument-top",
+        type=int,
+        default=REPORT_SIZE,
+        help="number of the most expensive tests and operations to report",
+    )
+
+
+def pytest_configure(config):
+    """Enable instrumentation when the plugin is loaded."""
+    enable()
+
+
+def pytest_unconfigure(config):
+    """Restore instrumented functions."""
+    disable()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Tag operations by the running test."""
+    with current_test(item.nodeid):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    """Tag operations of the test setup."""
+    with stage("setup"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Tag operations of the test call."""
+    with stage("call"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    """Tag operations of the test teardown."""
+    with stage("teardown"):
+        yield
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report the most expensive tests and operations and export them."""
+    active = recorder()
+    if active is None:
+        return
+    terminalreporter.section("instrumentation")
+    for line in report_lines(active, config.getoption("instrument_top")):
+        terminalreporter.write_line(line)
+    path = config.getoption("instrument_export")
+    if path:
+        export(path)
+        terminalreporter.write_line("operations exported to %s" % (path,))
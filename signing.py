@@ -0,0 +1,159 @@
+"""Module containing signing service for large batches of transactions.
+
+Decoded keys are cached per account, every transaction is msgpack encoded only
+once for both its signature and the signed transaction, and big batches are
+signed in chunks by a pool of processes.  Signed transactions are returned
+encoded, ready to be written to bundles or sent by algod raw send.
+"""
+
+import base64
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+
+import msgpack
+from algosdk import account, constants, encoding, mnemonic
+from algosdk.future.transaction import LogicSigTransaction
+from nacl.signing import SigningKey
+
+SIGNING_CHUNK_SIZE = 512
+SIGNING_KEYS_SIZE = 1024
+
+EncodedTransaction = namedtuple("EncodedTransaction", ["transaction_id", "raw"])
+
+_SIGNED_HEADER = b"\x82" + msgpack.packb("sig")
+_SIGNED_TRANSACTION_KEY = msgpack.packb("txn")
+
+
+## KEYS
+@lru_cache(maxsize=SIGNING_KEYS_SIZE)
+def private_key_from_mnemonic(passphrase):
+    """Return private key of provided mnemonic `passphrase` decoded only once."""
+    return mnemonic.to_private_key(passphrase)
+
+
+@lru_cache(maxsize=SIGNING_KEYS_SIZE)
+def _signing_key(private_key):
+    """Return Ed25519 signing key of provided base64 `private_key`."""
+    return SigningKey(base64.b64decode(private_key)[: constants.key_len_bytes])
+
+
+## ENCODING
+def _transaction_id(transaction_bytes):
+    """Return id of the transaction from its canonical msgpack encoding."""
+    digest = encoding.checksum(constants.txid_prefix + transaction_bytes)
+    return base64.b32encode(digest).decode().rstrip("=")
+
+
+def encode_transaction(transaction, keys=None):
+    """Return `EncodedTransaction` of provided transaction.
+
+    Unsigned transactions are signed by the key of their sender from `keys`
+    dictionary, while signed ones and logic signature transactions are only
+    encoded. Unsigned transaction is encoded once and its encoding is used
+    both for the signature and for the signed transaction, which is the same
+    as the one produced by `Transaction.sign` of the SDK.
+    """
+    if hasattr(transaction, "transaction"):
+        return EncodedTransaction(
+            transaction.transaction.get_txid(),
+            base64.b64decode(encoding.msgpack_encode(transaction)),
+        )
+    transaction_bytes = base64.b64decode(encoding.msgpack_encode(transaction))
+    signature = (
+        _signing_key(keys[transaction.sender])
+        .sign(constants.txid_prefix + transaction_bytes)
+        .signature
+    )
+    return EncodedTransaction(
+        _transaction_id(transaction_bytes),
+        _SIGNED_HEADER
+        + msgpack.packb(signature, use_bin_type=True)
+        + _SIGNED_TRANSACTION_KEY
+        + transaction_bytes,
+    )
+
+
+def _encode_chunk(transactions, keys):
+    """Return list of `EncodedTransaction` for the chunk of transactions."""
+    return [encode_transaction(transaction, keys) for transaction in transactions]
+
+
+## SIGNING
+class Signer:
+    """Signing service holding keys of the accounts and a pool of processes.
+
+    Batches smaller than `chunk_size` are signed in the calling process, and
+    the bigger ones are split in chunks signed by the pool created on demand.
+
+    Args:
+        processes (int): number of signing processes, 0 to sign in-process
+        chunk_size (int): number of transactions signed by a single task
+    """
+
+    def __init__(self, processes=None, chunk_size=SIGNING_CHUNK_SIZE):
+        self.processes = os.cpu_count() if processes is None else processes
+        self.chunk_size = chunk_size
+        self._keys = {}
+        self._executor = None
+
+    def add_account(self, private_key=None, passphrase=None):
+        """Cache key of the account from `private_key` or `passphrase`.
+
+        Returns address of the account whose transactions are signed by the key.
+        """
+        if private_key is None:
+            private_key = private_key_from_mnemonic(passphrase)
+        address = account.address_from_private_key(private_key)
+        self._keys[address] = private_key
+        return address
+
+    def _pool(self):
+        """Return the pool of signing processes creating it the first time."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def sign(self, transactions):
+        """Return list of `EncodedTransaction` in the order of `transactions`.
+
+        Unsigned transactions are signed by the cached key of their sender, and
+        `LogicSigTransaction` and other signed transactions are only encoded.
+        """
+        transactions = list(transactions)
+        if self.processes < 2 or len(transactions) <= self.chunk_size:
+            return _encode_chunk(transactions, self._keys)
+        senders = {
+            transaction.sender
+            for transaction in transactions
+            if not hasattr(transaction, "transaction")
+        }
+        keys = {address: self._keys[address] for address in senders}
+        chunks = [
+            transactions[start : start + self.chunk_size]
+            for start in range(0, len(transactions), self.chunk_size)
+        ]
+        encoded = []
+        for chunk in self._pool().map(_encode_chunk, chunks, repeat(keys)):
+            encoded.extend(chunk)
+        return encoded
+
+    def sign_logic_transactions(self, transactions, logic_sig):
+        """Return encoded `LogicSigTransaction` wrappers of provided transactions."""
+        return self.sign(
+            LogicSigTransaction(transaction, logic_sig) for transaction in transactions
+        )
+
+    def close(self):
+        """Shut the pool of signing processes down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
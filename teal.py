@@ -0,0 +1,857 @@
+"""Module containing offline assembler and evaluator of TEAL programs.
+
+Only the opcodes available to logic signatures up to TEAL version 3 are supported,
+what covers the bank contract and the split template programs.
+"""
+
+import base64
+import codecs
+import hashlib
+import struct
+from collections import namedtuple
+
+from algosdk import encoding
+from Cryptodome.Hash import SHA512, keccak
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+MAX_VERSION = 3
+LOGIC_SIG_MAX_COST = 20000
+MAX_UINT64 = 2**64 - 1
+ZERO_ADDRESS = bytes(32)
+
+TXN_FIELDS = [
+    ("Sender", "B"),
+    ("Fee", "U"),
+    ("FirstValid", "U"),
+    ("FirstValidTime", "U"),
+    ("LastValid", "U"),
+    ("Note", "B"),
+    ("Lease", "B"),
+    ("Receiver", "B"),
+    ("Amount", "U"),
+    ("CloseRemainderTo", "B"),
+    ("VotePK", "B"),
+    ("SelectionPK", "B"),
+    ("VoteFirst", "U"),
+    ("VoteLast", "U"),
+    ("VoteKeyDilution", "U"),
+    ("Type", "B"),
+    ("TypeEnum", "U"),
+    ("XferAsset", "U"),
+    ("AssetAmount", "U"),
+    ("AssetSender", "B"),
+    ("AssetReceiver", "B"),
+    ("AssetCloseTo", "B"),
+    ("GroupIndex", "U"),
+    ("TxID", "B"),
+    ("ApplicationID", "U"),
+    ("OnCompletion", "U"),
+    ("ApplicationArgs", "B"),
+    ("NumAppArgs", "U"),
+    ("Accounts", "B"),
+    ("NumAccounts", "U"),
+    ("ApprovalProgram", "B"),
+    ("ClearStateProgram", "B"),
+    ("RekeyTo", "B"),
+    ("ConfigAsset", "U"),
+    ("ConfigAssetTotal", "U"),
+    ("ConfigAssetDecimals", "U"),
+    ("ConfigAssetDefaultFrozen", "U"),
+    ("ConfigAssetUnitName", "B"),
+    ("ConfigAssetName", "B"),
+    ("ConfigAssetURL", "B"),
+    ("ConfigAssetMetadataHash", "B"),
+    ("ConfigAssetManager", "B"),
+    ("ConfigAssetReserve", "B"),
+    ("ConfigAssetFreeze", "B"),
+    ("ConfigAssetClawback", "B"),
+    ("FreezeAsset", "U"),
+    ("FreezeAssetAccount", "B"),
+    ("FreezeAssetFrozen", "U"),
+    ("Assets", "U"),
+    ("NumAssets", "U"),
+    ("Applications", "U"),
+    ("NumApplications", "U"),
+    ("GlobalNumUint", "U"),
+    ("GlobalNumByteSlice", "U"),
+    ("LocalNumUint", "U"),
+    ("LocalNumByteSlice", "U"),
+]
+TXN_FIELD_INDEXES = {name: index for index, (name, _) in enumerate(TXN_FIELDS)}
+GLOBAL_FIELDS = [
+    "MinTxnFee",
+    "MinBalance",
+    "MaxTxnLife",
+    "ZeroAddress",
+    "GroupSize",
+    "LogicSigVersion",
+    "Round",
+    "LatestTimestamp",
+    "CurrentApplicationID",
+    "CreatorAddress",
+]
+APPLICATION_GLOBALS = {"Round", "LatestTimestamp", "CurrentApplicationID"}
+NAMED_INTS = {
+    "unknown": 0,
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+}
+DEFAULT_GLOBALS = {
+    "MinTxnFee": 1000,
+    "MinBalance": 100000,
+    "MaxTxnLife": 1000,
+    "LogicSigVersion": 5,
+}
+
+# name: (opcode, immediates, cost or {first version: cost}, minimum version)
+OPCODES = {
+    "err": (0x00, "", 1, 1),
+    "sha256": (0x01, "", {1: 7, 2: 35}, 1),
+    "keccak256": (0x02, "", {1: 26, 2: 130}, 1),
+    "sha512_256": (0x03, "", {1: 9, 2: 45}, 1),
+    "ed25519verify": (0x04, "", 1900, 1),
+    "+": (0x08, "", 1, 1),
+    "-": (0x09, "", 1, 1),
+    "/": (0x0A, "", 1, 1),
+    "*": (0x0B, "", 1, 1),
+    "<": (0x0C, "", 1, 1),
+    ">": (0x0D, "", 1, 1),
+    "<=": (0x0E, "", 1, 1),
+    ">=": (0x0F, "", 1, 1),
+    "&&": (0x10, "", 1, 1),
+    "||": (0x11, "", 1, 1),
+    "==": (0x12, "", 1, 1),
+    "!=": (0x13, "", 1, 1),
+    "!": (0x14, "", 1, 1),
+    "len": (0x15, "", 1, 1),
+    "itob": (0x16, "", 1, 1),
+    "btoi": (0x17, "", 1, 1),
+    "%": (0x18, "", 1, 1),
+    "|": (0x19, "", 1, 1),
+    "&": (0x1A, "", 1, 1),
+    "^": (0x1B, "", 1, 1),
+    "~": (0x1C, "", 1, 1),
+    "mulw": (0x1D, "", 1, 1),
+    "addw": (0x1E, "", 1, 2),
+    "intcblock": (0x20, "intcblock", 1, 1),
+    "intc": (0x21, "u", 1, 1),
+    "intc_0": (0x22, "", 1, 1),
+    "intc_1": (0x23, "", 1, 1),
+    "intc_2": (0x24, "", 1, 1),
+    "intc_3": (0x25, "", 1, 1),
+    "bytecblock": (0x26, "bytecblock", 1, 1),
+    "bytec": (0x27, "u", 1, 1),
+    "bytec_0": (0x28, "", 1, 1),
+    "bytec_1": (0x29, "", 1, 1),
+    "bytec_2": (0x2A, "", 1, 1),
+    "bytec_3": (0x2B, "", 1, 1),
+    "arg": (0x2C, "u", 1, 1),
+    "arg_0": (0x2D, "", 1, 1),
+    "arg_1": (0x2E, "", 1, 1),
+    "arg_2": (0x2F, "", 1, 1),
+    "arg_3": (0x30, "", 1, 1),
+    "txn": (0x31, "f", 1, 1),
+    "global": (0x32, "g", 1, 1),
+    "gtxn": (0x33, "uf", 1, 1),
+    "load": (0x34, "u", 1, 1),
+    "store": (0x35, "u", 1, 1),
+    "txna": (0x36, "fu", 1, 2),
+    "gtxna": (0x37, "ufu", 1, 2),
+    "gtxns": (0x38, "f", 1, 3),
+    "gtxnsa": (0x39, "fu", 1, 3),
+    "bnz": (0x40, "l", 1, 1),
+    "bz": (0x41, "l", 1, 2),
+    "b": (0x42, "l", 1, 2),
+    "return": (0x43, "", 1, 2),
+    "assert": (0x44, "", 1, 3),
+    "pop": (0x48, "", 1, 1),
+    "dup": (0x49, "", 1, 1),
+    "dup2": (0x4A, "", 1, 2),
+    "dig": (0x4B, "u", 1, 3),
+    "swap": (0x4C, "", 1, 3),
+    "select": (0x4D, "", 1, 3),
+    "concat": (0x50, "", 1, 2),
+    "substring": (0x51, "uu", 1, 2),
+    "substring3": (0x52, "", 1, 2),
+    "getbit": (0x53, "", 1, 3),
+    "setbit": (0x54, "", 1, 3),
+    "getbyte": (0x55, "", 1, 3),
+    "setbyte": (0x56, "", 1, 3),
+    "pushbytes": (0x80, "pushbytes", 1, 3),
+    "pushint": (0x81, "pushint", 1, 3),
+}
+OPCODE_NAMES = {spec[0]: name for name, spec in OPCODES.items()}
+
+Instruction = namedtuple("Instruction", ["pc", "name", "immediates", "cost"])
+TraceStep = namedtuple("TraceStep", ["pc", "opcode", "cost", "stack"])
+EvalResult = namedtuple(
+    "EvalResult", ["passed", "error", "pc", "opcode", "cost", "trace"]
+)
+
+
+class TealError(Exception):
+    """Error raised for invalid programs and failed evaluations."""
+
+
+## ENCODING
+def _put_uvarint(value):
+    """Return `value` encoded as unsigned varint."""
+    buffer = bytearray()
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+    return bytes(buffer)
+
+
+def _read_uvarint(program, offset):
+    """Return two-tuple of unsigned varint at `offset` and offset after it."""
+    value, shift = 0, 0
+    while offset < len(program):
+        byte = program[offset]
+        value |= (byte & 0x7F) << shift
+        offset += 1
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+    raise TealError("could not decode varint at %s" % (offset,))
+
+
+def _read_bytes(program, offset):
+    """Return two-tuple of length prefixed bytes at `offset` and offset after it."""
+    length, offset = _read_uvarint(program, offset)
+    if offset + length > len(program):
+        raise TealError("byte constant exceeds program length")
+    return program[offset : offset + length], offset + length
+
+
+## ASSEMBLER
+def _parse_bytes(arguments):
+    """Return bytes value of `byte` pseudo-op arguments."""
+    first = arguments[0]
+    if first.startswith("0x"):
+        return bytes.fromhex(first[2:])
+    if first.startswith('"'):
+        return codecs.escape_decode(" ".join(arguments)[1:-1].encode("utf8"))[0]
+    for prefix, decode in (("base64", base64.b64decode), ("b64", base64.b64decode)):
+        if first == prefix:
+            return decode(arguments[1])
+        if first.startswith(prefix + "(") and first.endswith(")"):
+            return decode(first[len(prefix) + 1 : -1])
+    if first in ("base32", "b32"):
+        return base64.b32decode(arguments[1] + "=" * (-len(arguments[1]) % 8))
+    raise TealError("unknown byte literal %s" % (" ".join(arguments),))
+
+
+def _parse_int(argument):
+    """Return integer value of `int` pseudo-op argument."""
+    if argument in NAMED_INTS:
+        return NAMED_INTS[argument]
+    return int(argument, 0)
+
+
+def _tokenize(source):
+    """Return version and list of (name, arguments) parsed from TEAL `source`."""
+    version, lines = 1, []
+    for line in source.splitlines():
+        line = line.split("//")[0].strip() if '"' not in line else line.strip()
+        if not line:
+            continue
+        if line.startswith("#pragma version"):
+            version = int(line.split()[-1])
+            continue
+        tokens = line.split()
+        lines.append((tokens[0], tokens[1:]))
+    return version, lines
+
+
+def _field_index(field):
+    """Return index of transaction field having provided name."""
+    if field not in TXN_FIELD_INDEXES:
+        raise TealError("unknown txn field %s" % (field,))
+    return TXN_FIELD_INDEXES[field]
+
+
+def _encode_immediates(kind, arguments, labels, pc):
+    """Return encoded immediates of instruction having immediates `kind`."""
+    encoded = bytearray()
+    for code, argument in zip(kind, arguments):
+        if code == "u":
+            encoded.append(int(argument, 0))
+        elif code == "f":
+            encoded.append(_field_index(argument))
+        elif code == "g":
+            encoded.append(GLOBAL_FIELDS.index(argument))
+        elif code == "l":
+            if argument not in labels:
+                raise TealError("reference to undefined label %s" % (argument,))
+            encoded += struct.pack(">h", labels[argument] - (pc + 3))
+    return bytes(encoded)
+
+
+def assemble(source):
+    """Assemble TEAL `source` and return program bytecode.
+
+    Constants of `int`, `byte` and `addr` pseudo-ops are collected in constant
+    blocks ordered by their frequency in the source.
+    """
+    version, lines = _tokenize(source)
+    if version > MAX_VERSION:
+        raise TealError("unsupported version %s" % (version,))
+    ints, byte_values = {}, {}
+    statements = []
+    for name, arguments in lines:
+        if name == "int":
+            value = _parse_int(arguments[0])
+            ints[value] = ints.get(value, 0) + 1
+            statements.append(("int", value))
+        elif name in ("byte", "addr"):
+            value = (
+                encoding.decode_address(arguments[0])
+                if name == "addr"
+                else _parse_bytes(arguments)
+            )
+            byte_values[value] = byte_values.get(value, 0) + 1
+            statements.append(("byte", value))
+        else:
+            statements.append((name, arguments))
+
+    int_constants = sorted(ints, key=lambda value: -ints[value])
+    byte_constants = sorted(byte_values, key=lambda value: -byte_values[value])
+    header = _put_uvarint(version)
+    if int_constants:
+        header += bytes([OPCODES["intcblock"][0]]) + _put_uvarint(len(int_constants))
+        header += b"".join(_put_uvarint(value) for value in int_constants)
+    if byte_constants:
+        header += bytes([OPCODES["bytecblock"][0]]) + _put_uvarint(len(byte_constants))
+        header += b"".join(_put_uvarint(len(value)) + value for value in byte_constants)
+
+    def constant_instruction(prefix, index):
+        if index < 4:
+            return bytes([OPCODES["%s_%s" % (prefix, index)][0]])
+        return bytes([OPCODES[prefix][0], index])
+
+    chunks, labels, fixups, pc = [], {}, [], len(header)
+    for name, arguments in statements:
+        if name == "int":
+            chunk = constant_instruction("intc", int_constants.index(arguments))
+        elif name == "byte":
+            chunk = constant_instruction("bytec", byte_constants.index(arguments))
+        elif name.endswith(":"):
+            labels[name[:-1]] = pc
+            continue
+        elif name not in OPCODES or OPCODES[name][3] > version:
+            raise TealError("unknown opcode %s in version %s" % (name, version))
+        else:
+            opcode, kind, _, _ = OPCODES[name]
+            if kind == "pushint":
+                chunk = bytes([opcode]) + _put_uvarint(_parse_int(arguments[0]))
+            elif kind == "pushbytes":
+                value = _parse_bytes(arguments)
+                chunk = bytes([opcode]) + _put_uvarint(len(value)) + value
+            elif kind == "l":
+                fixups.append((len(chunks), pc, name, arguments))
+                chunk = bytes(3)
+            else:
+                chunk = bytes([opcode]) + _encode_immediates(kind, arguments, {}, pc)
+        chunks.append(chunk)
+        pc += len(chunk)
+
+    for index, chunk_pc, name, arguments in fixups:
+        chunks[index] = bytes([OPCODES[name][0]]) + _encode_immediates(
+            "l", arguments, labels, chunk_pc
+        )
+    return header + b"".join(chunks)
+
+
+## DECODING
+def _opcode_cost(name, version):
+    """Return cost of opcode `name` in the program of TEAL `version`."""
+    cost = OPCODES[name][2]
+    if isinstance(cost, dict):
+        return cost[max(first for first in cost if first <= version)]
+    return cost
+
+
+def _decode_instruction(program, pc, version):
+    """Return instruction starting at `pc` and offset of the next instruction."""
+    name = OPCODE_NAMES.get(program[pc])
+    if name is None:
+        raise TealError("illegal opcode 0x%02x at %s" % (program[pc], pc))
+    kind = OPCODES[name][1]
+    offset = pc + 1
+    if kind == "intcblock":
+        count, offset = _read_uvarint(program, offset)
+        immediates = []
+        for _ in range(count):
+            value, offset = _read_uvarint(program, offset)
+            immediates.append(value)
+        immediates = (tuple(immediates),)
+    elif kind == "bytecblock":
+        count, offset = _read_uvarint(program, offset)
+        immediates = []
+        for _ in range(count):
+            value, offset = _read_bytes(program, offset)
+            immediates.append(value)
+        immediates = (tuple(immediates),)
+    elif kind == "pushint":
+        value, offset = _read_uvarint(program, offset)
+        immediates = (value,)
+    elif kind == "pushbytes":
+        value, offset = _read_bytes(program, offset)
+        immediates = (value,)
+    elif kind == "l":
+        if offset + 2 > len(program):
+            raise TealError("branch offset exceeds program length")
+        target = pc + 3 + struct.unpack(">h", program[offset : offset + 2])[0]
+        immediates, offset = (target,), offset + 2
+    else:
+        if offset + len(kind) > len(program):
+            raise TealError("%s immediates exceed program length" % (name,))
+        immediates = tuple(program[offset : offset + len(kind)])
+        offset += len(kind)
+    return Instruction(pc, name, immediates, _opcode_cost(name, version)), offset
+
+
+class Program:
+    """Decoded TEAL program ready for repeated evaluation.
+
+    Args:
+        bytecode (bytes): compiled program
+    """
+
+    def __init__(self, bytecode):
+        self.bytecode = bytes(bytecode)
+        self.version, offset = _read_uvarint(self.bytecode, 0)
+        if not 0 < self.version <= MAX_VERSION:
+            raise TealError("unsupported version %s" % (self.version,))
+        self.instructions = []
+        self.indexes = {}
+        while offset < len(self.bytecode):
+            instruction, next_offset = _decode_instruction(
+                self.bytecode, offset, self.version
+            )
+            if OPCODES[instruction.name][3] > self.version:
+                raise TealError(
+                    "%s opcode was introduced in TEAL v%s"
+                    % (instruction.name, OPCODES[instruction.name][3])
+                )
+            self.indexes[offset] = len(self.instructions)
+            self.instructions.append(instruction)
+            offset = next_offset
+        self.indexes[len(self.bytecode)] = len(self.instructions)
+        for instruction in self.instructions:
+            if OPCODES[instruction.name][1] == "l":
+                target = instruction.immediates[0]
+                if target <= instruction.pc or target not in self.indexes:
+                    raise TealError("invalid branch target at %s" % (instruction.pc,))
+
+    def address(self):
+        """Return escrow address of the program."""
+        return encoding.encode_address(encoding.checksum(b"Program" + self.bytecode))
+
+
+## EVALUATION
+def _transaction_type(transaction):
+    """Return type string of provided SDK transaction object."""
+    return getattr(transaction, "type", "unknown")
+
+
+def _address_bytes(address):
+    """Return 32 bytes of provided address or zero address if it's not set."""
+    return encoding.decode_address(address) if address else ZERO_ADDRESS
+
+
+def _transaction_field(transaction, group_index, field, array_index=None):
+    """Return value of transaction `field` for provided SDK transaction object."""
+    name, field_type = TXN_FIELDS[field]
+    if name == "FirstValidTime":
+        raise TealError("FirstValidTime field is not supported")
+    if array_index is not None or name in (
+        "ApplicationArgs",
+        "Accounts",
+        "Assets",
+        "Applications",
+    ):
+        raise TealError("invalid %s index %s" % (name, array_index))
+    values = {
+        "Sender": lambda: _address_bytes(transaction.sender),
+        "Fee": lambda: transaction.fee,
+        "FirstValid": lambda: transaction.first_valid_round,
+        "LastValid": lambda: transaction.last_valid_round,
+        "Note": lambda: transaction.note or b"",
+        "Lease": lambda: transaction.lease or b"",
+        "Receiver": lambda: _address_bytes(getattr(transaction, "receiver", None)),
+        "Amount": lambda: getattr(transaction, "amt", 0),
+        "CloseRemainderTo": lambda: _address_bytes(
+            getattr(transaction, "close_remainder_to", None)
+        ),
+        "Type": lambda: _transaction_type(transaction).encode(),
+        "TypeEnum": lambda: NAMED_INTS.get(_transaction_type(transaction), 0),
+        "GroupIndex": lambda: group_index,
+        "TxID": lambda: base64.b32decode(transaction.get_txid() + "===="),
+        "RekeyTo": lambda: _address_bytes(transaction.rekey_to),
+    }
+    if name in values:
+        return values[name]()
+    return b"" if field_type == "B" else 0
+
+
+class _Machine:
+    """Stack machine evaluating a single transaction of a group."""
+
+    def __init__(self, program, group, group_index, args, globals_):
+        self.program = program
+        self.group = group
+        self.group_index = group_index
+        self.args = args
+        self.globals = globals_
+        self.stack = []
+        self.scratch = [0] * 256
+        self.int_constants = ()
+        self.byte_constants = ()
+
+    def pop(self, expected=None):
+        """Pop and return the top of the stack checking its type."""
+        if not self.stack:
+            raise TealError("stack underflow")
+        value = self.stack.pop()
+        if expected is int and not isinstance(value, int):
+            raise TealError("wanted type uint64 got []byte")
+        if expected is bytes and not isinstance(value, bytes):
+            raise TealError("wanted type []byte got uint64")
+        return value
+
+    def pop_ints(self, count=2):
+        """Pop and return `count` uint64 values in the order they were pushed."""
+        return [self.pop(int) for _ in range(count)][::-1]
+
+    def global_field(self, field):
+        """Return value of global field having provided index."""
+        name = GLOBAL_FIELDS[field]
+        if name in APPLICATION_GLOBALS or name == "CreatorAddress":
+            raise TealError("global %s not allowed in Signature mode" % (name,))
+        if name == "ZeroAddress":
+            return ZERO_ADDRESS
+        if name == "GroupSize":
+            return len(self.group)
+        return self.globals[name]
+
+    def group_field(self, index, field, array_index=None):
+        """Return field of transaction at `index` in the group."""
+        if index >= len(self.group):
+            raise TealError("txn index %s, len(group) is %s" % (index, len(self.group)))
+        return _transaction_field(self.group[index], index, field, array_index)
+
+
+def _arithmetic(machine, name):
+    """Evaluate arithmetic or bitwise opcode having provided `name`."""
+    first, second = machine.pop_ints()
+    if name == "+":
+        result = first + second
+    elif name == "-":
+        if second > first:
+            raise TealError("- would result negative")
+        result = first - second
+    elif name in ("/", "%"):
+        if second == 0:
+            raise TealError("%s 0" % (name,))
+        result = first // second if name == "/" else first % second
+    elif name == "*":
+        result = first * second
+    elif name == "|":
+        result = first | second
+    elif name == "&":
+        result = first & second
+    else:
+        result = first ^ second
+    if result > MAX_UINT64:
+        raise TealError("%s overflowed" % (name,))
+    machine.stack.append(result)
+
+
+def _compare(machine, name):
+    """Evaluate comparison or logical opcode having provided `name`."""
+    if name in ("==", "!="):
+        second, first = machine.pop(), machine.pop()
+        if type(first) is not type(second):
+            raise TealError("cannot compare (%s to %s)" % (type(first), type(second)))
+        result = first == second if name == "==" else first != second
+    else:
+        first, second = machine.pop_ints()
+        result = {
+            "<": first < second,
+            ">": first > second,
+            "<=": first <= second,
+            ">=": first >= second,
+            "&&": bool(first) and bool(second),
+            "||": bool(first) or bool(second),
+        }[name]
+    machine.stack.append(int(result))
+
+
+def _hash(machine, name):
+    """Evaluate hashing opcode having provided `name`."""
+    data = machine.pop(bytes)
+    if name == "sha256":
+        machine.stack.append(hashlib.sha256(data).digest())
+    elif name == "keccak256":
+        machine.stack.append(keccak.new(data=data, digest_bits=256).digest())
+    else:
+        machine.stack.append(SHA512.new(data, truncate="256").digest())
+
+
+def _ed25519verify(machine):
+    """Verify signature of data signed for the evaluated program."""
+    public_key, signature, data = (
+        machine.pop(bytes),
+        machine.pop(bytes),
+        machine.pop(bytes),
+    )
+    program_hash = encoding.checksum(b"Program" + machine.program.bytecode)
+    try:
+        VerifyKey(public_key).verify(b"ProgData" + program_hash + data, signature)
+        machine.stack.append(1)
+    except (BadSignatureError, ValueError):
+        machine.stack.append(0)
+
+
+def _step(machine, instruction):
+    """Evaluate single `instruction` and return index of the next one or None."""
+    name, immediates = instruction.name, instruction.immediates
+    stack = machine.stack
+    if name in ("+", "-", "/", "*", "%", "|", "&", "^"):
+        _arithmetic(machine, name)
+    elif name in ("<", ">", "<=", ">=", "&&", "||", "==", "!="):
+        _compare(machine, name)
+    elif name.startswith("intc_") or name == "intc":
+        index = int(name[5:]) if name != "intc" else immediates[0]
+        if index >= len(machine.int_constants):
+            raise TealError(
+                "intc %s beyond %s constants" % (index, len(machine.int_constants))
+            )
+        stack.append(machine.int_constants[index])
+    elif name.startswith("bytec_") or name == "bytec":
+        index = int(name[6:]) if name != "bytec" else immediates[0]
+        if index >= len(machine.byte_constants):
+            raise TealError(
+                "bytec %s beyond %s constants" % (index, len(machine.byte_constants))
+            )
+        stack.append(machine.byte_constants[index])
+    elif name == "intcblock":
+        machine.int_constants = immediates[0]
+    elif name == "bytecblock":
+        machine.byte_constants = immediates[0]
+    elif name in ("pushint", "pushbytes"):
+        stack.append(immediates[0])
+    elif name == "txn":
+        stack.append(machine.group_field(machine.group_index, immediates[0]))
+    elif name == "gtxn":
+        stack.append(machine.group_field(immediates[0], immediates[1]))
+    elif name == "gtxns":
+        stack.append(machine.group_field(machine.pop(int), immediates[0]))
+    elif name == "txna":
+        stack.append(
+            machine.group_field(machine.group_index, immediates[0], immediates[1])
+        )
+    elif name == "gtxna":
+        stack.append(machine.group_field(*immediates))
+    elif name == "gtxnsa":
+        stack.append(machine.group_field(machine.pop(int), *immediates))
+    elif name == "global":
+        stack.append(machine.global_field(immediates[0]))
+    elif name in ("bnz", "bz", "b"):
+        if name == "b" or (machine.pop(int) != 0) == (name == "bnz"):
+            return machine.program.indexes[immediates[0]]
+    elif name == "return":
+        value = machine.pop(int)
+        machine.stack[:] = [value]
+        return len(machine.program.instructions)
+    elif name == "err":
+        raise TealError("err opcode executed")
+    elif name == "assert":
+        if machine.pop(int) == 0:
+            raise TealError("assert failed")
+    elif name in ("sha256", "keccak256", "sha512_256"):
+        _hash(machine, name)
+    elif name == "ed25519verify":
+        _ed25519verify(machine)
+    elif name == "!":
+        stack.append(int(machine.pop(int) == 0))
+    elif name == "~":
+        stack.append(MAX_UINT64 ^ machine.pop(int))
+    elif name == "len":
+        stack.append(len(machine.pop(bytes)))
+    elif name == "itob":
+        stack.append(struct.pack(">Q", machine.pop(int)))
+    elif name == "btoi":
+        value = machine.pop(bytes)
+        if len(value) > 8:
+            raise TealError("btoi arg too long, got %s bytes" % (len(value),))
+        stack.append(int.from_bytes(value, "big"))
+    elif name in ("mulw", "addw"):
+        first, second = machine.pop_ints()
+        result = first * second if name == "mulw" else first + second
+        stack += [result >> 64, result & MAX_UINT64]
+    elif name.startswith("arg"):
+        index = int(name[4:]) if name != "arg" else immediates[0]
+        if index >= len(machine.args):
+            raise TealError("cannot load arg[%s] of %s" % (index, len(machine.args)))
+        stack.append(machine.args[index])
+    elif name == "load":
+        stack.append(machine.scratch[immediates[0]])
+    elif name == "store":
+        machine.scratch[immediates[0]] = machine.pop()
+    elif name == "pop":
+        machine.pop()
+    elif name == "dup":
+        value = machine.pop()
+        stack += [value, value]
+    elif name == "dup2":
+        second, first = machine.pop(), machine.pop()
+        stack += [first, second, first, second]
+    elif name == "dig":
+        if immediates[0] >= len(stack):
+            raise TealError("dig %s with stack size %s" % (immediates[0], len(stack)))
+        stack.append(stack[-1 - immediates[0]])
+    elif name == "swap":
+        second, first = machine.pop(), machine.pop()
+        stack += [second, first]
+    elif name == "select":
+        condition, second, first = machine.pop(int), machine.pop(), machine.pop()
+        stack.append(second if condition else first)
+    elif name == "concat":
+        second, first = machine.pop(bytes), machine.pop(bytes)
+        if len(first) + len(second) > 4096:
+            raise TealError("concat produced a too big byte-array")
+        stack.append(first + second)
+    elif name in ("substring", "substring3"):
+        if name == "substring":
+            start, end = immediates
+        else:
+            start, end = machine.pop_ints()
+        value = machine.pop(bytes)
+        if end < start or end > len(value):
+            raise TealError("substring range beyond length of string")
+        stack.append(value[start:end])
+    elif name in ("getbyte", "setbyte", "getbit", "setbit"):
+        _byte_or_bit(machine, name)
+    return None
+
+
+def _byte_or_bit(machine, name):
+    """Evaluate opcodes getting or setting single byte or bit."""
+    value = machine.pop() if name.startswith("set") else None
+    index = machine.pop(int)
+    target = machine.pop()
+    if name.endswith("byte"):
+        if not isinstance(target, bytes) or index >= len(target):
+            raise TealError("%s index %s beyond array length" % (name, index))
+        if value is None:
+            machine.stack.append(target[index])
+        else:
+            if not isinstance(value, int) or value > 255:
+                raise TealError("setbyte value %s > 255" % (value,))
+            machine.stack.append(target[:index] + bytes([value]) + target[index + 1 :])
+        return
+    if isinstance(target, int):
+        if index > 63:
+            raise TealError("%s index %s beyond 63" % (name, index))
+        if value is None:
+            machine.stack.append((target >> index) & 1)
+        else:
+            mask = 1 << index
+            machine.stack.append(target | mask if value else target & ~mask)
+        return
+    if index >= len(target) * 8:
+        raise TealError("%s index %s beyond byteslice" % (name, index))
+    byte_index, bit = index // 8, 7 - index % 8
+    if value is None:
+        machine.stack.append((target[byte_index] >> bit) & 1)
+    else:
+        mask = 1 << bit
+        byte = target[byte_index] | mask if value else target[byte_index] & ~mask
+        machine.stack.append(
+            target[:byte_index] + bytes([byte]) + target[byte_index + 1 :]
+        )
+
+
+def evaluate(
+    program,
+    transaction,
+    group=None,
+    args=(),
+    trace=False,
+    globals_=None,
+):
+    """Evaluate logic signature `program` for `transaction` and return `EvalResult`.
+
+    Args:
+        program (bytes or :class:`Program`): compiled program or decoded one
+        transaction (:class:`Transaction`): SDK transaction signed by the program
+        group (list): SDK transactions of the group the transaction belongs to
+        args (list): logic signature arguments as bytes
+        trace (bool): collect `TraceStep` for every evaluated instruction
+        globals_ (dict): values of global fields overriding DEFAULT_GLOBALS
+    """
+    if not isinstance(program, Program):
+        program = Program(program)
+    group = list(group) if group else [transaction]
+    group_index = next(
+        (index for index, member in enumerate(group) if member is transaction), 0
+    )
+    machine = _Machine(
+        program, group, group_index, list(args), {**DEFAULT_GLOBALS, **(globals_ or {})}
+    )
+
+    steps, cost, index, instruction = [], 0, 0, None
+    instructions = program.instructions
+    try:
+        while index < len(instructions):
+            instruction = instructions[index]
+            cost += instruction.cost
+            if cost > LOGIC_SIG_MAX_COST:
+                raise TealError("program cost exceeds %s" % (LOGIC_SIG_MAX_COST,))
+            next_index = _step(machine, instruction)
+            if trace:
+                steps.append(
+                    TraceStep(
+                        instruction.pc, instruction.name, cost, tuple(machine.stack)
+                    )
+                )
+            index = index + 1 if next_index is None else next_index
+        if len(machine.stack) != 1:
+            raise TealError("stack len is %s instead of 1" % (len(machine.stack),))
+        if not isinstance(machine.stack[0], int):
+            raise TealError("stack finished with bytes not int")
+    except TealError as exception:
+        pc = instruction.pc if instruction else 0
+        opcode = instruction.name if instruction else None
+        return EvalResult(False, str(exception), pc, opcode, cost, steps)
+
+    pc, opcode = instruction.pc if instruction else 0, getattr(
+        instruction, "name", None
+    )
+    if machine.stack[0] == 0:
+        return EvalResult(False, "rejected by logic", pc, opcode, cost, steps)
+    return EvalResult(True, None, pc, opcode, cost, steps)
+
+
+def evaluate_many(program, transactions, **kwargs):
+    """Evaluate `program` for every transaction and return list of `EvalResult`.
+
+    The program is decoded only once for all the transactions.
+    """
+    program = program if isinstance(program, Program) else Program(program)
+    return [evaluate(program, transaction, **kwargs) for transaction in transactions]
@@ -0,0 +1,111 @@
+"""Module for testing stage-level benchmarks of the contracts lifecycles."""
+
+import json
+
+import pytest
+
+import benchmarks
+
+
+def _results(p50, p95, stage="submit"):
+    """Return results of the bank lifecycle having provided percentiles."""
+    stats = {"count": 1, "mean": p50, "p50": p50, "p95": p95, "p99": p95}
+    return {"results": {"4": {"bank": {"stages": {stage: stats}}}}}
+
+
+class TestStatistics:
+    """Class for testing summaries of the measured durations."""
+
+    @pytest.mark.parametrize("percent,expected", [(50, 5), (95, 10), (99, 10)])
+    def test_percentile_uses_nearest_rank(self, percent, expected):
+        """Percentile should be the value at the nearest rank."""
+        assert benchmarks.percentile(range(1, 11), percent) == expected
+
+    def test_summarize_orders_stages_and_converts_to_milliseconds(self):
+        """Stages should follow lifecycle order and have millisecond durations."""
+        summary = benchmarks.summarize({"submit": [0.002], "funding": [0.001, 0.003]})
+        assert list(summary) == ["funding", "submit"]
+        assert summary["funding"]["p50"] == pytest.approx(1)
+        assert summary["funding"]["mean"] == pytest.approx(2)
+
+    def test_stage_timer_measures_only_outermost_stage(self):
+        """Stages nested in another stage of the same thread shouldn't be measured."""
+        timer = benchmarks.StageTimer()
+        with timer.stage("funding"):
+            with timer.stage("submit"):
+                pass
+        with timer.stage("submit"):
+            pass
+        assert {stage: len(samples) for stage, samples in timer.samples.items()} == {
+            "funding": 1,
+            "submit": 1,
+        }
+
+
+class TestCompareResults:
+    """Class for testing detection of regressions against the baseline."""
+
+    def test_compare_results_flags_slower_percentiles(self):
+        """Percentiles slower than the threshold allows should be reported."""
+        regressions = benchmarks.compare_results(
+            _results(10, 20), _results(11, 30), threshold=0.2
+        )
+        assert [regression["percentile"] for regression in regressions] == ["p95"]
+        assert regressions[0]["lifecycle"] == "bank"
+
+    def test_compare_results_ignores_stages_missing_in_baseline(self):
+        """Stages not measured by the baseline shouldn't be compared."""
+        baseline = _results(10, 20, stage="funding")
+        assert benchmarks.compare_results(baseline, _results(50, 50)) == []
+
+
+class TestRunBenchmarks:
+    """Class for testing benchmarks run against the fake node."""
+
+    def test_run_measures_every_stage_and_compares_with_baseline(self, tmp_path):
+        """Bank and split lifecycles should be measured and compared."""
+        output = tmp_path / "results.json"
+        status = benchmarks.main(
+            [
+                "run",
+                "--fake-node",
+                "--concurrency",
+                "2",
+                "--iterations",
+                "3",
+                "--output",
+                str(output),
+            ]
+        )
+        results = json.loads(output.read_text())
+        assert status == 0
+        assert list(results["results"]["2"]["bank"]["stages"]) == list(
+            benchmarks.STAGES
+        )
+        assert results["results"]["2"]["split"]["stages"]["submit"]["count"] == 3
+        assert benchmarks.main(["compare", str(output), str(output)]) == 0
+
+
+class TestImports:
+    """Class for testing import times of the modules guarded by budgets."""
+
+    @pytest.mark.parametrize("module", sorted(benchmarks.IMPORT_BUDGETS))
+    def test_module_doesnt_import_lazy_modules(self, module):
+        """Heavy dependencies shouldn't be imported together with the module."""
+        result = benchmarks.measure_import(module, runs=1)
+        assert result["eager"] == []
+        assert result["ms"] > 0
+
+    def test_check_import_budgets_flags_slow_and_eager_imports(self):
+        """Imports over the budget or importing lazy modules should be reported."""
+        violations = benchmarks.check_import_budgets(
+            {
+                "contracts": {"ms": 120, "eager": ["pyteal"]},
+                "helpers": {"ms": 260, "eager": []},
+            },
+            {"contracts": 300, "helpers": 250},
+        )
+        assert violations == [
+            "contracts: imports pyteal eagerly",
+            "helpers: 260.0 ms over 250 ms budget",
+        ]
@@ -0,0 +1,154 @@
+"""Module for testing bundles of signed transactions and their submission."""
+
+import msgpack
+import pytest
+from algosdk import account
+from algosdk.future.transaction import SuggestedParams
+
+import helpers
+from bundles import read_bundle, submit_bundle, write_bundle
+from clients import close_clients
+from confirmations import CONFIRMED, REJECTED
+from contracts import (
+    _create_split_contract,
+    bank_logic_signatures,
+    sign_bank_transactions,
+    sign_split_transactions,
+)
+from fakenode import FakeNode
+from signing import EncodedTransaction
+
+
+@pytest.fixture
+def node_responder():
+    """Return responder failing groups by their raw content and confirming others."""
+
+    def respond(handler):
+        if handler.command == "POST" and handler.body == b"malformed":
+            body = b"<html>maintenance</html>"
+            handler.send_response(200)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        elif handler.command == "POST" and handler.body == b"dropped":
+            handler.close_connection = True
+        elif handler.command == "POST":
+            handler.send_json(200, {"txId": "SENT"})
+        elif handler.path.startswith("/v2/status"):
+            handler.send_json(200, {"last-round": 5})
+        else:
+            handler.send_json(200, {"confirmed-round": 5, "pool-error": ""})
+
+    return respond
+
+
+class TestBundle:
+    """Class for testing bundles written and read offline."""
+
+    def test_bundle_streams_groups_with_their_transaction_ids(self, tmp_path):
+        """Every group should be read back with its ids and raw transactions."""
+        private_key, sender = account.generate_account()
+        params = SuggestedParams(1000, 10, 1010, "R0VORVNJUw==", flat_fee=True)
+        payments = [(account.generate_account()[1], 100000 + i) for i in range(20)]
+        groups = list(helpers.sign_payments(payments, sender, private_key, params))
+        path = tmp_path / "payouts.bundle"
+
+        assert write_bundle(path, iter(groups)) == 2
+        records = list(read_bundle(path))
+        assert [record.transaction_ids for record in records] == [
+            [transaction.get_txid() for transaction in group] for group in groups
+        ]
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(records[1].raw)
+        transactions = list(unpacker)
+        assert [transaction["txn"]["amt"] for transaction in transactions] == [
+            100016,
+            100017,
+            100018,
+            100019,
+        ]
+
+    def test_read_bundle_refuses_other_files(self, tmp_path):
+        """Reading file without bundle's header should raise an error."""
+        path = tmp_path / "other.bundle"
+        path.write_bytes(msgpack.packb([["ID"], b"raw"]))
+        with pytest.raises(ValueError):
+            list(read_bundle(path))
+
+
+class TestSubmitBundle:
+    """Class for testing bulk submission of bundles to the fake node."""
+
+    @pytest.fixture(autouse=True)
+    def node(self, monkeypatch):
+        """Start fake node and point the clients to it for each test."""
+        monkeypatch.setattr(helpers, "_dispenser", None)
+        with FakeNode() as node:
+            for name, value in node.environment().items():
+                monkeypatch.setenv(name, value)
+            yield node
+            close_clients()
+
+    def test_submit_bundle_confirms_every_kind_of_transactions(self, tmp_path):
+        """Payments, bank withdrawals and splits should all be confirmed."""
+        receiver = account.generate_account()[1]
+        logic_sig = bank_logic_signatures([receiver])[0]
+        split_contract = _create_split_contract(
+            *(account.generate_account()[1] for _ in range(3))
+        )
+        escrows = [logic_sig.address(), split_contract.get_address()]
+        helpers.fund_accounts([(escrow, 10000000) for escrow in escrows])
+        path = tmp_path / "payouts.bundle"
+
+        def groups():
+            yield from helpers.sign_payments([(receiver, 200000)], note="Payout")
+            yield from sign_bank_transactions(
+                logic_sig, escrows[0], receiver, [300000, 300000]
+            )
+            yield from sign_split_transactions(split_contract, [400000, 800000])
+
+        before = helpers.balance_snapshot([receiver, split_contract.receiver_1])
+        assert write_bundle(path, groups()) == 5
+        results = submit_bundle(path, concurrency=2)
+        after = helpers.balance_snapshot([receiver, split_contract.receiver_1])
+
+        assert [result.status for result in results] == [CONFIRMED] * 5
+        assert [len(result.transaction_ids) for result in results] == [1, 1, 1, 2, 2]
+        assert helpers.balance_changes(before, after) == {
+            receiver: 800000,
+            split_contract.receiver_1: 300000,
+        }
+
+    def test_submit_bundle_reports_groups_refused_by_node(self, tmp_path):
+        """Group refused by the node should be reported with its error."""
+        groups = list(helpers.sign_payments([(account.generate_account()[1], 1)]))
+        path = tmp_path / "payouts.bundle"
+        write_bundle(path, groups)
+        (result,) = submit_bundle(path)
+        assert result.status == REJECTED
+        assert "below min" in result.error
+        assert result.transaction_ids == [groups[0][0].get_txid()]
+
+    def test_submit_bundle_reports_groups_failed_to_be_sent(
+        self, tmp_path, monkeypatch, node_server
+    ):
+        """Failed groups shouldn't discard results of the other groups."""
+        monkeypatch.setenv("ALGOD_ADDRESS", node_server.address)
+        close_clients()
+        path = tmp_path / "payouts.bundle"
+        write_bundle(
+            path,
+            [
+                EncodedTransaction("MALFORMED", b"malformed"),
+                EncodedTransaction("DROPPED", b"dropped"),
+                EncodedTransaction("SENT", b"sent"),
+            ],
+        )
+        results = submit_bundle(path, concurrency=1)
+        assert [result.status for result in results] == [
+            REJECTED,
+            REJECTED,
+            CONFIRMED,
+        ]
+        assert "JSON" in results[0].error
+        assert results[2].round == 5
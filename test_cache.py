@@ -0,0 +1,106 @@
+"""Module for testing caches of results retrieved from Algorand nodes."""
+
+from algosdk.future.transaction import SuggestedParams
+
+import cache
+
+from cache import CompileCache, ParamsCache
+
+
+class TestCompileCache:
+    """Class for testing the compiled programs cache."""
+
+    def test_compile_cache_counts_misses_and_hits(self):
+        """Missing entry should be counted as miss and stored one as hit."""
+        cache = CompileCache()
+        assert cache.get("3.0.0", "int 1") is None
+        cache.put("3.0.0", "int 1", b"\x03\x81\x01")
+        assert cache.get("3.0.0", "int 1") == b"\x03\x81\x01"
+        assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 1, "size": 1}
+
+    def test_compile_cache_evicts_least_recently_used_entry(self):
+        """Memory tier shouldn't hold more than `maxsize` entries."""
+        cache = CompileCache(maxsize=2)
+        cache.put("3.0.0", "int 1", b"1")
+        cache.put("3.0.0", "int 2", b"2")
+        cache.get("3.0.0", "int 1")
+        cache.put("3.0.0", "int 3", b"3")
+        assert cache.get("3.0.0", "int 2") is None
+        assert cache.get("3.0.0", "int 1") == b"1"
+
+    def test_compile_cache_keys_entries_by_version(self):
+        """The same source compiled by other algod version shouldn't be hit."""
+        cache = CompileCache()
+        cache.put("3.0.0", "int 1", b"1")
+        assert cache.get("3.1.0", "int 1") is None
+
+    def test_compile_cache_shares_disk_tier(self, tmp_path):
+        """Entries stored on disk should be available to other cache instances."""
+        CompileCache(directory=tmp_path).put("3.0.0", "int 1", b"1")
+        cache = CompileCache(directory=tmp_path)
+        assert cache.get("3.0.0", "int 1") == b"1"
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_compile_cache_invalidate_removes_other_versions(self, tmp_path):
+        """Invalidation should keep only the entries of provided version."""
+        cache = CompileCache(directory=tmp_path)
+        cache.put("3.0.0", "int 1", b"1")
+        cache.put("3.1.0", "int 1", b"2")
+        cache.invalidate("3.1.0")
+        assert cache.get("3.0.0", "int 1") is None
+        assert CompileCache(directory=tmp_path).get("3.1.0", "int 1") == b"2"
+
+
+def _params(first, genesis_hash="R0VORVNJUw=="):
+    """Return suggested params with validity window starting at `first` round."""
+    return SuggestedParams(0, first, first + 1000, genesis_hash)
+
+
+class TestParamsCache:
+    """Class for testing the suggested params cache."""
+
+    def test_params_cache_moves_window_to_last_known_round(self):
+        """Cached params should start at the last round observed on the node."""
+        cache = ParamsCache()
+        cache.put("node", _params(10))
+        cache.note_round("node", 15)
+        params = cache.get("node")
+        assert (params.first, params.last) == (15, 1015)
+        assert cache.stats() == {"hits": 1, "misses": 0}
+
+    def test_params_cache_returns_independent_copies(self):
+        """Changing returned params shouldn't change the cached ones."""
+        cache = ParamsCache()
+        cache.put("node", _params(10))
+        params = cache.get("node")
+        params.fee, params.flat_fee = 5000, True
+        assert (cache.get("node").fee, cache.get("node").flat_fee) == (0, False)
+
+    def test_params_cache_expires_before_window_runs_out(self):
+        """Params should be stale when known round comes within `margin` rounds."""
+        cache = ParamsCache(margin=100)
+        cache.put("node", _params(10))
+        cache.note_round("node", 909)
+        assert cache.get("node") is not None
+        cache.note_round("node", 910)
+        assert cache.get("node") is None
+
+    def test_params_cache_expires_params_fetched_long_ago(self, monkeypatch):
+        """Params should be stale after `max_age` even if no round is noted."""
+        now = [100.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        params_cache = ParamsCache(margin=100)
+        params_cache.put("node", _params(10))
+        now[0] += 100 * cache.ROUND_DURATION
+        assert params_cache.get("node") is not None
+        now[0] += 1
+        assert params_cache.get("node") is None
+
+    def test_params_cache_resets_known_round_for_new_genesis(self):
+        """Params of reset node shouldn't be moved to rounds of the previous one."""
+        cache = ParamsCache()
+        cache.put("node", _params(10))
+        cache.note_round("node", 5000)
+        assert cache.get("node") is None
+        cache.put("node", _params(2, genesis_hash="TkVX"))
+        assert cache.get("node").first == 2
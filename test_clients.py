@@ -0,0 +1,93 @@
+"""Module for testing shared Algorand node clients."""
+
+import http.client
+import time
+
+import pytest
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+
+from clients import (
+    PooledAlgodClient,
+    PooledIndexerClient,
+    algod_client,
+    client_config,
+    close_clients,
+)
+
+
+@pytest.fixture
+def node_responder():
+    """Return responder with error for unknown accounts and status otherwise.
+
+    Connection of the drop request is closed after the response, and
+    connection of the transactions request is closed without any response.
+    """
+
+    def respond(handler):
+        if handler.path in ("/v2/drop", "/v2/transactions"):
+            handler.close_connection = True
+        if handler.path == "/v2/transactions":
+            return
+        if handler.path.startswith("/v2/accounts/"):
+            handler.send_json(404, {"message": "account not found"})
+        else:
+            handler.send_json(200, {"last-round": 5, "path": handler.path})
+
+    return respond
+
+
+class TestPooledClients:
+    """Class for testing clients using keep-alive connection pools."""
+
+    def test_pooled_algod_client_reuses_connection(self, node_server):
+        """Subsequent requests should be sent through the same connection."""
+        client = PooledAlgodClient("token", node_server.address)
+        for _ in range(5):
+            assert client.status()["last-round"] == 5
+        assert len(node_server.ports) == 1
+        client.pool.close()
+
+    def test_pooled_client_repeats_idempotent_request(self, node_server):
+        """GET request should be repeated if reused connection has been closed."""
+        client = PooledAlgodClient("token", node_server.address)
+        client.algod_request("GET", "/drop")
+        time.sleep(0.1)
+        assert client.status()["last-round"] == 5
+        assert len(node_server.ports) == 2
+        client.pool.close()
+
+    def test_pooled_client_doesnt_repeat_sent_post_request(self, node_server):
+        """POST request shouldn't be repeated once it's sent to the node."""
+        client = PooledAlgodClient("token", node_server.address)
+        client.status()
+        with pytest.raises((http.client.HTTPException, OSError)):
+            client.algod_request("POST", "/transactions", data=b"signed")
+        assert node_server.requests.count(("POST", "/v2/transactions")) == 1
+        client.pool.close()
+
+    def test_pooled_algod_client_raises_sdk_error(self, node_server):
+        """HTTP error responses should be raised as SDK's algod errors."""
+        client = PooledAlgodClient("token", node_server.address)
+        with pytest.raises(AlgodHTTPError) as exception:
+            client.account_info("ADDRESS")
+        assert str(exception.value) == "account not found"
+        assert exception.value.code == 404
+
+    def test_pooled_indexer_client_raises_sdk_error(self, node_server):
+        """HTTP error responses should be raised as SDK's indexer errors."""
+        client = PooledIndexerClient("token", node_server.address)
+        with pytest.raises(IndexerHTTPError):
+            client.account_info("ADDRESS")
+
+    def test_shared_client_is_configured_from_environment(
+        self, node_server, monkeypatch
+    ):
+        """Shared client should use configured address and be reused afterwards."""
+        address = node_server.address
+        monkeypatch.setenv("ALGOD_ADDRESS", address)
+        client = algod_client()
+        assert client.algod_address == address == client_config("ALGOD_ADDRESS")
+        assert algod_client() is client
+        close_clients()
+        assert algod_client() is not client
+        close_clients()
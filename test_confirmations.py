@@ -0,0 +1,144 @@
+"""Module for testing the waiter tracking confirmations of many transactions."""
+
+import threading
+import time
+
+import pytest
+from algosdk.error import AlgodHTTPError
+
+from clients import PooledAlgodClient
+from confirmations import (
+    CONFIRMED,
+    DROPPED,
+    POOL_ERROR,
+    TIMEOUT,
+    ConfirmationWaiter,
+)
+
+
+class _RoundsClient:
+    """Algod client stand-in confirming transactions in preconfigured rounds."""
+
+    def __init__(self, confirmed_rounds=None, pool_errors=None):
+        self.round = 10
+        self.confirmed_rounds = confirmed_rounds or {}
+        self.pool_errors = pool_errors or {}
+        self.status_calls = 0
+        self.lock = threading.Lock()
+
+    def status(self):
+        """Return current round."""
+        return {"last-round": self.round}
+
+    def status_after_block(self, round_num):
+        """Advance to the round after provided one and return it."""
+        with self.lock:
+            self.status_calls += 1
+            self.round = max(self.round, round_num + 1)
+        return {"last-round": self.round}
+
+    def pending_transaction_info(self, transaction_id):
+        """Return pending information of provided transaction."""
+        if transaction_id in self.pool_errors:
+            return {"pool-error": self.pool_errors[transaction_id]}
+        if transaction_id not in self.confirmed_rounds:
+            raise AlgodHTTPError("txn not found", 404)
+        confirmed_round = self.confirmed_rounds[transaction_id]
+        if confirmed_round is not None and confirmed_round <= self.round:
+            return {"confirmed-round": confirmed_round, "pool-error": ""}
+        return {"pool-error": ""}
+
+
+@pytest.fixture
+def node_responder():
+    """Return responder serving malformed status twice and confirming anything."""
+    malformed = [b"<html>starting</html>", b'{"last-round": 1']
+
+    def respond(handler):
+        if handler.path.startswith("/v2/status") and malformed:
+            body = malformed.pop()
+            handler.send_response(200)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        elif handler.path.startswith("/v2/status"):
+            handler.send_json(200, {"last-round": 5})
+        else:
+            handler.send_json(200, {"confirmed-round": 5, "pool-error": ""})
+
+    return respond
+
+
+class TestConfirmationWaiter:
+    """Class for testing outcomes resolved by the confirmation waiter."""
+
+    def test_waiter_resolves_typed_outcomes(self):
+        """Every watched transaction should be resolved with its own outcome."""
+        client = _RoundsClient(
+            confirmed_rounds={"A": 11, "B": 12, "D": None},
+            pool_errors={"C": "overspend"},
+        )
+        waiter = ConfirmationWaiter(client, timeout=4)
+        outcomes = waiter.wait(["A", "B", "C", "D", "E"])
+        assert [outcome.status for outcome in outcomes] == [
+            CONFIRMED,
+            CONFIRMED,
+            POOL_ERROR,
+            TIMEOUT,
+            DROPPED,
+        ]
+        assert [outcome.round for outcome in outcomes[:2]] == [11, 12]
+        assert outcomes[2].pool_error == "overspend"
+        waiter.close()
+
+    def test_waiter_follows_rounds_once_for_all_transactions(self):
+        """Number of status calls shouldn't depend on number of transactions."""
+        transaction_ids = ["T%s" % (index,) for index in range(50)]
+        client = _RoundsClient(confirmed_rounds=dict.fromkeys(transaction_ids, 13))
+        waiter = ConfirmationWaiter(client)
+        outcomes = waiter.wait(transaction_ids)
+        assert {outcome.status for outcome in outcomes} == {CONFIRMED}
+        assert client.status_calls <= 3
+        waiter.close()
+
+    def test_waiter_calls_callback_with_outcome(self):
+        """Callback should be called with the outcome of confirmed transaction."""
+        client = _RoundsClient(confirmed_rounds={"A": 10})
+        waiter = ConfirmationWaiter(client)
+        outcomes = []
+        waiter.watch("A", callback=outcomes.append).result(timeout=5)
+        assert outcomes[0].status == CONFIRMED
+        waiter.close()
+
+    def test_waiter_refreshes_round_after_being_idle(self):
+        """Timeout of the watch should start from the current round of the chain."""
+        client = _RoundsClient(confirmed_rounds={"A": 11, "B": 42})
+        waiter = ConfirmationWaiter(client, timeout=4)
+        assert waiter.watch("A").result(timeout=5).status == CONFIRMED
+        while waiter.last_round is not None:  # waiter goes idle
+            time.sleep(0.01)
+        client.round = 40
+        outcome = waiter.watch("B").result(timeout=5)
+        assert outcome.status == CONFIRMED
+        assert outcome.round == 42
+        waiter.close()
+
+    def test_waiter_retries_malformed_status_responses(self, node_server):
+        """Undecodable status responses should be retried instead of ending loop."""
+        client = PooledAlgodClient("token", node_server.address)
+        waiter = ConfirmationWaiter(client)
+        assert waiter.watch("A").result(timeout=5).status == CONFIRMED
+        assert waiter.watch("B").result(timeout=5).status == CONFIRMED
+        waiter.close()
+        client.pool.close()
+
+    def test_waiter_fails_watches_and_restarts_after_unexpected_error(self):
+        """Unexpected error should fail pending watches and the loop be restarted."""
+        client = _RoundsClient(confirmed_rounds={"A": 10, "B": 10})
+        status, client.status = client.status, lambda: {}
+        waiter = ConfirmationWaiter(client)
+        with pytest.raises(KeyError):
+            waiter.watch("A").result(timeout=5)
+        client.status = status
+        assert waiter.watch("B").result(timeout=5).status == CONFIRMED
+        waiter.close()
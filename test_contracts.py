@@ -1,31 +1,104 @@
 """Module for Algorand smart contracts integration testing."""
 
+import asyncio
 import base64
+import os
 
 import pytest
 from algosdk import constants
 from algosdk.encoding import encode_address, is_valid_address
 from algosdk.error import AlgodHTTPError, TemplateInputError
+from algosdk.future.transaction import LogicSigTransaction
+from pyteal import Mode, compileTeal
 
+from clients import close_clients
+from confirmations import CONFIRMED, REJECTED
 from contracts import (
     BANK_ACCOUNT_FEE,
+    BANK_TEMPLATE_RECEIVER,
+    LOAD_BANK,
+    LOAD_SPLIT,
+    bank_for_account,
+    bank_logic_signatures,
+    bank_program,
+    bank_template,
+    create_bank_group_transaction,
     create_bank_transaction,
+    create_bank_transaction_async,
     create_split_transaction,
+    create_split_transaction_async,
+    generate_load,
+    pipeline_bank_transactions,
     setup_bank_contract,
+    setup_bank_contract_async,
+    setup_load_contracts,
+    setup_batch_bank_contract,
     setup_split_contract,
+    setup_split_contract_async,
+    setup_split_contracts,
+    split_contracts,
+    split_registry_info,
 )
 from helpers import (
     account_balance,
     add_standalone_account,
-    call_sandbox_command,
+    balance_changes,
+    balance_snapshot,
+    create_payment_transaction,
+    dryrun_transactions,
+    ensure_sandbox,
+    fund_accounts,
+    logic_signature,
+    suggested_params,
     transaction_info,
+    transactions_info,
 )
+from fakenode import FakeNode
+from helpers_async import account_balance_async, transaction_info_async
 
 
 def setup_module(module):
-    """Ensure Algorand Sandbox is up prior to running tests from this module."""
-    call_sandbox_command("up")
-    # call_sandbox_command("up", "dev")
+    """Ensure Algorand Sandbox is up and ready prior to running tests from this module.
+
+    In-memory fake node is used instead of the Sandbox if FAKE_NODE
+    environment variable is set.
+    """
+    if os.environ.get("FAKE_NODE"):
+        module.fake_node = FakeNode().start().configure()
+        return
+    ensure_sandbox()
+
+
+def teardown_module(module):
+    """Stop fake node if it has been started for this module."""
+    if getattr(module, "fake_node", None) is not None:
+        module.fake_node.stop()
+        close_clients()
+
+
+class TestFunding:
+    """Class for testing funding of multiple accounts at once."""
+
+    def test_fund_accounts_funds_every_provided_address(self):
+        """Every address should be funded with its amount even in multiple groups."""
+        funds = [(add_standalone_account()[1], 100000 + index) for index in range(20)]
+        transaction_ids = fund_accounts(funds)
+        assert len(set(transaction_ids)) == len(funds)
+        for address, amount in funds:
+            assert account_balance(address) == amount
+
+    def test_funding_transactions_are_retrieved_by_single_lookup(self):
+        """Every funding transaction should be found by batched indexer lookup."""
+        funds = [(add_standalone_account()[1], 100000) for _ in range(3)]
+        transaction_ids = fund_accounts(funds)
+        transactions = transactions_info(transaction_ids)
+        assert [
+            transactions[transaction_id]
+            .get("transaction")
+            .get("payment-transaction")
+            .get("receiver")
+            for transaction_id in transaction_ids
+        ] == [address for address, _ in funds]
 
 
 class TestBankContract:
@@ -133,6 +206,127 @@ class TestBankContract:
         )
         assert transaction.get("transaction").get("group", None) is None
 
+    def test_bank_contract_pipelined_withdrawals(self):
+        """Every pipelined withdrawal should be confirmed or rejected by logic."""
+        logic_sig, escrow_address, receiver = self._create_bank_contract()
+        amounts = [100000 + index for index in range(12)]
+        jobs = [
+            (logic_sig, escrow_address, receiver, amount, BANK_ACCOUNT_FEE)
+            for amount in amounts
+        ]
+        jobs.insert(5, (logic_sig, escrow_address, receiver, 1, BANK_ACCOUNT_FEE + 1))
+        results = list(pipeline_bank_transactions(jobs, depth=4))
+
+        assert (
+            sorted(result.job[3] for result in results if result.status == CONFIRMED)
+            == amounts
+        )
+        rejected = [result for result in results if result.status == REJECTED]
+        assert [result.job for result in rejected] == [jobs[5]]
+        assert "rejected by logic" in rejected[0].error
+        assert account_balance(receiver) == sum(amounts)
+
+    def test_bank_contract_dryrun_sweep(self):
+        """Dryrun verdicts should reject the fees greater than BANK_ACCOUNT_FEE
+
+        and the wrong receiver without submitting any transaction.
+        """
+        _, other_receiver = add_standalone_account()
+        logic_sig, escrow_address, receiver = self._create_bank_contract()
+        variants = [
+            (receiver, BANK_ACCOUNT_FEE - 1),
+            (receiver, BANK_ACCOUNT_FEE),
+            (receiver, BANK_ACCOUNT_FEE + 1),
+            (other_receiver, BANK_ACCOUNT_FEE),
+        ]
+        transactions = []
+        for variant_receiver, fee in variants:
+            params = suggested_params()
+            params.fee, params.flat_fee = fee, True
+            payment_transaction = create_payment_transaction(
+                escrow_address, params, variant_receiver, 1000
+            )
+            transactions.append(LogicSigTransaction(payment_transaction, logic_sig))
+        verdicts = dryrun_transactions(transactions)
+        assert [verdict.passed for verdict in verdicts] == [True, True, False, False]
+
+
+class TestBatchBankContract:
+    """Class for testing the batch bank for account smart contract."""
+
+    def test_batch_bank_contract_withdraws_group(self):
+        """All the withdrawals of the group should be confirmed in single round."""
+        logic_sig, escrow_address, receiver = setup_batch_bank_contract()
+        escrow_balance = account_balance(escrow_address)
+        amounts = [100000] * 16
+        transaction_ids = create_bank_group_transaction(
+            logic_sig, escrow_address, receiver, amounts
+        )
+        assert len(set(transaction_ids)) == 16
+        assert account_balance(receiver) == sum(amounts)
+        assert account_balance(escrow_address) == (
+            escrow_balance - sum(amounts) - 16 * BANK_ACCOUNT_FEE
+        )
+        transactions = transactions_info(transaction_ids)
+        assert {
+            transaction["transaction"]["confirmed-round"]
+            for transaction in transactions.values()
+        } == {transactions[transaction_ids[0]]["transaction"]["confirmed-round"]}
+
+    def test_batch_bank_contract_fee_failed_group(self):
+        """Group should fail when the fee is greater than BANK_ACCOUNT_FEE."""
+        logic_sig, escrow_address, receiver = setup_batch_bank_contract()
+        with pytest.raises(AlgodHTTPError) as exception:
+            create_bank_group_transaction(
+                logic_sig,
+                escrow_address,
+                receiver,
+                [100000, 100000],
+                fee=BANK_ACCOUNT_FEE + 1000,
+            )
+        assert "rejected by logic" in str(exception.value)
+        assert account_balance(receiver) == 0
+
+    def test_batch_bank_contract_raises_error_for_too_big_group(self):
+        """Group can't have more withdrawals than the group size limit."""
+        logic_sig, escrow_address, receiver = setup_batch_bank_contract()
+        with pytest.raises(ValueError):
+            create_bank_group_transaction(
+                logic_sig, escrow_address, receiver, [100000] * 17
+            )
+
+
+class TestBankTemplate:
+    """Class for testing equivalence of patched bank template and full compile."""
+
+    def _full_compile(self, receiver):
+        """Return bank contract bytecode compiled from the scratch for `receiver`."""
+        teal_source = compileTeal(
+            bank_for_account(receiver), mode=Mode.Signature, version=3
+        )
+        return logic_signature(teal_source).logic
+
+    def test_bank_template_contains_placeholder_receiver(self):
+        """Compiled template should be equal to full compile of placeholder."""
+        program, offset = bank_template()
+        assert program == self._full_compile(BANK_TEMPLATE_RECEIVER)
+        assert offset > 0
+
+    @pytest.mark.parametrize("index", range(8))
+    def test_bank_program_equals_full_compile(self, index):
+        """Patched bytecode should be equal to bytecode compiled for the receiver."""
+        _, receiver = add_standalone_account()
+        assert bank_program(receiver) == self._full_compile(receiver)
+
+    def test_bank_logic_signatures_equal_full_compile(self):
+        """Escrow addresses of bulk created signatures should equal full compile."""
+        receivers = [add_standalone_account()[1] for _ in range(4)]
+        logic_sigs = bank_logic_signatures(receivers)
+        assert [logic_sig.logic for logic_sig in logic_sigs] == [
+            self._full_compile(receiver) for receiver in receivers
+        ]
+        assert len({logic_sig.address() for logic_sig in logic_sigs}) == 4
+
 
 class TestSplitContract:
     """Class for testing the split smart contract."""
@@ -247,19 +441,19 @@ class TestSplitContract:
         assertion to result of expressions calculated from the provided arguments.
         """
         contract = self._create_split_contract(rat_1=rat_1, rat_2=rat_2)
-        assert account_balance(contract.owner) == 0
-        assert account_balance(contract.receiver_1) == 0
-        assert account_balance(contract.receiver_2) == 0
-
         escrow = contract.get_address()
-        escrow_balance = account_balance(escrow)
+        addresses = [contract.owner, contract.receiver_1, contract.receiver_2, escrow]
+        before = balance_snapshot(addresses)
+        assert [before.balances[address] for address in addresses[:3]] == [0, 0, 0]
 
         create_split_transaction(contract, amount)
-        assert account_balance(contract.owner) == 0
-        assert account_balance(contract.receiver_1) == rat_1 * amount / (rat_1 + rat_2)
-        assert account_balance(contract.receiver_2) == rat_2 * amount / (rat_1 + rat_2)
-        assert account_balance(escrow) == escrow_balance - amount - contract.max_fee
-
+        after = balance_snapshot(addresses)
+        assert after.round > before.round
+        assert balance_changes(before, after) == {
+            contract.receiver_1: rat_1 * amount // (rat_1 + rat_2),
+            contract.receiver_2: rat_2 * amount // (rat_1 + rat_2),
+            escrow: -amount - contract.max_fee,
+        }
 
     def test_split_contract_transaction(self):
         """Successful transaction should have sender equal to escrow account.
@@ -281,3 +475,99 @@ class TestSplitContract:
                 base64.b64decode(transaction.get("transaction").get("group"))
             )
         )
+
+
+class TestSplitRegistry:
+    """Class for testing registry of split contracts keyed by their parameters."""
+
+    def test_split_contracts_are_built_once_for_same_parameters(self):
+        """Same parameters should return the same contract from the registry."""
+        owner, receiver_1, receiver_2 = (add_standalone_account()[1] for _ in range(3))
+        hits = split_registry_info().hits
+        contracts = split_contracts(
+            [
+                (owner, receiver_1, receiver_2),
+                (owner, receiver_1, receiver_2, 1, 3),
+                (owner, receiver_1, receiver_2, 2, 3),
+            ]
+        )
+        assert contracts[0] is contracts[1]
+        assert contracts[0].get_address() != contracts[2].get_address()
+        assert split_registry_info().hits == hits + 1
+
+    def test_setup_split_contracts_funds_all_escrows(self):
+        """Escrow of every contract should be funded and usable for split."""
+        owner = add_standalone_account()[1]
+        contracts = setup_split_contracts(
+            [
+                (owner, add_standalone_account()[1], add_standalone_account()[1])
+                for _ in range(18)
+            ],
+            initial_funds=2000000,
+        )
+        assert {
+            account_balance(split_contract.get_address())
+            for split_contract in contracts
+        } == {2000000}
+        create_split_transaction(contracts[-1], 1000000)
+        assert account_balance(contracts[-1].receiver_2) == 750000
+
+
+class TestAsyncContracts:
+    """Class for testing asyncio counterparts of contracts functions."""
+
+    def test_bank_contracts_lifecycles_run_concurrently(self):
+        """Concurrent bank contracts withdrawals should pay their receivers."""
+
+        async def lifecycle(amount):
+            logic_sig, escrow_address, receiver = await setup_bank_contract_async()
+            transaction_id = await create_bank_transaction_async(
+                logic_sig, escrow_address, receiver, amount
+            )
+            return await account_balance_async(receiver), transaction_id
+
+        async def lifecycles(amounts):
+            return await asyncio.gather(*(lifecycle(amount) for amount in amounts))
+
+        amounts = [1000000 + index for index in range(10)]
+        results = asyncio.run(lifecycles(amounts))
+        assert [balance for balance, _ in results] == amounts
+
+    def test_split_contracts_lifecycles_run_concurrently(self):
+        """Concurrent split transactions should be available in indexer."""
+
+        async def lifecycle():
+            contract = await setup_split_contract_async()
+            transaction_id = await create_split_transaction_async(contract, 1000000)
+            transaction = await transaction_info_async(transaction_id)
+            return contract, transaction
+
+        async def lifecycles(count):
+            return await asyncio.gather(*(lifecycle() for _ in range(count)))
+
+        for contract, transaction in asyncio.run(lifecycles(5)):
+            assert (
+                transaction.get("transaction").get("sender") == contract.get_address()
+            )
+
+
+class TestLoadGeneration:
+    """Class for testing load generated by bank and split contracts."""
+
+    def test_generated_load_is_confirmed_and_reported(self):
+        """Withdrawals and splits should be confirmed and periodically reported."""
+        operations = setup_load_contracts(1)
+        reports = []
+        report = generate_load(
+            operations,
+            rate=100,
+            duration=0.3,
+            concurrency=4,
+            report=reports.append,
+            report_interval=0.1,
+        )
+        assert [kind for kind, _ in operations] == [LOAD_BANK, LOAD_SPLIT]
+        assert report["statuses"] == {CONFIRMED: report["operations"]}
+        assert report["operations"] > 2
+        assert report["p50"] <= report["p99"]
+        assert reports and reports[-1]["operations"] <= report["operations"]
@@ -0,0 +1,83 @@
+"""Module for testing contracts functions that don't need Algorand Sandbox."""
+
+import pytest
+from algosdk.error import TemplateInputError
+
+import contracts
+from confirmations import CONFIRMED, POOL_ERROR, REJECTED
+from contracts import (
+    SPLIT_MAX_FEE_ERROR,
+    SPLIT_MIN_PAY_ERROR,
+    SPLIT_RATIO_ERROR,
+    LOAD_BANK,
+    LoadStats,
+    create_split_transaction,
+    generate_load,
+    plan_split_transactions,
+)
+from helpers import add_standalone_account
+
+
+class TestSplitPlan:
+    """Class for testing batched validation of split amounts and parameters."""
+
+    def test_split_plan_matches_every_combination(self):
+        """Plan should hold receivers' amounts and errors for all combinations."""
+        plans = plan_split_transactions(
+            [1000000, 1000033, 30000],
+            [(1, 3, 3000, 2000), (2, 6, 100000, 2000), (1, 3, 3000, 500)],
+        )
+        assert [plan.errors for plan in plans] == [
+            [None, SPLIT_RATIO_ERROR, None],
+            [None, SPLIT_RATIO_ERROR, SPLIT_MIN_PAY_ERROR],
+            [SPLIT_MAX_FEE_ERROR, SPLIT_RATIO_ERROR, SPLIT_MAX_FEE_ERROR],
+        ]
+        assert plans[0].amounts_1 == [250000, 0, 7500]
+        assert plans[0].amounts_2 == [750000, 0, 22500]
+        assert plans[1].amounts_1 == [250000, 0, 0]
+
+    def test_split_transaction_fails_without_accessing_network(self, monkeypatch):
+        """Amount that can't be split should fail before params are retrieved."""
+
+        def suggested_params(*args, **kwargs):
+            raise AssertionError("Network shouldn't be accessed")
+
+        monkeypatch.setattr(contracts, "suggested_params", suggested_params)
+        contract = contracts._create_split_contract(
+            *(add_standalone_account()[1] for _ in range(3)), rat_1=2, rat_2=4
+        )
+        with pytest.raises(TemplateInputError) as exception:
+            create_split_transaction(contract, 1000001)
+        assert str(exception.value) == (
+            "the specified amount cannot be split into two parts with the ratio 1/2"
+        )
+
+
+class TestLoadStats:
+    """Class for testing statistics of the generated load."""
+
+    def test_load_stats_report_failure_rates(self):
+        """Rejections and pool errors should be reported as operations ratios."""
+        stats = LoadStats()
+        for status in (CONFIRMED, CONFIRMED, REJECTED, POOL_ERROR):
+            stats.add(status, 0.5)
+        report = stats.report(2)
+        assert (report["tps"], report["rejection_rate"]) == (1, 0.25)
+        assert report["pool_error_rate"] == 0.25
+        assert report["p99"] == 500
+
+
+class TestGenerateLoad:
+    """Class for testing the load generator's pacing."""
+
+    def test_generate_load_keeps_rate_without_reporter(self, monkeypatch):
+        """Operations should be started at the target rate without a reporter."""
+
+        def run_operation(operation, sequence, stats):
+            stats.add(CONFIRMED, 0)
+
+        monkeypatch.setattr(contracts, "_run_load_operation", run_operation)
+        report = generate_load(
+            [(LOAD_BANK, None)], rate=20, duration=0.5, report_interval=0.1
+        )
+        assert 8 <= report["operations"] <= 11
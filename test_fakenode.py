@@ -0,0 +1,104 @@
+"""Module for testing in-memory fake node serving algod and indexer endpoints."""
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+from algosdk.future.transaction import PaymentTxn, assign_group_id
+from algosdk.v2client import algod, indexer
+
+from fakenode import (
+    GENESIS_ADDRESS,
+    GENESIS_PRIVATE_KEY,
+    MIN_BALANCE,
+    NODE_TOKEN,
+    FakeNode,
+)
+
+
+class TestFakeNode:
+    """Class for testing ledger rules of the fake node through SDK clients."""
+
+    @pytest.fixture(autouse=True)
+    def node(self):
+        """Start fake node and create its clients before each test."""
+        with FakeNode() as node:
+            self.algod = algod.AlgodClient(NODE_TOKEN, node.algod_address)
+            self.indexer = indexer.IndexerClient(NODE_TOKEN, node.indexer_address)
+            yield node
+
+    def _payment(self, receiver, amount, sender=GENESIS_ADDRESS):
+        """Return unsigned payment from `sender` to `receiver`."""
+        return PaymentTxn(sender, self.algod.suggested_params(), receiver, amount)
+
+    def test_fake_node_confirms_payment_in_new_block(self):
+        """Payment should be confirmed instantly and visible in indexer."""
+        _, receiver = account.generate_account()
+        last_round = self.algod.status()["last-round"]
+        transaction_id = self.algod.send_transaction(
+            self._payment(receiver, MIN_BALANCE).sign(GENESIS_PRIVATE_KEY)
+        )
+        info = self.algod.pending_transaction_info(transaction_id)
+        assert info["confirmed-round"] == last_round + 1
+        assert self.algod.account_info(receiver)["amount"] == MIN_BALANCE
+        transaction = self.indexer.transaction(transaction_id)["transaction"]
+        assert transaction["payment-transaction"]["receiver"] == receiver
+
+    def test_fake_node_rejects_wrong_signature(self):
+        """Payment signed by other account than the sender should be rejected."""
+        private_key, receiver = account.generate_account()
+        with pytest.raises(AlgodHTTPError) as exception:
+            self.algod.send_transaction(
+                self._payment(receiver, MIN_BALANCE).sign(private_key)
+            )
+        assert "should have been authorized" in str(exception.value)
+
+    @pytest.mark.parametrize(
+        "amount,message",
+        [(MIN_BALANCE - 1, "below min"), (MIN_BALANCE * 4, "overspend")],
+    )
+    def test_fake_node_rejects_invalid_balances(self, amount, message):
+        """Payments leaving accounts below minimum or overspending should fail."""
+        private_key, sender = account.generate_account()
+        self.algod.send_transaction(
+            self._payment(sender, MIN_BALANCE * 3).sign(GENESIS_PRIVATE_KEY)
+        )
+        _, receiver = account.generate_account()
+        transaction = self._payment(receiver, amount, sender=sender)
+        with pytest.raises(AlgodHTTPError) as exception:
+            self.algod.send_transaction(transaction.sign(private_key))
+        assert message in str(exception.value)
+        with pytest.raises(IndexerHTTPError):
+            self.indexer.transaction(transaction.get_txid())
+
+    def test_fake_node_rejects_incomplete_group(self):
+        """Only a part of the atomic group shouldn't be accepted."""
+        receivers = [account.generate_account()[1] for _ in range(2)]
+        transactions = [self._payment(receiver, MIN_BALANCE) for receiver in receivers]
+        assign_group_id(transactions)
+        with pytest.raises(AlgodHTTPError) as exception:
+            self.algod.send_transaction(transactions[0].sign(GENESIS_PRIVATE_KEY))
+        assert "incomplete group" in str(exception.value)
+        self.algod.send_transactions(
+            [transaction.sign(GENESIS_PRIVATE_KEY) for transaction in transactions]
+        )
+        assert self.algod.account_info(receivers[1])["amount"] == MIN_BALANCE
+
+
+class TestFakeNodeBlockInterval:
+    """Class for testing fake node creating blocks in configured intervals."""
+
+    def test_transactions_are_confirmed_in_next_block(self):
+        """Pooled transactions should wait for the block created by the node."""
+        with FakeNode(block_interval=0.05) as node:
+            client = algod.AlgodClient(NODE_TOKEN, node.algod_address)
+            _, receiver = account.generate_account()
+            transaction_id = client.send_transaction(
+                PaymentTxn(
+                    GENESIS_ADDRESS, client.suggested_params(), receiver, MIN_BALANCE
+                ).sign(GENESIS_PRIVATE_KEY)
+            )
+            last_round = client.status()["last-round"]
+            client.status_after_block(last_round)
+            info = client.pending_transaction_info(transaction_id)
+            assert info["confirmed-round"] > last_round
+            assert client.account_info(receiver)["amount"] == MIN_BALANCE
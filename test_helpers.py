@@ -0,0 +1,444 @@
+"""Module for testing helper functions that don't need Algorand Sandbox."""
+
+import json
+import os
+import stat
+
+import pytest
+from algosdk import account, mnemonic
+from algosdk.error import IndexerHTTPError
+from algosdk.future.transaction import SuggestedParams
+
+import helpers
+from cache import ParamsCache
+from clients import close_clients
+from fakenode import GENESIS_ADDRESS, GENESIS_FUNDS, MIN_TXN_FEE, FakeNode
+
+
+class TestDispenser:
+    """Class for testing resolution of the funding account."""
+
+    @pytest.fixture(autouse=True)
+    def reset_dispenser(self, monkeypatch):
+        """Forget dispenser resolved in the process before and after each test."""
+        monkeypatch.setattr(helpers, "_dispenser", None)
+        for name in (
+            "PYTEST_XDIST_TESTRUNUID",
+            "PYTEST_XDIST_WORKER",
+            "PYTEST_XDIST_WORKER_COUNT",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        yield
+        helpers._dispenser = None
+
+    def _set_mnemonic(self, monkeypatch):
+        """Set dispenser mnemonic of a new account and return its address."""
+        private_key, address = account.generate_account()
+        monkeypatch.setenv("DISPENSER_MNEMONIC", mnemonic.from_private_key(private_key))
+        return address, private_key
+
+    def test_dispenser_is_resolved_from_configured_mnemonic(self, monkeypatch):
+        """Configured mnemonic should be used without accessing the network."""
+        address, private_key = self._set_mnemonic(monkeypatch)
+        assert helpers.dispenser() == (address, private_key)
+
+    def test_dispenser_is_resolved_only_once_per_process(self, monkeypatch):
+        """Dispenser resolved before should be returned afterwards."""
+        address, _ = self._set_mnemonic(monkeypatch)
+        helpers.dispenser()
+        self._set_mnemonic(monkeypatch)
+        assert helpers.dispenser()[0] == address
+
+    def test_dispenser_is_shared_between_xdist_workers(self, monkeypatch, tmp_path):
+        """Worker should use the dispenser stored by another worker of the run."""
+        monkeypatch.setattr(helpers.tempfile, "gettempdir", lambda: str(tmp_path))
+        monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "testrun")
+        address, _ = self._set_mnemonic(monkeypatch)
+        helpers.dispenser()
+
+        path = helpers._dispenser_session_path()
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+        helpers._dispenser = None
+        self._set_mnemonic(monkeypatch)
+        assert helpers.dispenser()[0] == address
+
+        helpers.remove_session_files("testrun")
+        assert not path.parent.exists()
+
+    def test_every_xdist_worker_gets_own_sub_dispenser(self, monkeypatch, tmp_path):
+        """Sub-dispensers of all the workers should be funded by single group."""
+        monkeypatch.setattr(helpers.tempfile, "gettempdir", lambda: str(tmp_path))
+        monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "testrun")
+        monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "3")
+        with FakeNode() as node:
+            for name, value in node.environment().items():
+                monkeypatch.setenv(name, value)
+            sub_dispensers = []
+            for worker in ("gw0", "gw1", "gw2"):
+                monkeypatch.setenv("PYTEST_XDIST_WORKER", worker)
+                helpers._dispenser = None
+                sub_dispensers.append(helpers.dispenser()[0])
+            balances = [helpers.account_balance(address) for address in sub_dispensers]
+            genesis_balance = helpers.account_balance(GENESIS_ADDRESS)
+            funding_round = node.ledger.round
+            close_clients()
+        assert len(set(sub_dispensers + [GENESIS_ADDRESS])) == 4
+        assert len(set(balances)) == 1
+        assert sum(balances) + genesis_balance == GENESIS_FUNDS - 3 * MIN_TXN_FEE
+        assert funding_round == 1
+
+
+class _IndexerStub:
+    """Indexer client stand-in lagging behind algod by provided round."""
+
+    def __init__(self, round_num, transactions=()):
+        self.round_num = round_num
+        self.transactions = {
+            transaction["id"]: transaction for transaction in transactions
+        }
+        self.searches = 0
+
+    def health(self):
+        """Return indexer health having current round."""
+        return {"round": self.round_num}
+
+    def transaction(self, transaction_id):
+        """Return indexed transaction or raise error if it's not indexed."""
+        if transaction_id not in self.transactions:
+            raise IndexerHTTPError("no transaction found")
+        return {"transaction": self.transactions[transaction_id]}
+
+    def search_transactions(self, min_round=None, max_round=None, next_page=None):
+        """Return all indexed transactions confirmed in provided rounds range."""
+        self.searches += 1
+        return {
+            "current-round": self.round_num,
+            "transactions": [
+                transaction
+                for transaction in self.transactions.values()
+                if min_round <= transaction["confirmed-round"] <= max_round
+            ],
+        }
+
+
+class _AlgodStub:
+    """Algod client stand-in returning pending information of payments."""
+
+    def pending_transaction_info(self, transaction_id):
+        """Return pending information of payment confirmed in round 12."""
+        return {
+            "confirmed-round": 12,
+            "pool-error": "",
+            "txn": {
+                "sig": "c2ln",
+                "txn": {
+                    "amt": 5000,
+                    "fee": 1000,
+                    "fv": 10,
+                    "lv": 1010,
+                    "rcv": "RECEIVER",
+                    "snd": "SENDER",
+                    "type": "pay",
+                },
+            },
+        }
+
+
+class TestTransactionInfo:
+    """Class for testing round-aware retrieval of transactions."""
+
+    @pytest.fixture
+    def nodes(self, monkeypatch):
+        """Patch clients and delays and return function setting indexer stub."""
+        monkeypatch.setattr(helpers, "_algod_client", _AlgodStub)
+        monkeypatch.setattr(helpers.time, "sleep", lambda delay: None)
+
+        def set_indexer(indexer):
+            monkeypatch.setattr(helpers, "_indexer_client", lambda: indexer)
+            return indexer
+
+        return set_indexer
+
+    def test_transaction_info_falls_back_to_algod(self, nodes, monkeypatch):
+        """Transaction should be built from algod when indexer is behind."""
+        monkeypatch.setattr(helpers, "INDEXER_TIMEOUT", 0.01)
+        nodes(_IndexerStub(11))
+        with pytest.raises(TimeoutError):
+            helpers.transaction_info("TXID")
+        transaction = helpers.transaction_info("TXID", allow_algod=True)
+        assert transaction["transaction"]["sender"] == "SENDER"
+        assert transaction["transaction"]["payment-transaction"] == {
+            "receiver": "RECEIVER",
+            "amount": 5000,
+            "close-amount": 0,
+        }
+
+    def test_transactions_info_uses_single_search(self, nodes):
+        """Transactions from confirmed rounds should be found by one search."""
+        indexed = [
+            {"id": "A", "confirmed-round": 12},
+            {"id": "B", "confirmed-round": 13},
+            {"id": "C", "confirmed-round": 9},
+        ]
+        indexer = nodes(_IndexerStub(13, indexed))
+        transactions = helpers.transactions_info(
+            ["A", "B"], confirmed_rounds={"A": 12, "B": 13}
+        )
+        assert transactions["B"]["transaction"]["id"] == "B"
+        assert sorted(transactions) == ["A", "B"]
+        assert indexer.searches == 1
+
+
+class _DryrunStub:
+    """Algod client stand-in passing dryrun only for the single transactions."""
+
+    def __init__(self):
+        self.requests = []
+
+    def dryrun(self, request):
+        """Return dryrun response rejecting transactions of bigger groups."""
+        self.requests.append(request)
+        messages = ["PASS"] if len(request.txns) == 1 else ["REJECT"]
+        return {
+            "error": "",
+            "txns": [
+                {"logic-sig-messages": messages, "logic-sig-trace": [{"pc": 1}]}
+                for _ in request.txns
+            ],
+        }
+
+
+class _TransactionStub:
+    """Logic signature transaction stand-in having provided id."""
+
+    def __init__(self, transaction_id):
+        self.transaction_id = transaction_id
+
+    def get_txid(self):
+        """Return transaction id."""
+        return self.transaction_id
+
+
+class TestDryrunTransactions:
+    """Class for testing dryrun of many logic signature transactions."""
+
+    def test_dryrun_transactions_returns_verdicts_in_order(self, monkeypatch):
+        """Every group should be evaluated by its own request in provided order."""
+        client = _DryrunStub()
+        monkeypatch.setattr(helpers, "_algod_client", lambda: client)
+        groups = [
+            _TransactionStub("A"),
+            [_TransactionStub("B"), _TransactionStub("C")],
+            _TransactionStub("D"),
+        ]
+        verdicts = helpers.dryrun_transactions(groups)
+        assert [verdict.transaction_id for verdict in verdicts] == list("ABCD")
+        assert [verdict.passed for verdict in verdicts] == [True, False, False, True]
+        assert verdicts[0].cost == 1
+        assert len(client.requests) == 3
+
+
+class _ParamsStub:
+    """Algod client stand-in counting suggested params requests."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def suggested_params(self):
+        """Return new suggested params starting at round 10."""
+        self.calls += 1
+        return SuggestedParams(0, 10, 1010, "R0VORVNJUw==")
+
+
+class TestSuggestedParams:
+    """Class for testing suggested params cached by the helpers."""
+
+    def test_suggested_params_overrides_dont_change_cached_params(self, monkeypatch):
+        """Fee overrides should be applied only to the returned params."""
+        client = _ParamsStub()
+        monkeypatch.setattr(helpers, "_algod_client", lambda: client)
+        monkeypatch.setattr(helpers, "_params_cache", ParamsCache())
+        params = helpers.suggested_params(fee=2000, flat_fee=True)
+        assert (params.fee, params.flat_fee) == (2000, True)
+        params = helpers.suggested_params()
+        assert (params.fee, params.flat_fee) == (0, False)
+        assert client.calls == 1
+
+
+class _VersionsStub:
+    """Algod client stand-in counting requests of its build version."""
+
+    def __init__(self, commit_hash):
+        self.commit_hash = commit_hash
+        self.calls = 0
+
+    def versions(self):
+        """Return versions response of provided build."""
+        self.calls += 1
+        return {"build": {"major": 3, "minor": 9, "commit_hash": self.commit_hash}}
+
+
+class TestAlgodBuildVersion:
+    """Class for testing algod version keying the compiled programs."""
+
+    def test_algod_build_version_is_retrieved_once_per_client(self):
+        """Every client should have its own version retrieved only once."""
+        sandbox, fake = _VersionsStub("sandbox"), _VersionsStub("fakenode")
+        assert helpers._algod_build_version(fake).endswith("-fakenode")
+        assert helpers._algod_build_version(sandbox).endswith("-sandbox")
+        assert helpers._algod_build_version(sandbox).endswith("-sandbox")
+        assert (sandbox.calls, fake.calls) == (1, 1)
+
+    def test_algod_build_version_is_retrieved_for_recreated_clients(self):
+        """Shared clients recreated after closing should retrieve version again."""
+        with FakeNode() as node, pytest.MonkeyPatch.context() as monkeypatch:
+            for name, value in node.environment().items():
+                monkeypatch.setenv(name, value)
+            client = helpers._algod_client()
+            helpers._algod_build_version(client)
+            close_clients()
+            assert helpers._algod_client() not in helpers._algod_versions
+            assert client in helpers._algod_versions
+            close_clients()
+
+
+@pytest.fixture
+def node_responder():
+    """Return responder serving malformed status twice and ready nodes then."""
+    malformed = [b"<html>starting</html>", b'{"last-round": 7']
+
+    def respond(handler):
+        if handler.path.startswith("/v2/status") and malformed:
+            body = malformed.pop()
+            handler.send_response(200)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        elif handler.path.startswith("/v2/status"):
+            handler.send_json(200, {"last-round": 7})
+        else:
+            handler.send_json(200, {"round": 7})
+
+    return respond
+
+
+class TestEnsureSandbox:
+    """Class for testing the Sandbox started once and probed for readiness."""
+
+    @pytest.fixture
+    def commands(self, monkeypatch, tmp_path):
+        """Start fake node, reset sandbox state and return called commands."""
+        monkeypatch.setattr(helpers.tempfile, "gettempdir", lambda: str(tmp_path))
+        monkeypatch.setattr(helpers, "_sandbox_ready", False)
+        monkeypatch.delenv("PYTEST_XDIST_TESTRUNUID", raising=False)
+        monkeypatch.delenv("SANDBOX_REUSE", raising=False)
+        commands = []
+        monkeypatch.setattr(
+            helpers, "call_sandbox_command", lambda *args: commands.append(args)
+        )
+        with FakeNode() as node:
+            for name, value in node.environment().items():
+                monkeypatch.setenv(name, value)
+            yield commands
+            close_clients()
+
+    def test_ensure_sandbox_starts_sandbox_once_per_process(self, commands):
+        """Sandbox should be started only by the first call."""
+        helpers.ensure_sandbox()
+        helpers.ensure_sandbox()
+        assert commands == [("up",)]
+
+    def test_ensure_sandbox_reuses_running_sandbox(self, commands, monkeypatch):
+        """Ready Sandbox shouldn't be restarted if it's configured to be reused."""
+        monkeypatch.setenv("SANDBOX_REUSE", "1")
+        helpers.ensure_sandbox()
+        assert commands == []
+
+    def test_ensure_sandbox_shares_ready_status_with_workers(
+        self, commands, monkeypatch
+    ):
+        """Worker should skip starting the Sandbox started by another worker."""
+        monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "testrun")
+        helpers.ensure_sandbox()
+        helpers._sandbox_ready = False
+        monkeypatch.setattr(helpers, "wait_for_node", lambda: None)
+        helpers.ensure_sandbox()
+        session = json.loads(helpers._session_path("sandbox").read_text())
+        assert session == {"ready": True, "round": 0, "reused": False}
+        assert commands == [("up",)]
+
+    def test_ensure_sandbox_raises_error_for_not_ready_nodes(
+        self, commands, monkeypatch
+    ):
+        """Error should be raised if nodes don't become ready after start."""
+        monkeypatch.setattr(helpers, "wait_for_node", lambda: None)
+        with pytest.raises(RuntimeError):
+            helpers.ensure_sandbox()
+        assert not helpers._sandbox_ready
+
+    @pytest.mark.parametrize(
+        "ready_rounds,reused,called",
+        [([0], True, []), ([None, 0], False, [("up",)])],
+    )
+    def test_ensure_sandbox_reports_whether_sandbox_was_reused(
+        self, commands, monkeypatch, ready_rounds, reused, called
+    ):
+        """Session should record reuse only of the already running Sandbox."""
+        monkeypatch.setenv("PYTEST_XDIST_TESTRUNUID", "testrun")
+        monkeypatch.setenv("SANDBOX_REUSE", "1")
+        rounds = iter(ready_rounds)
+        monkeypatch.setattr(helpers, "_node_ready_round", lambda: next(rounds))
+        helpers.ensure_sandbox()
+        session = json.loads(helpers._session_path("sandbox").read_text())
+        assert session == {"ready": True, "round": 0, "reused": reused}
+        assert commands == called
+
+    def test_wait_for_node_retries_malformed_responses(self, node_server, monkeypatch):
+        """Malformed responses of the starting node should be retried."""
+        for name in ("ALGOD", "INDEXER"):
+            monkeypatch.setenv(name + "_ADDRESS", node_server.address)
+            monkeypatch.setenv(name + "_TOKEN", "token")
+        close_clients()
+        try:
+            assert helpers.wait_for_node(timeout=5) == 7
+        finally:
+            close_clients()
+        assert node_server.requests.count(("GET", "/v2/status")) == 3
+
+
+class _AccountsStub:
+    """Algod client stand-in advancing round after the first account is read."""
+
+    def __init__(self, balances):
+        self.balances = balances
+        self.round_num = 5
+        self.reads = []
+
+    def account_info(self, address):
+        """Return account having its balance in the current round."""
+        self.reads.append(address)
+        info = {"address": address, "amount": self.balances[address]}
+        info["round"] = self.round_num
+        self.round_num = 6
+        return info
+
+
+class TestBalanceSnapshot:
+    """Class for testing balances of many accounts read in the same round."""
+
+    def test_balance_snapshot_reads_again_accounts_from_earlier_rounds(
+        self, monkeypatch
+    ):
+        """Account read before the new round should be read again."""
+        client = _AccountsStub({"A": 1, "B": 2, "C": 3})
+        monkeypatch.setattr(helpers, "_algod_client", lambda: client)
+        snapshot = helpers.balance_snapshot(["A", "B", "C", "A"], max_workers=1)
+        assert snapshot == helpers.BalanceSnapshot(6, {"A": 1, "B": 2, "C": 3})
+        assert client.reads == ["A", "B", "C", "A"]
+
+    def test_balance_changes_include_only_changed_addresses(self):
+        """Unchanged balances should be omitted and missing ones be zero."""
+        before = helpers.BalanceSnapshot(5, {"A": 10, "B": 20, "C": 30})
+        after = helpers.BalanceSnapshot(6, {"A": 10, "B": 15, "D": 5})
+        assert helpers.balance_changes(before, after) == {"B": -5, "C": -30, "D": 5}
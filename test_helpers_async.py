@@ -0,0 +1,211 @@
+"""Module for testing asyncio counterparts of helper functions."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from algosdk.future.transaction import SuggestedParams
+
+from confirmations import CONFIRMED
+import helpers_async
+from helpers_async import AsyncConfirmationWaiter, AsyncNodeClient
+
+
+@pytest.fixture
+def node_responder():
+    """Return responder with chunked body for status and error otherwise."""
+
+    def respond(handler):
+        if handler.path == "/v2/stall":
+            time.sleep(1)
+        if handler.path == "/v2/status":
+            handler.send_chunked(200, (b'{"last-round"', b": 7}"))
+        else:
+            handler.send_json(404, {"message": "account not found"})
+
+    return respond
+
+
+class TestAsyncNodeClient:
+    """Class for testing the asyncio streams based node client."""
+
+    def _client(self, server, timeout=5):
+        """Return client for the provided local server."""
+        return AsyncNodeClient(
+            server.address,
+            {"X-Algo-API-Token": "token"},
+            AlgodHTTPError,
+            timeout=timeout,
+        )
+
+    def test_async_client_runs_concurrent_requests_on_pooled_connections(
+        self, node_server
+    ):
+        """Concurrent requests should succeed and their connections be reused."""
+
+        async def requests():
+            client = self._client(node_server)
+            first = await asyncio.gather(
+                *(client.get_json("/status") for _ in range(3))
+            )
+            second = await asyncio.gather(
+                *(client.get_json("/status") for _ in range(3))
+            )
+            client.close()
+            return first + second
+
+        responses = asyncio.run(requests())
+        assert responses == [{"last-round": 7}] * 6
+        assert len(node_server.ports) == 3
+        assert node_server.hosts == {"127.0.0.1:%s" % (node_server.server_address[1],)}
+
+    def test_async_client_times_out_stalled_request(self, node_server):
+        """Request should raise TimeoutError if the node doesn't respond in time."""
+
+        async def request():
+            return await self._client(node_server, timeout=0.2).get_json("/stall")
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(request())
+
+    def test_async_client_raises_sdk_error(self, node_server):
+        """HTTP error responses should be raised as SDK's algod errors."""
+
+        async def request():
+            return await self._client(node_server).get_json("/accounts/ADDRESS")
+
+        with pytest.raises(AlgodHTTPError) as exception:
+            asyncio.run(request())
+        assert exception.value.code == 404
+
+
+class _AsyncRoundsClient:
+    """Async algod client stand-in confirming transactions in preconfigured rounds."""
+
+    def __init__(self, confirmed_rounds, errors=()):
+        self.round = 10
+        self.confirmed_rounds = confirmed_rounds
+        self.errors = list(errors)
+
+    async def get_json(self, requrl):
+        """Return response of status, wait for block or pending info endpoint.
+
+        Provided errors are raised by the first requests.
+        """
+        if self.errors:
+            raise self.errors.pop(0)
+        if requrl.startswith("/status/wait-for-block-after/"):
+            self.round = max(self.round, int(requrl.rsplit("/", 1)[1]) + 1)
+        if requrl.startswith("/status"):
+            return {"last-round": self.round}
+        confirmed_round = self.confirmed_rounds[requrl.rsplit("/", 1)[1]]
+        if confirmed_round <= self.round:
+            return {"confirmed-round": confirmed_round, "pool-error": ""}
+        return {"pool-error": ""}
+
+
+class TestAsyncConfirmationWaiter:
+    """Class for testing the asyncio confirmation waiter."""
+
+    def test_async_waiter_refreshes_round_after_being_idle(self):
+        """Timeout of the watch should start from the current round of the chain."""
+        client = _AsyncRoundsClient({"A": 11, "B": 42})
+
+        async def watch():
+            waiter = AsyncConfirmationWaiter(client, timeout=4)
+            first = await waiter.watch("A")
+            while waiter.last_round is not None:  # waiter goes idle
+                await asyncio.sleep(0)
+            client.round = 40
+            return first, await waiter.watch("B")
+
+        first, second = asyncio.run(watch())
+        assert first.status == second.status == CONFIRMED
+        assert second.round == 42
+
+    def test_async_waiter_retries_malformed_responses(self):
+        """Truncated and undecodable responses should be retried with backoff."""
+        client = _AsyncRoundsClient(
+            {"A": 11}, errors=[asyncio.IncompleteReadError(b"", 10), ValueError()]
+        )
+
+        async def watch():
+            return await AsyncConfirmationWaiter(client).watch("A")
+
+        assert asyncio.run(watch()).status == CONFIRMED
+
+    def test_async_waiter_fails_watches_on_unexpected_error(self):
+        """Unexpected error should fail pending watches instead of leaving them."""
+        client = _AsyncRoundsClient({"A": 11, "B": 11}, errors=[KeyError("round")])
+
+        async def watch():
+            waiter = AsyncConfirmationWaiter(client)
+            with pytest.raises(KeyError):
+                await asyncio.wait_for(waiter.watch("A"), 5)
+            return await asyncio.wait_for(waiter.watch("B"), 5)
+
+        assert asyncio.run(watch()).status == CONFIRMED
+
+
+class _VersionsClient:
+    """Async algod client stand-in failing the first versions request."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_json(self, requrl):
+        """Raise error for the first request and return versions afterwards."""
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionResetError("Connection closed by the node")
+        return {"build": {"major": 3, "commit_hash": "abc"}}
+
+
+class TestAlgodBuildVersionAsync:
+    """Class for testing algod version retrieved once per event loop."""
+
+    def test_failed_version_retrieval_is_retried(self, monkeypatch):
+        """Failed retrieval shouldn't be cached for the rest of the loop."""
+        client = _VersionsClient()
+        monkeypatch.setattr(helpers_async, "algod_client_async", lambda: client)
+
+        async def versions():
+            with pytest.raises(ConnectionResetError):
+                await helpers_async._algod_build_version_async()
+            first = await helpers_async._algod_build_version_async()
+            return first, await helpers_async._algod_build_version_async()
+
+        assert asyncio.run(versions()) == ("3.None.None-abc",) * 2
+        assert client.calls == 2
+
+
+class TestFundAccountAsync:
+    """Class for testing funding of the accounts from the event loop."""
+
+    def test_dispenser_is_resolved_outside_event_loop(self, monkeypatch):
+        """Blocking dispenser resolution shouldn't run in the event loop's thread."""
+        threads = []
+        private_key, sender = account.generate_account()
+
+        def dispenser():
+            threads.append(threading.get_ident())
+            return sender, private_key
+
+        async def suggested_params_async():
+            return SuggestedParams(1000, 1, 1001, "R0VORVNJUw==")
+
+        async def process_transactions_async(transactions):
+            return transactions[0].get_txid()
+
+        monkeypatch.setattr(helpers_async, "dispenser", dispenser)
+        monkeypatch.setattr(
+            helpers_async, "suggested_params_async", suggested_params_async
+        )
+        monkeypatch.setattr(
+            helpers_async, "process_transactions_async", process_transactions_async
+        )
+        asyncio.run(helpers_async.fund_account_async(sender))
+        assert threads and threads[0] != threading.get_ident()
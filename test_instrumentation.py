@@ -0,0 +1,67 @@
+"""Module for testing instrumentation of helpers and node requests."""
+
+import json
+
+import pytest
+
+import helpers
+import instrumentation
+from clients import ConnectionPool, close_clients
+from fakenode import FakeNode
+
+
+class TestInstrumentation:
+    """Class for testing operations recorded by enabled instrumentation."""
+
+    @pytest.fixture(autouse=True)
+    def recorder(self, monkeypatch):
+        """Enable instrumentation against the fake node for each test."""
+        if instrumentation.recorder() is not None:
+            pytest.skip("instrumentation is enabled by the plugin")
+        monkeypatch.setattr(helpers, "_dispenser", None)
+        with FakeNode() as node:
+            node.configure()
+            recorder = instrumentation.enable()
+            try:
+                yield recorder
+            finally:
+                instrumentation.disable()
+                close_clients()
+
+    def test_disable_restores_original_functions(self):
+        """Wrapped functions should be restored in all the modules."""
+        assert helpers.fund_account.__wrapped__
+        instrumentation.disable()
+        assert not hasattr(helpers.fund_account, "__wrapped__")
+        assert not hasattr(ConnectionPool.request, "__wrapped__")
+        assert instrumentation.recorder() is None
+
+    def test_operations_are_tagged_by_test_and_stage(self, recorder):
+        """HTTP requests and helpers calls should be recorded with their tags."""
+        _, address = helpers.add_standalone_account()
+        with instrumentation.current_test("test"), instrumentation.stage("funding"):
+            helpers.fund_account(address)
+        records = {
+            record["operation"]: record
+            for record in recorder.records()
+            if record["test"] == "test"
+        }
+        assert records["helpers.fund_account"]["count"] == 1
+        assert records["helpers._wait_for_confirmations"]["kind"] == "wait"
+        request = records["algod POST /v2/transactions"]
+        assert request["stage"] == "funding"
+        assert request["bytes_sent"] > 0
+        assert request["histogram"]["+Inf"] == 1
+        assert "algod GET /v2/accounts/{}" not in records
+
+    def test_export_writes_json_and_prometheus_formats(self, recorder, tmp_path):
+        """Recorded operations should be exported in format chosen by suffix."""
+        helpers.account_balance(helpers.add_standalone_account()[1])
+        instrumentation.export(tmp_path / "operations.json")
+        instrumentation.export(tmp_path / "operations.prom")
+        records = json.loads((tmp_path / "operations.json").read_text())
+        assert "algod GET /v2/accounts/{}" in [
+            record["operation"] for record in records
+        ]
+        assert 'le="+Inf"} 1' in (tmp_path / "operations.prom").read_text()
+        assert recorder.totals("operation")[0][2] == 1
@@ -0,0 +1,73 @@
+"""Module for testing signing service for large batches of transactions."""
+
+import base64
+
+from algosdk import account, encoding, mnemonic
+from algosdk.future.transaction import (
+    LogicSig,
+    LogicSigTransaction,
+    PaymentTxn,
+    SuggestedParams,
+)
+
+from signing import Signer, encode_transaction, private_key_from_mnemonic
+
+PARAMS = SuggestedParams(1000, 10, 1010, "R0VORVNJUw==", flat_fee=True)
+
+
+def _encoded(signed_transaction):
+    """Return SDK's raw msgpack encoding of provided signed transaction."""
+    return base64.b64decode(encoding.msgpack_encode(signed_transaction))
+
+
+class TestEncodeTransaction:
+    """Class for testing encoding of the single transaction."""
+
+    def test_signed_encoding_is_the_same_as_sdk_one(self):
+        """Transaction signed by the cached key should match the SDK's one."""
+        private_key, sender = account.generate_account()
+        transaction = PaymentTxn(sender, PARAMS, sender, 1000, note=b"note")
+        encoded = encode_transaction(transaction, {sender: private_key})
+        assert encoded.raw == _encoded(transaction.sign(private_key))
+        assert encoded.transaction_id == transaction.get_txid()
+
+    def test_mnemonic_is_decoded_only_once(self):
+        """Private key of the same mnemonic should be returned from the cache."""
+        private_key, _ = account.generate_account()
+        passphrase = mnemonic.from_private_key(private_key)
+        hits = private_key_from_mnemonic.cache_info().hits
+        assert private_key_from_mnemonic(passphrase) == private_key
+        assert private_key_from_mnemonic(passphrase) == private_key
+        assert private_key_from_mnemonic.cache_info().hits == hits + 1
+
+
+class TestSigner:
+    """Class for testing batches signed by the pool of processes."""
+
+    def test_signer_returns_transactions_of_many_accounts_in_order(self):
+        """Chunks signed by the processes should keep transactions' order."""
+        keys = [account.generate_account()[0] for _ in range(2)]
+        with Signer(processes=2, chunk_size=4) as signer:
+            senders = [signer.add_account(private_key=key) for key in keys]
+            transactions = [
+                PaymentTxn(senders[index % 2], PARAMS, senders[0], 1000 + index)
+                for index in range(10)
+            ]
+            encoded = signer.sign(transactions)
+        assert [item.raw for item in encoded] == [
+            _encoded(transaction.sign(keys[index % 2]))
+            for index, transaction in enumerate(transactions)
+        ]
+
+    def test_signer_wraps_transactions_by_logic_signature(self):
+        """Escrow transactions should be encoded as logic signature ones."""
+        logic_sig = LogicSig(b"\x01\x20\x01\x01\x22")
+        transactions = [
+            PaymentTxn(logic_sig.address(), PARAMS, logic_sig.address(), amount)
+            for amount in (1000, 2000)
+        ]
+        encoded = Signer(processes=0).sign_logic_transactions(transactions, logic_sig)
+        assert [item.raw for item in encoded] == [
+            _encoded(LogicSigTransaction(transaction, logic_sig))
+            for transaction in transactions
+        ]
@@ -0,0 +1,216 @@
+"""Module for testing offline assembler and evaluator of TEAL programs."""
+
+import pytest
+from algosdk import account, template
+from algosdk.future.transaction import PaymentTxn, SuggestedParams, assign_group_id
+from pyteal import Mode, compileTeal
+
+from contracts import (
+    BANK_ACCOUNT_FEE,
+    bank_for_account,
+    batch_bank_for_account,
+    evaluate_bank_transactions,
+    offline_bank_program,
+)
+from teal import Program, TealError, assemble, evaluate
+
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+
+
+def _params(fee=1000):
+    """Return flat fee suggested params with provided `fee`."""
+    return SuggestedParams(fee, 10, 1010, GENESIS_HASH, flat_fee=True)
+
+
+class TestBankContractEvaluation:
+    """Class for testing offline evaluation of the bank contract."""
+
+    def setup_method(self):
+        """Create receiver account and its escrow address before each test."""
+        _, self.receiver = account.generate_account()
+        self.escrow = offline_bank_program(self.receiver).address()
+
+    def _evaluate(self, transaction, **kwargs):
+        """Return evaluation result of the bank contract for `transaction`."""
+        return evaluate_bank_transactions(self.receiver, [transaction], **kwargs)[0]
+
+    def test_bank_contract_passes_valid_withdrawal(self):
+        """Payment to receiver with acceptable fee should pass."""
+        result = self._evaluate(
+            PaymentTxn(self.escrow, _params(BANK_ACCOUNT_FEE), self.receiver, 5000)
+        )
+        assert result.passed
+        assert result.error is None
+
+    def test_bank_contract_rejects_fee_greater_than_bank_account_fee(self):
+        """Fee greater than BANK_ACCOUNT_FEE should be rejected by logic."""
+        result = self._evaluate(
+            PaymentTxn(
+                self.escrow, _params(BANK_ACCOUNT_FEE + 1000), self.receiver, 5000
+            )
+        )
+        assert not result.passed
+        assert result.error == "rejected by logic"
+        assert result.opcode == "return"
+
+    def test_bank_contract_rejects_wrong_receiver(self):
+        """Payment to other receiver should be rejected by logic."""
+        _, other_receiver = account.generate_account()
+        result = self._evaluate(PaymentTxn(self.escrow, _params(), other_receiver, 1))
+        assert not result.passed
+
+    @pytest.mark.parametrize("field", ["close_remainder_to", "rekey_to"])
+    def test_bank_contract_rejects_close_and_rekey_addresses(self, field):
+        """Payment closing or rekeying the escrow should be rejected by logic."""
+        _, other = account.generate_account()
+        transaction = PaymentTxn(
+            self.escrow, _params(), self.receiver, 1, **{field: other}
+        )
+        assert not self._evaluate(transaction).passed
+
+    def test_bank_contract_rejects_grouped_withdrawal(self):
+        """Payment being a part of the group should be rejected by logic."""
+        transaction = PaymentTxn(self.escrow, _params(), self.receiver, 1)
+        other = PaymentTxn(self.receiver, _params(), self.escrow, 1)
+        assert not self._evaluate(transaction, group=[transaction, other]).passed
+
+    def test_bank_contract_evaluation_collects_cost_trace(self):
+        """Trace should carry cumulative cost of every evaluated instruction."""
+        result = self._evaluate(
+            PaymentTxn(self.escrow, _params(), self.receiver, 1), trace=True
+        )
+        assert [step.cost for step in result.trace] == list(range(1, result.cost + 1))
+        assert result.trace[-1].stack == (1,)
+
+
+class TestBatchBankContractEvaluation:
+    """Class for testing offline evaluation of the batch bank contract."""
+
+    def setup_method(self):
+        """Create receiver account and batch bank program before each test."""
+        _, self.receiver = account.generate_account()
+        self.program = Program(
+            assemble(
+                compileTeal(
+                    batch_bank_for_account(self.receiver),
+                    mode=Mode.Signature,
+                    version=3,
+                )
+            )
+        )
+        self.escrow = self.program.address()
+
+    def _group(self, *transactions):
+        """Return provided transactions with assigned group id."""
+        return assign_group_id(list(transactions))
+
+    def test_batch_bank_contract_passes_full_group(self):
+        """Every withdrawal of the group with maximum size should pass."""
+        group = self._group(
+            *(
+                PaymentTxn(self.escrow, _params(), self.receiver, 1000 + index)
+                for index in range(16)
+            )
+        )
+        assert all(
+            evaluate(self.program, transaction, group=group).passed
+            for transaction in group
+        )
+
+    def test_batch_bank_contract_rejects_other_senders_in_group(self):
+        """Group having transaction from other account should be rejected."""
+        _, other = account.generate_account()
+        group = self._group(
+            PaymentTxn(self.escrow, _params(), self.receiver, 1000),
+            PaymentTxn(other, _params(), self.receiver, 1000),
+        )
+        assert not evaluate(self.program, group[0], group=group).passed
+
+    def test_batch_bank_contract_checks_every_member(self):
+        """Member with fee greater than BANK_ACCOUNT_FEE should be rejected."""
+        group = self._group(
+            PaymentTxn(self.escrow, _params(), self.receiver, 1000),
+            PaymentTxn(self.escrow, _params(BANK_ACCOUNT_FEE + 1), self.receiver, 1000),
+        )
+        assert [
+            evaluate(self.program, transaction, group=group).passed
+            for transaction in group
+        ] == [True, False]
+
+
+class TestSplitTemplateEvaluation:
+    """Class for testing offline evaluation of the split template program."""
+
+    def setup_method(self):
+        """Create split contract before each test."""
+        owner, receiver_1, receiver_2 = (
+            account.generate_account()[1] for _ in range(3)
+        )
+        self.contract = template.Split(
+            owner, receiver_1, receiver_2, 1, 3, 5000000, 3000, 2000
+        )
+        self.program = self.contract.get_program()
+
+    def _group(self, amount):
+        """Return transactions of the split group for provided amount."""
+        transactions = self.contract.get_split_funds_transaction(
+            self.program, amount, 1, 10, 1010, GENESIS_HASH
+        )
+        return [transaction.transaction for transaction in transactions]
+
+    def test_split_template_passes_valid_group(self):
+        """Both transactions of properly split amount should pass."""
+        group = self._group(4000000)
+        assert [evaluate(self.program, txn, group=group).passed for txn in group] == [
+            True,
+            True,
+        ]
+
+    def test_split_template_rejects_wrong_ratio(self):
+        """Amounts not satisfying the ratio should be rejected."""
+        group = self._group(4000000)
+        group[1].amt += 3
+        assert not evaluate(self.program, group[0], group=group).passed
+
+
+class TestAssembler:
+    """Class for testing TEAL assembler."""
+
+    def test_assembled_program_is_decoded_with_constant_blocks(self):
+        """Assembled constants should be used by decoded instructions."""
+        program = Program(assemble("#pragma version 3\nint 7\nint 7\n==\nreturn"))
+        assert [instruction.name for instruction in program.instructions] == [
+            "intcblock",
+            "intc_0",
+            "intc_0",
+            "==",
+            "return",
+        ]
+
+    def test_assembler_resolves_branch_labels(self):
+        """Forward branch should jump over the failing instruction."""
+        source = "#pragma version 2\nint 1\nbnz done\nerr\ndone:\nint 1"
+        sender, receiver = (account.generate_account()[1] for _ in range(2))
+        transaction = PaymentTxn(sender, _params(), receiver, 0)
+        assert evaluate(assemble(source), transaction).passed
+
+    @pytest.mark.parametrize("version,costs", [(1, [7, 26, 9]), (2, [35, 130, 45])])
+    def test_hash_opcode_costs_depend_on_program_version(self, version, costs):
+        """Hash opcodes should cost as much as in the program's TEAL version."""
+        source = "#pragma version %s\nbyte 0x00\nsha256\nkeccak256\nsha512_256"
+        program = Program(assemble(source % (version,)))
+        assert [instruction.cost for instruction in program.instructions[-3:]] == costs
+
+    def test_program_rejects_unsupported_version(self):
+        """Programs of versions greater than supported should be refused."""
+        with pytest.raises(TealError):
+            Program(b"\x04\x81\x01")
+
+    def test_pyteal_bank_contract_is_assembled(self):
+        """Bank contract compiled by PyTeal should be assembled and evaluated."""
+        _, receiver = account.generate_account()
+        program = assemble(
+            compileTeal(bank_for_account(receiver), mode=Mode.Signature, version=3)
+        )
+        transaction = PaymentTxn(Program(program).address(), _params(), receiver, 1)
+        assert evaluate(program, transaction).passed